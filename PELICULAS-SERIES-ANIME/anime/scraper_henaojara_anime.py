@@ -9,12 +9,21 @@ import time
 import logging
 import os
 import re
+import sys
 from typing import List, Dict, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
 import requests
 from bs4 import BeautifulSoup
 
+# Capa de grabación/reproducción HTTP (http_replay.py en el root del workspace)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+try:
+    import http_replay
+    http_replay.install_from_env()
+except ImportError:
+    pass
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -315,10 +324,27 @@ class HenaojaraAnimeScraper:
 
         return episodios
 
+    def _parse_servidores_ajax(self, html_text: str) -> List[Dict]:
+        """Parsea la respuesta AJAX de /hj: cada <li encrypt="..."> es un servidor."""
+        servers = []
+        seen = set()
+        ajax_soup = BeautifulSoup(html_text, "html.parser")
+        for li in ajax_soup.find_all("li", attrs={"encrypt": True}):
+            encrypt_hex = li.get("encrypt")
+            if encrypt_hex:
+                decoded_url = self._decode_hex_url(encrypt_hex)
+                if decoded_url:
+                    parsed = urlparse(decoded_url)
+                    server_name = parsed.netloc.replace("www.", "")
+                    key = f"{server_name}|{decoded_url}"
+                    if key not in seen:
+                        servers.append({"url": decoded_url, "server": server_name})
+                        seen.add(key)
+        return servers
+
     def extraer_servidores_episodio(self, episode_url: str) -> List[Dict]:
         """Extrae servidores del episodio mediante petición AJAX."""
         servers = []
-        seen = set()
         try:
             # Primero visitar la página del episodio para obtener cookies
             response = self.session.get(episode_url, timeout=15)
@@ -355,21 +381,7 @@ class HenaojaraAnimeScraper:
                 logger.warning(f"AJAX retornó respuesta vacía para {episode_url}")
                 return servers
             
-            # Parsear respuesta HTML con los servidores
-            ajax_soup = BeautifulSoup(ajax_response.text, "html.parser")
-            
-            # Extraer cada servidor <li encrypt="...">
-            for li in ajax_soup.find_all("li", attrs={"encrypt": True}):
-                encrypt_hex = li.get("encrypt")
-                if encrypt_hex:
-                    decoded_url = self._decode_hex_url(encrypt_hex)
-                    if decoded_url:
-                        parsed = urlparse(decoded_url)
-                        server_name = parsed.netloc.replace("www.", "")
-                        key = f"{server_name}|{decoded_url}"
-                        if key not in seen:
-                            servers.append({"url": decoded_url, "server": server_name})
-                            seen.add(key)
+            servers = self._parse_servidores_ajax(ajax_response.text)
 
             logger.info(f"✓ {len(servers)} servidores extraídos de {episode_url.split('/')[-1]}")
 
@@ -9,15 +9,26 @@ import logging
 import os
 import re
 import sys
-import time
-from typing import Dict, List, Optional, Tuple
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
 # Agregar el directorio padre al path para importar el extractor
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+try:
+    import http_replay
+    http_replay.install_from_env()
+except ImportError:
+    pass
+from m3u8_stage import M3u8Stage
+from nextjs_data import NextDataClient, extract_next_data
+from rate_limiter import HostRateLimiter, parse_rate_spec
 try:
     from scraper_embed_extractor import extract_from_embed
     M3U8_EXTRACTOR_AVAILABLE = True
@@ -28,18 +39,68 @@ except ImportError:
 POSEIDON_BASE_URL = "https://www.poseidonhd2.co"
 MOVIES_URL = f"{POSEIDON_BASE_URL}/peliculas"
 
+# Películas descargadas en paralelo y límite de requests por host ("host=rate[:burst]",
+# ver rate_limiter); los embeds sin entrada propia usan "default", con un bucket por host
+DEFAULT_WORKERS = int(os.environ.get("POSEIDON_WORKERS", "4"))
+DEFAULT_HOST_RATES = "poseidonhd2.co=2:4,default=1:2"
+# Threads de la etapa de m3u8, que resuelve los embeds en paralelo al crawl de páginas
+DEFAULT_M3U8_WORKERS = int(os.environ.get("POSEIDON_M3U8_WORKERS", "4"))
+
+# Claves de idioma de `videos` en las props de Next.js -> etiquetas de _infer_language
+_VIDEO_LANGUAGES = {"latino": "LATINO", "subtitulado": "SUB", "english": "ENGLISH", "spanish": "ESPANOL"}
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
 class PoseidonMoviesScraper:
-    def __init__(self, extract_m3u8: bool = True):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        })
+    def __init__(self, extract_m3u8: bool = True, workers: Optional[int] = None, rates: Optional[str] = None,
+                 m3u8_workers: Optional[int] = None):
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.m3u8_workers = max(1, m3u8_workers or DEFAULT_M3U8_WORKERS)
+        self.m3u8_stage: Optional[M3u8Stage] = None
+        # requests.Session no es thread-safe: una por thread, todas sobre el mismo
+        # adapter para compartir el pool de conexiones
+        self._adapter = HTTPAdapter(pool_connections=10, pool_maxsize=(self.workers + self.m3u8_workers) * 2)
+        self._local = threading.local()
+        self.limiter = HostRateLimiter()
+        self.limiter.configure_many(parse_rate_spec(DEFAULT_HOST_RATES).items())
+        self.limiter.configure_many(parse_rate_spec(os.environ.get("POSEIDON_RATES", "")).items())
+        self.limiter.configure_many(parse_rate_spec(rates or "").items())
+        self.next_client = NextDataClient(lambda url: self._get(url, timeout=15))
         self.processed_movie_ids = set()
         self.extract_m3u8 = extract_m3u8 and M3U8_EXTRACTOR_AVAILABLE
+        # Páginas de película descargadas, HTML reemplazados por /_next/data y reutilizadas del memo
+        self.stats = {"pages_fetched": 0, "bytes_fetched": 0, "pages_saved": 0, "memo_hits": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for key, n in deltas.items():
+                self.stats[key] += n
+
+    def _session(self) -> requests.Session:
+        """Sesión del thread actual (montada sobre el adapter compartido)."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+            })
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            self._local.session = session
+        return session
+
+    def _get(self, url: str, timeout: float) -> requests.Response:
+        """session.get respetando el límite de requests del host."""
+        self.limiter.acquire(url)
+        return self._session().get(url, timeout=timeout)
+
+    def _embed_get(self, url: str, **kwargs) -> requests.Response:
+        """GET del extractor de embeds: cada request (redirecciones incluidas) pasa por el límite de su host."""
+        self.limiter.acquire(url)
+        return self._session().get(url, **kwargs)
 
     def _workspace_root(self) -> str:
         """Devuelve la ruta base del workspace (dos niveles arriba)."""
@@ -47,17 +108,8 @@ class PoseidonMoviesScraper:
         return os.path.abspath(os.path.join(script_dir, "..", ".."))
 
     def _get_next_data(self, html_text: str) -> Optional[Dict]:
-        """Extrae el JSON de __NEXT_DATA__."""
-        try:
-            soup = BeautifulSoup(html_text, "html.parser")
-            script = soup.find("script", id="__NEXT_DATA__")
-            if script:
-                content = script.string if script.string else script.get_text(strip=False)
-                if content:
-                    return json.loads(content)
-        except Exception as exc:
-            logger.debug(f"Error parseando __NEXT_DATA__: {exc}")
-        return None
+        """Extrae el JSON de __NEXT_DATA__ sin parsear el DOM."""
+        return extract_next_data(html_text)
 
     def _find_dict_with_keys(self, data, required_keys: List[str]) -> Optional[Dict]:
         """Busca recursivamente un dict que contenga todas las keys requeridas."""
@@ -89,8 +141,10 @@ class PoseidonMoviesScraper:
         results = []
         next_url = None
         try:
-            response = self.session.get(page_url, timeout=15)
+            response = self._get(page_url, timeout=15)
             response.encoding = "utf-8"
+            if not self.next_client.build_id:
+                self.next_client.remember_build_id(extract_next_data(response.text))
             soup = BeautifulSoup(response.text, "html.parser")
 
             section = soup.find("section", class_="home-movies")
@@ -132,12 +186,63 @@ class PoseidonMoviesScraper:
 
         return results, next_url
 
-    def _parse_movie_info(self, movie_url: str) -> Optional[Dict]:
-        """Extrae informacion de la pelicula."""
+    def _fetch_movie_page(self, movie_url: str) -> Optional[Dict]:
+        """
+        Descarga la película una sola vez: las props por /_next/data si ya se conoce
+        el buildId, o la página HTML. El soup se arma recién cuando hace falta el DOM.
+        """
+        loaded = self.next_client.load(movie_url)
+        if loaded.source == "error":
+            return None
+        if loaded.source == "memo":
+            self._count(memo_hits=1)
+        else:
+            self._count(pages_fetched=1, bytes_fetched=loaded.size)
+        return {"url": movie_url, "next_data": loaded.data, "html": loaded.html, "soup": None,
+                "source": loaded.source}
+
+    def _page_soup(self, page: Dict) -> BeautifulSoup:
+        """Soup de la página; si solo se tenía el JSON, descarga el HTML."""
+        if page["soup"] is None:
+            if page["html"] is None:
+                loaded = self.next_client.fetch_html(page["url"])
+                self._count(pages_fetched=1, bytes_fetched=loaded.size)
+                page["source"] = "html"  # el JSON no alcanzó: no reemplazó la descarga del HTML
+                page["html"] = loaded.html or ""
+            page["soup"] = BeautifulSoup(page["html"], "html.parser")
+        return page["soup"]
+
+    def _scrape_movie(self, movie_url: str) -> Tuple[Optional[Dict], List[Dict]]:
+        """Info y servidores de una película a partir de una única descarga de su página."""
+        page = self._fetch_movie_page(movie_url)
+        if not page:
+            return None, []
+        info = self._parse_movie_info(movie_url, page)
+        if not info:
+            return None, []
+        servers = self._extract_movie_servers(movie_url, page)
+        if page["source"] == "json":
+            self._count(pages_saved=1)
+        return info, servers
+
+    def _log_stats(self) -> None:
+        st = self.stats
+        logger.info(
+            f"Páginas de película: {st['pages_fetched']} descargadas ({st['bytes_fetched'] / 1048576:.1f} MiB), "
+            f"{st['pages_saved']} HTML reemplazados por /_next/data, {st['memo_hits']} reutilizadas del memo"
+        )
+        logger.info(self.next_client.summary())
+        waited = self.limiter.waited()
+        if waited:
+            logger.info("Espera por límite de host: " + ", ".join(
+                f"{host} {secs:.1f}s" for host, secs in sorted(waited.items(), key=lambda kv: -kv[1])))
+
+    def _parse_movie_info(self, movie_url: str, page: Optional[Dict] = None) -> Optional[Dict]:
+        """Extrae informacion de la pelicula (de `page` si ya fue descargada)."""
         try:
-            response = self.session.get(movie_url, timeout=15)
-            response.encoding = "utf-8"
-            soup = BeautifulSoup(response.text, "html.parser")
+            page = page or self._fetch_movie_page(movie_url)
+            if not page:
+                return None
 
             title = ""
             overview = ""
@@ -147,59 +252,62 @@ class PoseidonMoviesScraper:
             rating = 0.0
             year = ""
 
-            next_data = self._get_next_data(response.text)
-            if next_data:
-                movie_data = self._find_dict_with_keys(next_data, ["TMDbId", "titles", "overview"])
-                if movie_data:
-                    title = movie_data.get("titles", {}).get("name", "")
-                    overview = movie_data.get("overview", "")
-                    release_date = movie_data.get("releaseDate", "")
-                    if release_date:
-                        year = release_date.split("-")[0]
-                    rating = movie_data.get("rate", {}).get("average", 0) or 0
-                    genres = [g.get("name", "") for g in movie_data.get("genres", []) if g.get("name")]
-                    poster_url = movie_data.get("images", {}).get("poster", "")
-                    backdrop_url = movie_data.get("images", {}).get("backdrop", "")
-
-            if not title:
-                title_elem = soup.find("h1", class_="Title")
-                title = title_elem.get_text(strip=True) if title_elem else ""
-
-            if not overview:
-                desc = soup.find("div", class_="Description")
-                overview = desc.get_text(" ", strip=True) if desc else ""
-
-            if not genres:
-                info_list = soup.find("ul", class_="InfoList")
-                if info_list:
-                    for li in info_list.find_all("li"):
-                        if "Genero" in li.get_text():
-                            for a in li.find_all("a"):
-                                g = a.get_text(strip=True)
-                                if g:
-                                    genres.append(g)
-
-            if not poster_url:
-                poster_img = soup.select_one("article.TPost .Image img")
-                poster_url = poster_img.get("src", "") if poster_img else ""
-            if not backdrop_url:
-                backdrop_img = soup.select_one("div.backdrop > div.Image img")
-                backdrop_url = backdrop_img.get("src", "") if backdrop_img else ""
-
-            if not rating:
-                vote_elem = soup.find("div", id="TPVotes")
-                if vote_elem and vote_elem.get("data-percent"):
-                    try:
-                        rating = float(vote_elem.get("data-percent")) / 10.0
-                    except Exception:
-                        rating = 0.0
-
-            if not year:
-                meta = soup.find("p", class_="meta")
-                if meta:
-                    spans = meta.find_all("span")
-                    if spans:
-                        year = spans[-1].get_text(strip=True)
+            next_data = page["next_data"]
+            movie_data = self._find_dict_with_keys(next_data, ["TMDbId", "titles", "overview"]) if next_data else None
+            if movie_data:
+                title = movie_data.get("titles", {}).get("name", "")
+                overview = movie_data.get("overview", "")
+                release_date = movie_data.get("releaseDate", "")
+                if release_date:
+                    year = release_date.split("-")[0]
+                rating = movie_data.get("rate", {}).get("average", 0) or 0
+                genres = [g.get("name", "") for g in movie_data.get("genres", []) if g.get("name")]
+                poster_url = movie_data.get("images", {}).get("poster", "")
+                backdrop_url = movie_data.get("images", {}).get("backdrop", "")
+
+            # Fallback HTML solo si las props no traen el registro de la película
+            if movie_data is None:
+                soup = self._page_soup(page)
+
+                if not title:
+                    title_elem = soup.find("h1", class_="Title")
+                    title = title_elem.get_text(strip=True) if title_elem else ""
+
+                if not overview:
+                    desc = soup.find("div", class_="Description")
+                    overview = desc.get_text(" ", strip=True) if desc else ""
+
+                if not genres:
+                    info_list = soup.find("ul", class_="InfoList")
+                    if info_list:
+                        for li in info_list.find_all("li"):
+                            if "Genero" in li.get_text():
+                                for a in li.find_all("a"):
+                                    g = a.get_text(strip=True)
+                                    if g:
+                                        genres.append(g)
+
+                if not poster_url:
+                    poster_img = soup.select_one("article.TPost .Image img")
+                    poster_url = poster_img.get("src", "") if poster_img else ""
+                if not backdrop_url:
+                    backdrop_img = soup.select_one("div.backdrop > div.Image img")
+                    backdrop_url = backdrop_img.get("src", "") if backdrop_img else ""
+
+                if not rating:
+                    vote_elem = soup.find("div", id="TPVotes")
+                    if vote_elem and vote_elem.get("data-percent"):
+                        try:
+                            rating = float(vote_elem.get("data-percent")) / 10.0
+                        except Exception:
+                            rating = 0.0
+
+                if not year:
+                    meta = soup.find("p", class_="meta")
+                    if meta:
+                        spans = meta.find_all("span")
+                        if spans:
+                            year = spans[-1].get_text(strip=True)
 
             tmdb_id = self._extract_tmdb_id_from_url(movie_url)
             if not tmdb_id:
@@ -223,7 +331,7 @@ class PoseidonMoviesScraper:
     def _extract_player_iframe(self, player_url: str) -> Optional[str]:
         """Extrae el iframe final desde un player poseidon."""
         try:
-            response = self.session.get(player_url, timeout=10)
+            response = self._get(player_url, timeout=10)
             response.encoding = "utf-8"
             match = re.search(r"var\s+url\s*=\s*['\"]([^'\"]+)['\"]", response.text)
             if match:
@@ -252,7 +360,7 @@ class PoseidonMoviesScraper:
         if not self.extract_m3u8 or not embed_url:
             return None
         try:
-            result = extract_from_embed(embed_url)
+            result = extract_from_embed(embed_url, http_get=self._embed_get)
             if result and result.get('best_url'):
                 logger.debug(f"M3U8 extraído: {result['best_url'][:60]}...")
                 return result['best_url']
@@ -263,13 +371,52 @@ class PoseidonMoviesScraper:
             logger.debug(f"Error extrayendo m3u8 de {embed_url}: {exc}")
         return None
 
-    def _extract_movie_servers(self, movie_url: str) -> List[Dict]:
-        """Extrae servidores y links finales de una pelicula."""
+    def _servers_from_next_data(self, next_data: Optional[Dict]) -> List[Dict]:
+        """Servidores desde `videos` de las props (lista por idioma, player a resolver como en el HTML)."""
+        movie_data = self._find_dict_with_keys(next_data, ["TMDbId", "videos"]) if next_data else None
+        videos = movie_data.get("videos") if movie_data else None
+        if not isinstance(videos, dict):
+            return []
+
+        servers: List[Dict] = []
+        for lang_key, video_list in videos.items():
+            if not isinstance(video_list, list):
+                continue
+            language = _VIDEO_LANGUAGES.get(str(lang_key).lower()) or self._infer_language(str(lang_key))
+            for video in video_list:
+                if not isinstance(video, dict):
+                    continue
+                player_url = video.get("result") or ""
+                if not player_url or self._is_doodstream(player_url):
+                    continue
+                final_url = self._extract_player_iframe(player_url) or player_url
+                if self._is_doodstream(final_url):
+                    continue
+                server_name = (video.get("cyberlocker") or "").strip()
+                if not server_name:
+                    parsed = urlparse(final_url)
+                    server_name = parsed.netloc.replace("www.", "") if parsed.netloc else ""
+                if self._is_doodstream(server_name):
+                    continue
+                servers.append({
+                    "server": server_name,
+                    "quality": video.get("quality") or "HD",
+                    "language": language,
+                    "embed_url": final_url,
+                })
+        return servers
+
+    def _extract_movie_servers(self, movie_url: str, page: Optional[Dict] = None) -> List[Dict]:
+        """Extrae servidores y links finales de una pelicula (de `page` si ya fue descargada)."""
         servers: List[Dict] = []
         try:
-            response = self.session.get(movie_url, timeout=15)
-            response.encoding = "utf-8"
-            soup = BeautifulSoup(response.text, "html.parser")
+            page = page or self._fetch_movie_page(movie_url)
+            if not page:
+                return servers
+            servers = self._servers_from_next_data(page["next_data"])
+            if servers:
+                return servers
+            soup = self._page_soup(page)
 
             uls = soup.find_all("ul", class_=re.compile(r"sub-tab-lang"))
             for ul in uls:
@@ -311,11 +458,6 @@ class PoseidonMoviesScraper:
                         "language": language,
                         "embed_url": final_url,
                     }
-                    # Extraer m3u8 si está habilitado
-                    if self.extract_m3u8:
-                        m3u8_result = self._extract_m3u8_for_server(final_url)
-                        if m3u8_result:
-                            server_entry["m3u8_url"] = m3u8_result
                     servers.append(server_entry)
 
             if not servers:
@@ -336,11 +478,6 @@ class PoseidonMoviesScraper:
                         "language": "LATINO",
                         "embed_url": final_url,
                     }
-                    # Extraer m3u8 si está habilitado
-                    if self.extract_m3u8:
-                        m3u8_result = self._extract_m3u8_for_server(final_url)
-                        if m3u8_result:
-                            server_entry["m3u8_url"] = m3u8_result
                     servers.append(server_entry)
 
         except Exception as exc:
@@ -397,6 +534,28 @@ class PoseidonMoviesScraper:
 
         return self._normalize_movie_record(merged)
 
+    def _store_movie(self, movies_map: Dict[int, Dict], tmdb_id: int, info: Dict, servers: List[Dict]) -> None:
+        """Fusiona la película en movies_map y encola sus servidores nuevos sin m3u8 en la etapa de m3u8."""
+        record = self._merge_movie(movies_map.get(tmdb_id), info, servers)
+        movies_map[tmdb_id] = record
+        self.processed_movie_ids.add(tmdb_id)
+        if not self.m3u8_stage:
+            return
+        # El m3u8 se escribe en el dict del servidor dentro del registro ya fusionado
+        new_keys = {(s.get("server"), s.get("language"), s.get("embed_url")) for s in servers}
+        for server in record["servers"]:
+            if (server.get("server"), server.get("language"), server.get("embed_url")) in new_keys:
+                self.m3u8_stage.submit(server, server.get("embed_url"))
+
+    def _start_m3u8_stage(self) -> None:
+        if self.extract_m3u8:
+            self.m3u8_stage = M3u8Stage(self._extract_m3u8_for_server, workers=self.m3u8_workers)
+
+    def _finish_m3u8_stage(self) -> None:
+        if self.m3u8_stage:
+            self.m3u8_stage.close()
+            self.m3u8_stage = None
+
     def _normalize_movie_record(self, record: Dict) -> Dict:
         """Normaliza la estructura del registro de pelicula."""
         normalized = dict(record) if record else {}
@@ -453,19 +612,44 @@ class PoseidonMoviesScraper:
             return 0
 
         logger.info(f"Procesando película: {movie_url}")
-        info = self._parse_movie_info(movie_url)
+        info, servers = self._scrape_movie(movie_url)
         if not info:
             logger.error(f"No se pudo obtener info de {movie_url}")
             return 0
 
-        servers = self._extract_movie_servers(movie_url)
-        existing = movies_map.get(tmdb_id)
-        movies_map[tmdb_id] = self._merge_movie(existing, info, servers)
-        self.processed_movie_ids.add(tmdb_id)
+        self._store_movie(movies_map, tmdb_id, info, servers)
 
         logger.info(f"Actualizada: {info.get('title')} (servers: {len(servers)})")
         return 1
 
+    def _iter_grid_items(self, start_url: str, max_pages: Optional[int]) -> Iterator[Dict]:
+        """Películas de los grids en orden, pidiendo la página siguiente solo cuando hace falta."""
+        current_url = start_url
+        page = 1
+        queued = set()
+        while current_url:
+            if max_pages and page > max_pages:
+                return
+
+            logger.info(f"Procesando grid {page}: {current_url}")
+            items, next_url = self._extract_grid_movies(current_url)
+            if not items:
+                return
+
+            for item in items:
+                movie_url = item.get("url")
+                tmdb_id = self._extract_tmdb_id_from_url(movie_url) if movie_url else None
+                if not movie_url or not tmdb_id:
+                    continue
+                if tmdb_id in self.processed_movie_ids or tmdb_id in queued:
+                    continue
+                queued.add(tmdb_id)
+                item["tmdb_id"] = tmdb_id
+                yield item
+
+            current_url = next_url
+            page += 1
+
     def run(self, max_pages: Optional[int] = None, max_movies: Optional[int] = None, custom_url: Optional[str] = None):
         logger.info("Iniciando scraper de peliculas Poseidon...")
         if self.extract_m3u8:
@@ -473,6 +657,7 @@ class PoseidonMoviesScraper:
         else:
             logger.info("Extracción de URLs m3u8 DESHABILITADA")
         movies_map = self._load_existing_movies()
+        self._start_m3u8_stage()
 
         # Determinar URL inicial
         if custom_url:
@@ -486,7 +671,9 @@ class PoseidonMoviesScraper:
             if self._is_single_movie_url(start_url):
                 logger.info(f"Procesando película individual: {start_url}")
                 processed = self._process_single_movie(start_url, movies_map)
+                self._finish_m3u8_stage()
                 self._save_movies(movies_map)
+                self._log_stats()
                 logger.info(f"Scraping completado. Películas procesadas: {processed}")
                 return
             else:
@@ -494,52 +681,35 @@ class PoseidonMoviesScraper:
         else:
             start_url = MOVIES_URL
 
-        current_url = start_url
-        page = 1
+        # Ventana de hasta `workers` películas en vuelo; los resultados se fusionan en
+        # orden de grid y solo se encola lo que todavía puede contar para max_movies
         processed = 0
-
-        while current_url:
-            if max_pages and page > max_pages:
-                break
-
-            logger.info(f"Procesando grid {page}: {current_url}")
-            items, next_url = self._extract_grid_movies(current_url)
-            if not items:
-                break
-
-            for item in items:
-                if max_movies and processed >= max_movies:
+        items = self._iter_grid_items(start_url, max_pages)
+        pending: deque = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                while len(pending) < self.workers and not (max_movies and processed + len(pending) >= max_movies):
+                    item = next(items, None)
+                    if item is None:
+                        break
+                    logger.info(f"Pelicula: {item.get('title') or item['url']}")
+                    pending.append((item, pool.submit(self._scrape_movie, item["url"])))
+                if not pending:
                     break
 
-                movie_url = item.get("url")
-                tmdb_id = self._extract_tmdb_id_from_url(movie_url) if movie_url else None
-                if not movie_url or not tmdb_id:
-                    continue
-
-                if tmdb_id in self.processed_movie_ids:
-                    continue
-
-                logger.info(f"Pelicula: {item.get('title') or movie_url}")
-                info = self._parse_movie_info(movie_url)
+                item, future = pending.popleft()
+                info, servers = future.result()
                 if not info:
                     continue
 
-                servers = self._extract_movie_servers(movie_url)
-                existing = movies_map.get(tmdb_id)
-                movies_map[tmdb_id] = self._merge_movie(existing, info, servers)
-                self.processed_movie_ids.add(tmdb_id)
+                self._store_movie(movies_map, item["tmdb_id"], info, servers)
                 processed += 1
 
                 logger.info(f"Actualizada: {info.get('title')} (servers: {len(servers)})")
-                time.sleep(1)
-
-            if max_movies and processed >= max_movies:
-                break
-
-            current_url = next_url
-            page += 1
 
+        self._finish_m3u8_stage()
         self._save_movies(movies_map)
+        self._log_stats()
         logger.info("Scraping completado.")
 
 
@@ -554,10 +724,19 @@ def main():
         - Por genero: https://www.poseidonhd2.co/genero/accion
         - Pelicula directa: https://www.poseidonhd2.co/pelicula/338969/the-toxic-avenger""")
     parser.add_argument("--no-m3u8", action="store_true", help="No extraer URLs m3u8 de los embeds")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"Peliculas en paralelo (default: {DEFAULT_WORKERS}, env POSEIDON_WORKERS)")
+    parser.add_argument("--rate", type=str, default=None,
+                        help=f"Limite por host 'host=req_por_seg[:rafaga],...' (default: {DEFAULT_HOST_RATES}, "
+                             "env POSEIDON_RATES)")
+    parser.add_argument("--m3u8-workers", type=int, default=None,
+                        help=f"Threads resolviendo m3u8 en segundo plano (default: {DEFAULT_M3U8_WORKERS}, "
+                             "env POSEIDON_M3U8_WORKERS)")
 
     args = parser.parse_args()
 
-    scraper = PoseidonMoviesScraper(extract_m3u8=not args.no_m3u8)
+    scraper = PoseidonMoviesScraper(extract_m3u8=not args.no_m3u8, workers=args.workers, rates=args.rate,
+                                    m3u8_workers=args.m3u8_workers)
     scraper.run(max_pages=args.max_pages, max_movies=args.max_movies, custom_url=args.url)
 
 
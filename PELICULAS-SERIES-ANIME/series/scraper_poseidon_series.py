@@ -8,6 +8,7 @@ import json
 import logging
 import os
 import re
+import sys
 import time
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
@@ -16,16 +17,29 @@ from urllib.parse import urljoin, urlparse
 import requests
 from bs4 import BeautifulSoup
 
+# Capa de grabación/reproducción HTTP (http_replay.py en el root del workspace)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+try:
+    import http_replay
+    http_replay.install_from_env()
+except ImportError:
+    pass
+from m3u8_stage import EMBED_EXTRACTOR_AVAILABLE, M3u8Stage
+from nextjs_data import NextDataClient, extract_next_data
+
 # Configuracion
 POSEIDON_BASE_URL = "https://www.poseidonhd2.co"
 SERIES_URL = f"{POSEIDON_BASE_URL}/series"
 
+# Claves de idioma de `videos` en las props de Next.js -> etiquetas de _infer_language
+_VIDEO_LANGUAGES = {"latino": "LAT", "subtitulado": "SUB", "english": "EN", "spanish": "ES"}
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
 class PoseidonSeriesScraper:
-    def __init__(self):
+    def __init__(self, extract_m3u8: bool = False, m3u8_workers: int = 4):
         self.session = requests.Session()
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
@@ -36,15 +50,23 @@ class PoseidonSeriesScraper:
         self.processed_series_ids = set()
         self.debug_season_url: Optional[str] = None
         self.debug_episode_url: Optional[str] = None
-        self.next_build_id: Optional[str] = None
-
-    def _get_html(self, url: str, referer: Optional[str] = None, timeout: int = 15) -> str:
-        """Obtiene HTML usando headers similares al navegador."""
+        # Props de series/temporadas/episodios vía /_next/data, con el buildId cacheado
+        self.next_client = NextDataClient(lambda url: self._get_response(url, referer=POSEIDON_BASE_URL))
+        self.extract_m3u8 = extract_m3u8 and EMBED_EXTRACTOR_AVAILABLE
+        self.m3u8_workers = max(1, m3u8_workers)
+        self.m3u8_stage: Optional[M3u8Stage] = None
+
+    def _get_response(self, url: str, referer: Optional[str] = None, timeout: int = 15) -> requests.Response:
+        """GET usando headers similares al navegador."""
         headers = {}
         if referer:
             headers["Referer"] = referer
             headers["Origin"] = f"{urlparse(referer).scheme}://{urlparse(referer).netloc}"
-        response = self.session.get(url, timeout=timeout, headers=headers or None)
+        return self.session.get(url, timeout=timeout, headers=headers or None)
+
+    def _get_html(self, url: str, referer: Optional[str] = None, timeout: int = 15) -> str:
+        """Obtiene HTML usando headers similares al navegador."""
+        response = self._get_response(url, referer=referer, timeout=timeout)
         response.encoding = "utf-8"
         return response.text
 
@@ -72,50 +94,10 @@ class PoseidonSeriesScraper:
             logger.debug(f"No se pudo guardar debug {filename}: {exc}")
 
     def _get_next_data(self, html_text: str) -> Optional[Dict]:
-        """Extrae el JSON de __NEXT_DATA__."""
-        try:
-            soup = BeautifulSoup(html_text, "html.parser")
-            script = soup.find("script", id="__NEXT_DATA__")
-            if script:
-                content = script.string if script.string else script.get_text(strip=False)
-                if content:
-                    data = json.loads(content)
-                    build_id = data.get("buildId") if isinstance(data, dict) else None
-                    if build_id:
-                        self.next_build_id = build_id
-                    return data
-        except Exception as exc:
-            logger.debug(f"Error parseando __NEXT_DATA__: {exc}")
-        return None
-
-    def _fetch_next_data_json(self, url: str, html_text: Optional[str] = None) -> Optional[Dict]:
-        """Intenta obtener el JSON de Next.js via /_next/data/{buildId}/..."""
-        try:
-            if not html_text:
-                html_text = self._get_html(url, referer=POSEIDON_BASE_URL, timeout=15)
-            next_data = self._get_next_data(html_text) if html_text else None
-            build_id = None
-            if isinstance(next_data, dict):
-                build_id = next_data.get("buildId")
-            if not build_id:
-                build_id = self.next_build_id
-
-            if not build_id:
-                return None
-
-            parsed = urlparse(url)
-            path = parsed.path.rstrip("/")
-            if not path:
-                return None
-
-            data_url = f"{parsed.scheme}://{parsed.netloc}/_next/data/{build_id}{path}.json"
-            json_text = self._get_html(data_url, referer=url, timeout=15)
-            if self.debug_season_url and url.rstrip("/") == self.debug_season_url.rstrip("/"):
-                self._write_debug_file("next_data_season.json", json_text)
-            return json.loads(json_text)
-        except Exception as exc:
-            logger.debug(f"Error obteniendo _next/data json para {url}: {exc}")
-        return None
+        """Extrae el JSON de __NEXT_DATA__ sin parsear el DOM (y recuerda el buildId)."""
+        data = extract_next_data(html_text)
+        self.next_client.remember_build_id(data)
+        return data
 
     def _find_dict_with_keys(self, data, required_keys: List[str]) -> Optional[Dict]:
         """Busca recursivamente un dict que contenga todas las keys requeridas."""
@@ -331,6 +313,8 @@ class PoseidonSeriesScraper:
         next_url = None
         try:
             html_text = self._get_html(page_url, referer=POSEIDON_BASE_URL, timeout=15)
+            if not self.next_client.build_id:
+                self._get_next_data(html_text)
             soup = BeautifulSoup(html_text, "html.parser")
 
             section = soup.find("section", class_="home-movies")
@@ -375,8 +359,9 @@ class PoseidonSeriesScraper:
     def _parse_series_info(self, series_url: str) -> Tuple[Optional[Dict], List[int]]:
         """Extrae informacion de la serie y temporadas disponibles."""
         try:
-            html_text = self._get_html(series_url, referer=POSEIDON_BASE_URL, timeout=15)
-            soup = BeautifulSoup(html_text, "html.parser")
+            page = self.next_client.load(series_url)
+            if page.source == "error":
+                return None, []
 
             title = ""
             original_title = ""
@@ -391,21 +376,27 @@ class PoseidonSeriesScraper:
             first_air_date = ""
 
             # Intentar con __NEXT_DATA__ primero
-            next_data = self._get_next_data(html_text)
-            if next_data:
-                serie_data = self._find_dict_with_keys(next_data, ["TMDbId", "titles", "overview"])
-                if serie_data:
-                    title = serie_data.get("titles", {}).get("name", "")
-                    original_title = serie_data.get("titles", {}).get("originalName", "")
-                    overview = serie_data.get("overview", "")
-                    first_air_date = serie_data.get("releaseDate", "")
-                    vote_average = serie_data.get("rate", {}).get("average", 0) or 0
-                    vote_count = serie_data.get("rate", {}).get("count", 0) or 0
-                    popularity = serie_data.get("popularity", 0) or 0
-                    status = serie_data.get("status", "")
-                    genres = [g.get("name", "") for g in serie_data.get("genres", []) if g.get("name")]
-                    poster_url = serie_data.get("images", {}).get("poster", "")
-                    backdrop_url = serie_data.get("images", {}).get("backdrop", "")
+            next_data = page.data
+            serie_data = self._find_dict_with_keys(next_data, ["TMDbId", "titles", "overview"]) if next_data else None
+            if serie_data:
+                title = serie_data.get("titles", {}).get("name", "")
+                original_title = serie_data.get("titles", {}).get("originalName", "")
+                overview = serie_data.get("overview", "")
+                first_air_date = serie_data.get("releaseDate", "")
+                vote_average = serie_data.get("rate", {}).get("average", 0) or 0
+                vote_count = serie_data.get("rate", {}).get("count", 0) or 0
+                popularity = serie_data.get("popularity", 0) or 0
+                status = serie_data.get("status", "")
+                genres = [g.get("name", "") for g in serie_data.get("genres", []) if g.get("name")]
+                poster_url = serie_data.get("images", {}).get("poster", "")
+                backdrop_url = serie_data.get("images", {}).get("backdrop", "")
+
+            # El DOM solo hace falta si las props no traen el registro de la serie o sus temporadas
+            html_text = page.html
+            if html_text is None and (serie_data is None
+                                      or not self._extract_season_numbers_from_next_data(next_data or {})):
+                html_text = self.next_client.fetch_html(series_url).html
+            soup = BeautifulSoup(html_text or "", "html.parser")
 
             # Fallback HTML
             if not title:
@@ -502,22 +493,27 @@ class PoseidonSeriesScraper:
         """Extrae episodios desde la pagina de la serie (selector de temporadas)."""
         episodes = []
         try:
-            html_text = self._get_html(series_url, referer=POSEIDON_BASE_URL, timeout=15)
+            page = self.next_client.load(series_url)
+            if page.source == "error":
+                return episodes
+            html_text = page.html
             debug_match = False
             if self.debug_season_url:
                 debug_target = self.debug_season_url.rstrip("/")
                 series_target = series_url.rstrip("/")
                 if debug_target == series_target or debug_target.startswith(f"{series_target}/temporada/"):
                     debug_match = True
+            if debug_match and html_text is None:
+                html_text = self.next_client.fetch_html(series_url).html or ""
             if debug_match:
                 self._write_debug_file("season_page.html", html_text)
-            if "Just a moment" in html_text or "cf-" in html_text:
+            if html_text and ("Just a moment" in html_text or "cf-" in html_text):
                 logger.warning(f"Posible bloqueo anti-bot en {series_url}")
-            next_data = self._get_next_data(html_text)
+            next_data = page.data
             if debug_match:
                 has_next = bool(next_data)
                 logger.info(f"DEBUG temporada: __NEXT_DATA__={'si' if has_next else 'no'}")
-                logger.info(f"DEBUG temporada: len(html)={len(html_text)}")
+                logger.info(f"DEBUG temporada: len(html)={len(html_text)} (props vía {page.source})")
                 if next_data:
                     props = next_data.get("props", {}).get("pageProps", {})
                     logger.info(f"DEBUG temporada: pageProps keys={list(props.keys())}")
@@ -530,7 +526,11 @@ class PoseidonSeriesScraper:
                 if episodes:
                     return episodes
 
-            next_json = self._fetch_next_data_json(series_url, html_text=html_text)
+            # Si las props vinieron del HTML, el endpoint JSON puede traer las temporadas completas
+            next_page = self.next_client.fetch_json(series_url) if page.source != "json" else None
+            next_json = next_page.data if next_page else None
+            if next_json and debug_match:
+                self._write_debug_file("next_data_season.json", json.dumps(next_json, ensure_ascii=False))
             if next_json:
                 episodes = self._extract_episodes_from_seasons(next_json, series_url, season_number)
                 if not episodes and season_number == 1:
@@ -539,6 +539,8 @@ class PoseidonSeriesScraper:
                 if episodes:
                     return episodes
 
+            if html_text is None:
+                html_text = self.next_client.fetch_html(series_url).html or ""
             soup = BeautifulSoup(html_text, "html.parser")
 
             ul = soup.find("ul", class_=re.compile(r"all-episodes"))
@@ -647,11 +649,51 @@ class PoseidonSeriesScraper:
             return "ES"
         return "LAT"
 
+    def _servers_from_next_data(self, next_data: Optional[Dict], episode_url: str) -> List[Dict]:
+        """Servidores desde `videos` de las props del episodio (lista por idioma)."""
+        videos = None
+        if next_data:
+            holder = self._find_dict_with_keys(next_data, ["videos"])
+            videos = holder.get("videos") if holder else None
+        if not isinstance(videos, dict):
+            return []
+
+        servers: List[Dict] = []
+        for lang_key, video_list in videos.items():
+            if not isinstance(video_list, list):
+                continue
+            language = _VIDEO_LANGUAGES.get(str(lang_key).lower()) or self._infer_language(str(lang_key))
+            for video in video_list:
+                if not isinstance(video, dict) or not video.get("result"):
+                    continue
+                player_url = self._normalize_url(video["result"])
+                final_url = self._extract_player_iframe(player_url, referer=episode_url) or player_url
+                server_name = (video.get("cyberlocker") or "").strip()
+                if not server_name:
+                    parsed = urlparse(final_url)
+                    server_name = parsed.netloc.replace("www.", "") if parsed.netloc else ""
+                servers.append({
+                    "url": final_url,
+                    "name": server_name,
+                    "server": server_name,
+                    "language": language,
+                    "quality": video.get("quality") or "",
+                })
+        return servers
+
     def _extract_episode_servers(self, episode_url: str) -> List[Dict]:
         """Extrae servidores y links finales de un episodio."""
         servers: List[Dict] = []
         try:
-            html_text = self._get_html(episode_url, referer=POSEIDON_BASE_URL, timeout=15)
+            page = self.next_client.load(episode_url)
+            if page.source == "error":
+                return servers
+            servers = self._servers_from_next_data(page.data, episode_url)
+            if servers:
+                return servers
+            html_text = page.html
+            if html_text is None:
+                html_text = self.next_client.fetch_html(episode_url).html or ""
             if self.debug_episode_url and episode_url.rstrip("/") == self.debug_episode_url.rstrip("/"):
                 logger.info(f"DEBUG episodio: len(html)={len(html_text)}")
                 logger.info(f"DEBUG episodio: contiene data-tr={('data-tr' in html_text)}")
@@ -809,9 +851,25 @@ class PoseidonSeriesScraper:
         merged["number_of_episodes"] = len(merged.get("episodios", []))
         return merged
 
+    def _queue_m3u8(self, servers: List[Dict]) -> None:
+        """Encola los servidores del episodio en la etapa de m3u8 (se completan en segundo plano)."""
+        if self.m3u8_stage:
+            for server in servers:
+                self.m3u8_stage.submit(server, server.get("url"))
+
+    def _start_m3u8_stage(self) -> None:
+        if self.extract_m3u8:
+            self.m3u8_stage = M3u8Stage(workers=self.m3u8_workers)
+
+    def _finish_m3u8_stage(self) -> None:
+        if self.m3u8_stage:
+            self.m3u8_stage.close()
+            self.m3u8_stage = None
+
     def run(self, max_pages: Optional[int] = None, max_series: Optional[int] = None, max_episodes: Optional[int] = None):
         logger.info("Iniciando scraper de series Poseidon...")
         series_map = self._load_existing_series()
+        self._start_m3u8_stage()
 
         current_url = SERIES_URL
         page = 1
@@ -860,6 +918,7 @@ class PoseidonSeriesScraper:
                             continue
 
                         servers = self._extract_episode_servers(ep.get("url"))
+                        self._queue_m3u8(servers)
                         new_episodes.append({
                             "season": season_number,
                             "episode": ep_num,
@@ -884,7 +943,9 @@ class PoseidonSeriesScraper:
             current_url = next_url
             page += 1
 
+        self._finish_m3u8_stage()
         self._save_series(series_map)
+        logger.info(self.next_client.summary())
         logger.info("Scraping completado.")
 
     def run_single(self, series_url: str, max_episodes: Optional[int] = None):
@@ -908,6 +969,7 @@ class PoseidonSeriesScraper:
         if not info:
             logger.error("No se pudo obtener informacion de la serie")
             return
+        self._start_m3u8_stage()
 
         existing = series_map.get(tmdb_id)
         existing_eps = {(e.get("season"), e.get("episode")) for e in existing.get("episodios", [])} if existing else set()
@@ -925,6 +987,7 @@ class PoseidonSeriesScraper:
                     continue
 
                 servers = self._extract_episode_servers(ep.get("url"))
+                self._queue_m3u8(servers)
                 new_episodes.append({
                     "season": season_number,
                     "episode": ep_num,
@@ -937,7 +1000,9 @@ class PoseidonSeriesScraper:
                 break
 
         series_map[tmdb_id] = self._merge_series(existing, info, new_episodes)
+        self._finish_m3u8_stage()
         self._save_series(series_map)
+        logger.info(self.next_client.summary())
         logger.info("✅ Serie unica procesada: %s (nuevos episodios: %d)", info.get("name"), len(new_episodes))
 
 
@@ -951,10 +1016,12 @@ def main():
     parser.add_argument("--series-url", type=str, default=None, help="URL de una serie especifica a procesar (ej: https://www.poseidonhd2.co/serie/44006/chicago-fire)")
     parser.add_argument("--debug-season-url", type=str, default=None, help="URL de temporada para debug")
     parser.add_argument("--debug-episode-url", type=str, default=None, help="URL de episodio para debug")
+    parser.add_argument("--m3u8", action="store_true", help="Resolver m3u8 de los embeds en segundo plano")
+    parser.add_argument("--m3u8-workers", type=int, default=4, help="Threads resolviendo m3u8 (default: 4)")
 
     args = parser.parse_args()
 
-    scraper = PoseidonSeriesScraper()
+    scraper = PoseidonSeriesScraper(extract_m3u8=args.m3u8, m3u8_workers=args.m3u8_workers)
     scraper.debug_season_url = args.debug_season_url
     scraper.debug_episode_url = args.debug_episode_url
     if args.series_url:
@@ -17,6 +17,15 @@ import subprocess
 from datetime import datetime
 import re
 
+# Capa de grabación/reproducción HTTP (http_replay.py en el root del workspace)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+try:
+    import http_replay
+    http_replay.install_from_env()
+except ImportError:
+    pass
+from nextjs_data import NextDataClient, extract_next_data
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -34,6 +43,8 @@ class RecentEpisodesScraper:
         self.recent_episodes = []
         self.new_series = []
         self.processed_episode_ids = set()
+        # Props de episodios vía /_next/data (buildId tomado de la página de episodios)
+        self.next_client = NextDataClient(lambda url: self.session.get(url, timeout=15))
 
     def _workspace_root(self) -> str:
         """Devuelve la ruta base del workspace (dos niveles arriba)."""
@@ -41,17 +52,8 @@ class RecentEpisodesScraper:
         return os.path.abspath(os.path.join(script_dir, "..", ".."))
         
     def _get_next_data(self, html_text: str) -> Optional[Dict]:
-        """Extrae el JSON de __NEXT_DATA__"""
-        try:
-            soup = BeautifulSoup(html_text, 'html.parser')
-            script = soup.find('script', id='__NEXT_DATA__')
-            if script:
-                content = script.string if script.string else script.get_text(strip=False)
-                if content:
-                    return json.loads(content)
-        except Exception as e:
-            logger.debug(f"Error parseando __NEXT_DATA__: {e}")
-        return None
+        """Extrae el JSON de __NEXT_DATA__ sin parsear el DOM"""
+        return extract_next_data(html_text)
 
     def _find_dict_with_keys(self, data, required_keys: List[str]) -> Optional[Dict]:
         """Busca recursivamente un dict que contenga todas las keys requeridas"""
@@ -92,6 +94,7 @@ class RecentEpisodesScraper:
         try:
             response = self.session.get(page_url, timeout=15)
             response.encoding = 'utf-8'
+            self.next_client.remember_build_id(self._get_next_data(response.text))
             soup = BeautifulSoup(response.text, 'html.parser')
             
             # Buscar sección de episodios
@@ -172,11 +175,8 @@ class RecentEpisodesScraper:
         }
         
         try:
-            response = self.session.get(episodio_url, timeout=15)
-            response.encoding = 'utf-8'
-            
-            # Obtener __NEXT_DATA__
-            next_data = self._get_next_data(response.text)
+            # Props del episodio (reutiliza la descarga de extraer_info_episodio)
+            next_data = self.next_client.get(episodio_url)
             videos_obj = None
             if next_data:
                 videos_obj = self._find_videos_obj(next_data)
@@ -221,10 +221,7 @@ class RecentEpisodesScraper:
     def extraer_info_episodio(self, episodio_url: str) -> Optional[Dict]:
         """Extrae información completa del episodio y su serie"""
         try:
-            response = self.session.get(episodio_url, timeout=15)
-            response.encoding = 'utf-8'
-            
-            next_data = self._get_next_data(response.text)
+            next_data = self.next_client.get(episodio_url)
             if not next_data:
                 logger.warning("No se encontró __NEXT_DATA__")
                 return None
@@ -387,6 +384,7 @@ class RecentEpisodesScraper:
             self.guardar_episodios_recientes()
             self.actualizar_series_json()
             
+            logger.info(self.next_client.summary())
             logger.info(f"\n✅ Scraping completado. Total: {len(self.recent_episodes)} episodios recientes")
             
         except KeyboardInterrupt:
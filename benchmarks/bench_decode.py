@@ -0,0 +1,122 @@
+"""
+Micro-benchmark y test diferencial de decode_mixed_encoding.
+Compara la versión en bloque (codec utf-8 + handler latin-1) contra el
+recorrido byte a byte anterior, con entradas aleatorias y una agenda grande
+de encoding mixto (estilo antenasport index2.txt).
+
+Uso: python benchmarks/bench_decode.py [casos_aleatorios]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import scraper_partidos as sp  # noqa: E402
+
+
+def legacy_decode_mixed_encoding(raw: bytes) -> str:
+    """Implementación anterior (byte a byte en Python)."""
+    result = []
+    i = 0
+    n = len(raw)
+    while i < n:
+        b = raw[i]
+        if b <= 0x7F:
+            result.append(chr(b))
+            i += 1
+        elif 0xC2 <= b <= 0xDF and i + 1 < n and 0x80 <= raw[i + 1] <= 0xBF:
+            result.append(raw[i:i + 2].decode('utf-8'))
+            i += 2
+        elif (0xE0 <= b <= 0xEF and i + 2 < n
+              and 0x80 <= raw[i + 1] <= 0xBF
+              and 0x80 <= raw[i + 2] <= 0xBF):
+            result.append(raw[i:i + 3].decode('utf-8'))
+            i += 3
+        elif (0xF0 <= b <= 0xF7 and i + 3 < n
+              and all(0x80 <= raw[i + j] <= 0xBF for j in range(1, 4))):
+            result.append(raw[i:i + 4].decode('utf-8'))
+            i += 4
+        else:
+            result.append(chr(b))
+            i += 1
+    return ''.join(result)
+
+
+SAMPLE_TEXT = [
+    "Sunday, 22 February 2026",
+    "10:30 Super Lig: Kayserispor - Antalyaspor",
+    "https://antenasport.top/ch/bein2.html",
+    "12:00 Ekstraklasa: Łódź - Górnik Zabrze",
+    "14:00 Süper Lig: Beşiktaş - Fenerbahçe",
+    "16:00 LaLiga: Atlético Madrid - Alavés",
+    "----------",
+]
+
+
+def random_chunk(rng: random.Random) -> bytes:
+    kind = rng.random()
+    if kind < 0.4:
+        return rng.choice(SAMPLE_TEXT).encode("utf-8")
+    if kind < 0.7:
+        return rng.choice(SAMPLE_TEXT).encode("latin-1", errors="replace")
+    if kind < 0.85:
+        return "".join(chr(rng.randint(0x80, 0x10FFFF)) for _ in range(rng.randint(1, 4))).encode(
+            "utf-8", errors="surrogatepass")
+    return bytes(rng.randint(0, 255) for _ in range(rng.randint(1, 6)))
+
+
+def differential(cases: int, seed: int = 1234) -> int:
+    """Devuelve la cantidad de diferencias. Se ignoran las entradas donde la versión
+    anterior lanzaba UnicodeDecodeError (secuencias overlong/surrogates): la nueva las
+    interpreta como latin-1 en vez de romper el parser."""
+    rng = random.Random(seed)
+    mismatches = 0
+    skipped = 0
+    for _ in range(cases):
+        raw = b"\n".join(random_chunk(rng) for _ in range(rng.randint(1, 12)))
+        try:
+            expected = legacy_decode_mixed_encoding(raw)
+        except UnicodeDecodeError:
+            skipped += 1
+            sp.decode_mixed_encoding(raw)
+            continue
+        if sp.decode_mixed_encoding(raw) != expected:
+            mismatches += 1
+            if mismatches <= 5:
+                print("  DIFERENCIA:", raw[:80])
+    print(f"  Diferencial: {cases - skipped - mismatches}/{cases - skipped} iguales "
+          f"({skipped} entradas inválidas para la versión anterior)")
+    return mismatches
+
+
+def bench(label, fn, raw, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(raw)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<10} {elapsed * 1000:9.2f} ms  ({len(raw) / elapsed / 1e6:7.1f} MB/s)")
+    return elapsed
+
+
+def main():
+    cases = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    mismatches = differential(cases)
+
+    # Agenda grande de encoding mixto: líneas UTF-8 y latin-1 intercaladas
+    lines = []
+    for i in range(20000):
+        line = SAMPLE_TEXT[i % len(SAMPLE_TEXT)]
+        lines.append(line.encode("utf-8") if i % 3 else line.encode("latin-1", errors="replace"))
+    raw = b"\n".join(lines)
+    print(f"Agenda mixta de {len(raw) / 1024:.0f} KiB")
+    t_legacy = bench("byte-loop", legacy_decode_mixed_encoding, raw, 3)
+    t_current = bench("bloque", sp.decode_mixed_encoding, raw, 20)
+    print(f"  Speedup: {t_legacy / t_current:.0f}x")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
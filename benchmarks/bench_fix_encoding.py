@@ -0,0 +1,206 @@
+"""
+Benchmark de fix_encoding: costo por evento (liga + equipos + canonical_equipos_key,
+como en build_event / merge_events) antes y después del motor de reemplazos
+compilado y la memoización. Verifica que la salida sea idéntica sobre la agenda
+y sobre textos con mojibake generados al azar.
+
+Uso: python benchmarks/bench_fix_encoding.py [ruta/partidos.json] [repeticiones]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import scraper_partidos as sp  # noqa: E402
+
+
+# --- Implementación anterior (dos re-encodes + bucles de dicts con in/replace) ---
+
+def legacy_fix_encoding(text: str) -> str:
+    """Implementación anterior de scraper_partidos.fix_encoding."""
+    if not text:
+        return text
+
+    # Paso 1: Intentar arreglar mojibake típico latin1→utf8
+    # (ej: "ï¿½" son los bytes EF BF BD de U+FFFD leídos como latin-1)
+    try:
+        fixed = text.encode('latin-1').decode('utf-8')
+        if fixed != text and '\ufffd' not in fixed:
+            text = fixed
+    except (UnicodeDecodeError, UnicodeEncodeError):
+        pass
+
+    # Paso 1b: Intentar arreglar mojibake windows-1252→utf8
+    try:
+        fixed = text.encode('cp1252').decode('utf-8')
+        if fixed != text and '\ufffd' not in fixed:
+            text = fixed
+    except (UnicodeDecodeError, UnicodeEncodeError):
+        pass
+
+    # Paso 2: Si tiene U+FFFD (replacement character), aplicar correcciones conocidas
+    if '\ufffd' in text:
+        correcciones = {
+            # Equipos / ciudades con acentos comunes
+            "K\ufffdbenhavn": "København",
+            "Nordsj\ufffdlland": "Nordsjælland",
+            "Vara\ufffddin": "Varaždin",
+            "Alav\ufffds": "Alavés",
+            "Vit\ufffdria Guimar\ufffdes": "Vitória Guimarães",
+            "\ufffdeleznicar": "Železnicar",
+            "M\ufffdnchen": "München",
+            "Atl\ufffdtico": "Atlético",
+            "Ath Bilba\ufffd": "Ath Bilbaó",
+            "C\ufffdceres": "Cáceres",
+            "G\ufffdteborg": "Göteborg",
+            "Malm\ufffd": "Malmö",
+            "Boras\ufffd": "Borås",
+            "S\ufffdnderjyskE": "SønderjyskE",
+            "Br\ufffdndby": "Brøndby",
+            "\ufffdrebro": "Örebro",
+            "Laktasi": "Laktaši",
+            "Famos-SA\ufffdK": "Famos-SAIK",
+            "Posusje": "Posušje",
+            "Siroki": "Široki",
+            "Velez": "Velež",
+            "Zeljeznicar": "Željezničar",
+            # CONCACAF / Centroamérica
+            "Cartagin\ufffds": "Cartaginés",
+            # Acentos comunes en español / portugués / francés
+            "Bol\ufffdvar": "Bolívar",
+            "D\ufffdnamo": "Dínamo",
+            "G\ufffdrnik": "Górnik",
+            "L\ufffddz": "Łódź",
+            "Krak\ufffdw": "Kraków",
+            "Ey\ufffdpspor": "Eyüpspor",
+            "Gen\ufffdlerbirli\ufffdi": "Gençlerbirliği",
+            "Nig\ufffde": "Niğde",
+            "Kayserisp\ufffd": "Kayserispor",
+            "Fener\ufffd": "Fenerbahçe",
+            "Be\ufffdikta\ufffd": "Beşiktaş",
+            "Trabz\ufffdnspor": "Trabzonspor",
+            "K\ufffdln": "Köln",
+            "N\ufffdrnberg": "Nürnberg",
+            "D\ufffdsseldorf": "Düsseldorf",
+            "Z\ufffdrich": "Zürich",
+            "Betis Sevill\ufffd": "Betis Sevilla",
+        }
+        for bad, good in correcciones.items():
+            if bad in text:
+                text = text.replace(bad, good)
+
+    # Paso 3: Si aún tiene U+FFFD, intentar recovery genérico
+    # Para cada U+FFFD, probar las vocales acentuadas más comunes en español/portugués
+    if '\ufffd' in text:
+        # Intentar reemplazar cada U+FFFD individualmente con caracteres comunes
+        common_accented = 'éáíóúñüçèàùòêâôãõëäïößøæåÉÁÍÓÚÑÜÇ'
+        parts = text.split('\ufffd')
+        if len(parts) >= 2:
+            # Para cada posición con U+FFFD, probar el carácter más probable
+            result = parts[0]
+            for i, part in enumerate(parts[1:], 1):
+                best_char = ''
+                # Contexto: letra anterior y posterior al U+FFFD
+                prev_char = result[-1] if result else ''
+                next_char = part[0] if part else ''
+                # Heurística: si está entre letras, es probablemente una vocal acentuada
+                if prev_char.isalpha() and next_char.isalpha():
+                    # Inferir por contexto: letra minúscula → acento minúsculo
+                    candidates = common_accented.lower() if prev_char.islower() else common_accented.upper()
+                    for char in candidates:
+                        best_char = char
+                        break  # Usar el primer candidato (é es lo más frecuente en español)
+                if best_char:
+                    result += best_char + part
+                else:
+                    result += '\ufffd' + part  # No podemos recuperar, mantener
+            text = result
+
+    # Correcciones conocidas sin U+FFFD (ej: latin1/utf-8 cruzados - mojibake)
+    extras = {
+        "LanÃºs": "Lanús",
+        "LanĂºs": "Lanús",
+        "LanĂşs": "Lanús",
+        "Ã©": "é",
+        "Ã¡": "á",
+        "Ã­": "í",
+        "Ã³": "ó",
+        "Ãº": "ú",
+        "Ã±": "ñ",
+        "Ã¼": "ü",
+        "Ã§": "ç",
+        "Ã": "Á",  # Ã seguido de espacio suele ser Á mal codificado
+    }
+    for bad, good in extras.items():
+        if bad in text:
+            text = text.replace(bad, good)
+    return text
+
+
+def mojibake_samples(events, count, seed=7):
+    """Variantes rotas de los textos de la agenda: U+FFFD, latin1/utf-8 cruzados y claves conocidas."""
+    rng = random.Random(seed)
+    base = [ev.get("equipos", "") for ev in events] + [ev.get("liga", "") for ev in events]
+    base += list(sp._FFFD_CORRECCIONES) + list(sp._MOJIBAKE_EXTRAS)
+    samples = []
+    for _ in range(count):
+        text = rng.choice(base) + " - " + rng.choice(base)
+        mode = rng.random()
+        if mode < 0.3:
+            text = text.encode("utf-8").decode("latin-1", errors="replace")
+        elif mode < 0.5:
+            text = text.encode("utf-8").decode("cp1252", errors="replace")
+        elif mode < 0.8:
+            text = "".join("�" if c in "áéíóúñüöçã" else c for c in text)
+        samples.append(text)
+    return samples
+
+
+def per_event(events, fix):
+    for ev in events:
+        fix(ev.get("liga", ""))
+        equipos = fix(ev.get("equipos", ""))
+        fix(equipos)  # canonical_equipos_key vuelve a repararlo durante merge_events
+
+
+def bench(label, fn, events, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat / max(1, len(events))
+    print(f"  {label:<22} {elapsed * 1e6:8.2f} us/evento")
+    return elapsed
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else str(sp.OUTPUT_JSON)
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    with open(path, "r", encoding="utf-8") as f:
+        events = json.load(f)
+
+    texts = [ev.get(k, "") for ev in events for k in ("liga", "equipos")] + mojibake_samples(events, 5000)
+    mismatches = [(t, legacy_fix_encoding(t), sp.fix_encoding(t)) for t in texts
+                  if legacy_fix_encoding(t) != sp.fix_encoding(t)]
+    for text, a, b in mismatches[:10]:
+        print("  DIFERENCIA:", repr(text), "->", repr(a), "!=", repr(b))
+    print(f"  Paridad: {len(texts) - len(mismatches)}/{len(texts)} textos")
+
+    print(f"Agenda: {len(events)} eventos x {repeat} repeticiones")
+    t_legacy = bench("anterior", lambda: per_event(events, legacy_fix_encoding), events, repeat)
+    uncached = sp.fix_encoding.__wrapped__
+    t_cold = bench("compilado (sin memo)", lambda: per_event(events, uncached), events, repeat)
+
+    def warm():
+        per_event(events, sp.fix_encoding)
+    sp.fix_encoding.cache_clear()
+    t_warm = bench("compilado + memo", warm, events, repeat)
+    print(f"  Speedup: {t_legacy / t_cold:.1f}x sin memo, {t_legacy / t_warm:.1f}x con memo")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
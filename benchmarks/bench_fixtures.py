@@ -0,0 +1,339 @@
+"""
+Suite de benchmarks offline sobre las páginas capturadas del repo (debug_*.html,
+debug/, PELICULAS-SERIES-ANIME/anime/debug_*.html). Mide ops/seg y memoria pico
+(tracemalloc) de los parsers y extractores, sin red:
+
+  - scraper_partidos.parse_tvlibree (http_get servido desde fixtures)
+  - scraper_partidos._find_m3u8_in_html / _find_and_unpack_evals
+  - scraper_embed_extractor.extract_video_urls
+  - _get_next_data de PoseidonMoviesScraper / PoseidonSeriesScraper
+  - HenaojaraAnimeScraper.extraer_servidores_episodio (sesión servida desde fixtures)
+
+Donde el repo no guarda una captura con el contenido necesario (agenda de
+tvlibree, página Next.js de poseidon, respuesta AJAX de henaojara no vacía) se
+arma una sintética y determinista a partir de los datos versionados.
+
+Los casos que pasan por caches lru (unpack_payload, fix_encoding) las vacían en
+cada iteración: se mide el camino frío, no aciertos de memo.
+
+Los ops/seg absolutos dependen de la máquina, así que cada caso se mide en rondas
+alternadas con una carga de referencia fija (regex + JSON sobre los mismos datos)
+y se compara la mediana de ops/seg relativos a ella con benchmarks/baselines.json,
+con el GC desactivado mientras se cronometra. --save corre --pasadas pasadas
+completas y guarda por caso, además de la mediana, la tolerancia que hizo falta
+para cubrir la dispersión observada (nunca menos que --tolerancia). Un caso que
+pierde más que su tolerancia o gana más de --tolerancia % en memoria pico se
+marca como regresión; solo con --estricto eso termina con código de salida 1.
+
+Uso: python benchmarks/bench_fixtures.py [--save [--pasadas N]] [--estricto] [--filter TEXTO]
+                                         [--min-time SEG] [--rondas N] [--tolerancia PCT]
+"""
+
+import argparse
+import base64
+import gc
+import importlib.util
+import json
+import logging
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import scraper_embed_extractor as se  # noqa: E402
+import scraper_partidos as sp  # noqa: E402
+
+BASELINES_FILE = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+
+def _read(rel_path: str) -> str:
+    with open(os.path.join(ROOT, rel_path), encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def _load_module(name: str, rel_path: str):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, rel_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _FakeResponse:
+    def __init__(self, text: str, url: str = ''):
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.url = url
+        self.status_code = 200
+        self.encoding = 'utf-8'
+        self.headers = {}
+
+
+# --- Fixtures sintéticas ---
+
+def synthetic_tvlibree_agenda(n_events: int = 40) -> str:
+    """Agenda con la estructura que espera parse_tvlibree (li > span.t + subitems)."""
+    ligas = ['Liga Profesional', 'Premier League', 'LaLiga', 'Serie A', 'NBA', 'Copa Libertadores']
+    equipos = [('Boca Juniors', 'River Plate'), ('Arsenal', 'Chelsea'), ('Real Madrid', 'Barcelona'),
+               ('Inter', 'Milan'), ('Lakers', 'Celtics'), ('Flamengo', 'Palmeiras')]
+    clases = ['AR', '', '', '', 'NBA', 'CH']
+    items = []
+    for i in range(n_events):
+        j = i % len(ligas)
+        hora = f"{(i * 37 // 60) % 24:02d}:{(i * 37) % 60:02d}"
+        r = base64.b64encode(f"https://streamtp10.com/global1.php?stream=canal{i}".encode()).decode()
+        items.append(
+            f'<li class="{clases[j]}"><a href="#">{ligas[j]}: {equipos[j][0]} vs {equipos[j][1]}'
+            f'<span class="t">{hora}</span></a><img src="/img/flags/{j}.png"><ul>'
+            f'<li class="subitem1"><a href="/en-vivo/canal-{i % 7}/">Canal {i % 7}</a></li>'
+            f'<li class="subitem1"><a href="/eventos/?r={r}">Opción {i}</a></li>'
+            f'<li class="subitem1"><a href="/html/fl/?get=canal{i}">Alternativa</a></li>'
+            f'</ul></li>')
+    return ('<html><body><div id="agenda"><h2>Agenda - Viernes 17 de Octubre de 2026</h2>'
+            f'<ul class="menu">{"".join(items)}</ul></div></body></html>')
+
+
+def synthetic_next_page(n_items: int = 30) -> str:
+    """Página Next.js de poseidon: HTML real de relleno + __NEXT_DATA__ armado desde peliculas.json."""
+    with open(os.path.join(ROOT, 'peliculas.json'), encoding='utf-8') as f:
+        peliculas = json.load(f)[:n_items]
+    movies = [{
+        'TMDbId': p.get('tmdb_id'),
+        'titles': {'name': p.get('title', '')},
+        'overview': p.get('overview', ''),
+        'releaseDate': f"{p.get('year') or '2025'}-01-01",
+        'rate': {'average': p.get('rating', 0)},
+        'genres': [{'name': g} for g in p.get('genres_spanish', [])],
+        'images': {'poster': p.get('poster_url', ''), 'backdrop': p.get('backdrop_url', '')},
+        'videos': {'latino': [{'result': s.get('embed_url', ''), 'cyberlocker': s.get('server', '')}
+                              for s in p.get('servers', [])]},
+    } for p in peliculas]
+    data = {'props': {'pageProps': {'thisMovie': movies[0], 'relatedMovies': movies[1:]}},
+            'page': '/movie/[id]/[slug]', 'query': {}, 'buildId': 'bench-build-id'}
+    filler = _read('debug/series24_page.html')
+    script = f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data, ensure_ascii=False)}</script>'
+    return filler.replace('</body>', script + '</body>', 1)
+
+
+def synthetic_henaojara_ajax(n_servers: int = 12) -> str:
+    """Respuesta de /hj con <li encrypt="hex(url)">, URLs tomadas de peliculas.json."""
+    with open(os.path.join(ROOT, 'peliculas.json'), encoding='utf-8') as f:
+        peliculas = json.load(f)
+    urls = [s['embed_url'] for p in peliculas for s in p.get('servers', []) if s.get('embed_url')][:n_servers]
+    lis = ''.join(f'<li encrypt="{u.encode().hex()}"><span>Opción {i}</span></li>' for i, u in enumerate(urls))
+    return f'<ul class="opt-list">{lis}</ul>'
+
+
+# --- Casos ---
+
+def build_cases():
+    """Lista de (nombre, callable sin argumentos)."""
+    logging.disable(logging.WARNING)
+    cases = []
+
+    # parse_tvlibree con http_get servido desde fixtures
+    channel_page = _read('debug_tvlibree_cvatt.html')
+    sp.evento_vigente = lambda *args, **kwargs: True  # determinista respecto de la hora actual
+    for name, agenda in [('debug_tvlibree.html', _read('debug_tvlibree.html')),
+                         ('debug_tvlibree_cvatt.html', channel_page),
+                         ('agenda sintética (40 eventos)', synthetic_tvlibree_agenda())]:
+        def _run(agenda=agenda):
+            def _http_get(session, url):
+                return _FakeResponse(agenda if url == sp.TVLIBREE_URL else channel_page, url)
+            sp.http_get = _http_get
+            sp._page_cache = sp.PageCache()
+            return sp.parse_tvlibree(None)
+        cases.append((f'parse_tvlibree | {name}', _cold(_run)))
+
+    # Búsqueda de m3u8 directo sobre todas las capturas
+    pages = ['debug_animeonline.html', 'debug_bysejikuar_com.html', 'debug_callistanise_com.html',
+             'debug_deepcathink.html', 'debug_elcanaldeportivo.html', 'debug_lauradaydo_com.html',
+             'debug_streamwish.html', 'debug_voe_sx.html', 'debug_waaw_embed.html', 'debug_waaw_to.html',
+             'debug/series24_page.html', 'PELICULAS-SERIES-ANIME/anime/debug_episodio.html']
+    for name in pages:
+        html = _read(name)
+        cases.append((f'_find_m3u8_in_html | {name}',
+                      _cold(lambda html=html, name=name: sp._find_m3u8_in_html(html, f'https://{name}'))))
+
+    for name in ['debug_streamwish.html', 'debug_callistanise_com.html', 'debug_waaw_embed.html',
+                 'debug_lauradaydo_com.html']:
+        html = _read(name)
+        cases.append((f'_find_and_unpack_evals | {name}', _cold(lambda html=html: sp._find_and_unpack_evals(html))))
+
+    for name in ['debug_streamwish.html', 'debug_callistanise_com.html']:
+        unpacked = sp._find_and_unpack_evals(_read(name))[0]
+        cases.append((f'extract_video_urls | {name} (desempaquetado)', lambda js=unpacked: se.extract_video_urls(js)))
+    for name in ['debug_voe_sx.html', 'debug_waaw_embed.html']:
+        html = _read(name)
+        cases.append((f'extract_video_urls | {name}', lambda html=html: se.extract_video_urls(html)))
+
+    # Poseidon __NEXT_DATA__
+    movies_mod = _load_module('scraper_poseidon_movies', 'PELICULAS-SERIES-ANIME/peliculas/scraper_poseidon_movies.py')
+    series_mod = _load_module('scraper_poseidon_series', 'PELICULAS-SERIES-ANIME/series/scraper_poseidon_series.py')
+    logging.disable(logging.WARNING)
+    movies = movies_mod.PoseidonMoviesScraper(extract_m3u8=False)
+    series = series_mod.PoseidonSeriesScraper()
+    next_page = synthetic_next_page()
+    no_next = _read('debug/series24_page.html')
+    cases.append(('poseidon_movies._get_next_data | página sintética', lambda: movies._get_next_data(next_page)))
+    cases.append(('poseidon_movies._get_next_data | debug/series24_page.html (sin datos)', lambda: movies._get_next_data(no_next)))
+    cases.append(('poseidon_series._get_next_data | página sintética', lambda: series._get_next_data(next_page)))
+
+    # Henaojara: página del episodio + respuesta AJAX de servidores
+    hena_mod = _load_module('scraper_henaojara_anime', 'PELICULAS-SERIES-ANIME/anime/scraper_henaojara_anime.py')
+    logging.disable(logging.WARNING)
+    episodio = _read('PELICULAS-SERIES-ANIME/anime/debug_episodio.html')
+    for name, ajax in [('debug_ajax.html', _read('PELICULAS-SERIES-ANIME/anime/debug_ajax.html')),
+                       ('ajax sintético (12 servidores)', synthetic_henaojara_ajax())]:
+        hena = hena_mod.HenaojaraAnimeScraper()
+
+        class _Session:
+            def get(self, url, **kwargs):
+                return _FakeResponse(episodio, url)
+
+            def post(self, url, ajax=ajax, **kwargs):
+                return _FakeResponse(ajax, url)
+        hena.session = _Session()
+        cases.append((f'henaojara.extraer_servidores_episodio | debug_episodio.html + {name}',
+                      lambda hena=hena: hena.extraer_servidores_episodio(f'{hena_mod.BASE_URL}/ver/episodio-1')))
+    return cases
+
+
+def reference_workload():
+    """Carga fija (regex + JSON, sin red ni parsers del repo) que sirve de unidad de medida de la máquina."""
+    html = _read('debug_tvlibree.html')
+    with open(os.path.join(ROOT, 'peliculas.json'), encoding='utf-8') as f:
+        data = json.load(f)[:20]
+
+    def _run():
+        re.findall(r'<a\s[^>]*href="([^"]+)"', html)
+        return json.loads(json.dumps(data))
+    return _run
+
+
+def _cold(fn):
+    """`fn` precedida de vaciar las caches lru que atraviesa."""
+    def _run():
+        sp.js_unpacker.unpack_payload.cache_clear()
+        sp.fix_encoding.cache_clear()
+        return fn()
+    return _run
+
+
+def _rate(fn, seconds: float) -> float:
+    iterations, elapsed = 0, 0.0
+    start = time.perf_counter()
+    while elapsed < seconds:
+        fn()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+    return iterations / elapsed
+
+
+def measure(fn, reference, min_time: float, rounds: int):
+    """
+    (ops/seg, ops/seg relativos a `reference`, memoria pico en KiB) de `fn`.
+
+    Caso y referencia se alternan en `rounds` rondas, así una racha de carga de
+    la máquina pega en los dos; el relativo es la mediana de las rondas y los
+    ops/seg la mejor, como timeit.
+    """
+    fn()  # calentamiento (imports perezosos, caches de regex)
+    reference()
+    slot = min_time / rounds
+    best, ratios = 0.0, []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            ops = _rate(fn, slot)
+            ratios.append(ops / _rate(reference, slot / 2))
+            best = max(best, ops)
+    finally:
+        gc.enable()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, statistics.median(ratios), peak / 1024
+
+
+def run_suite(cases, reference, args):
+    """{caso: (ops/seg, relativo, pico KiB)} de una pasada completa."""
+    results = {}
+    for name, fn in cases:
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = measure(fn, reference, args.min_time, args.rondas)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--save', action='store_true', help='guardar los resultados como nuevas baselines')
+    parser.add_argument('--pasadas', type=int, default=3, help='pasadas completas con --save (default: 3)')
+    parser.add_argument('--filter', default='', help='solo casos cuyo nombre contenga este texto')
+    parser.add_argument('--min-time', type=float, default=1.0, help='segundos mínimos por caso')
+    parser.add_argument('--rondas', type=int, default=5, help='rondas caso/referencia alternadas por caso')
+    parser.add_argument('--tolerancia', type=float, default=25.0, help='%% de variación tolerada (mínimo por caso)')
+    parser.add_argument('--estricto', action='store_true', help='código de salida 1 si hay regresiones')
+    args = parser.parse_args()
+
+    baselines = {}
+    if os.path.exists(BASELINES_FILE):
+        with open(BASELINES_FILE, encoding='utf-8') as f:
+            baselines = json.load(f)
+
+    cases = build_cases()
+    reference = reference_workload()
+
+    if args.save:
+        passes = [run_suite(cases, reference, args) for _ in range(max(1, args.pasadas))]
+        print(f"{'caso':<92}{'ops/seg':>11}{'pico KiB':>10}{'tol.':>7}")
+        for name in passes[0]:
+            relatives = [p[name][1] for p in passes]
+            median = statistics.median(relatives)
+            # Margen: el doble de la peor desviación observada entre pasadas
+            spread = max(abs(r / median - 1) for r in relatives) * 100
+            tolerance = max(args.tolerancia, round(2 * spread))
+            ops = max(p[name][0] for p in passes)
+            peak = max(p[name][2] for p in passes)
+            baselines[name] = {'ops_per_sec': round(ops, 2), 'ops_relative': round(median, 6),
+                               'peak_kib': round(peak, 1), 'tolerancia': tolerance}
+            print(f'{name:<92}{ops:>11.1f}{peak:>10.1f}{tolerance:>6.0f}%')
+        with open(BASELINES_FILE, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nBaselines guardadas en {os.path.relpath(BASELINES_FILE, ROOT)}')
+        return 0
+
+    regressions = 0
+    print(f"{'caso':<92}{'ops/seg':>11}{'pico KiB':>10}{'Δops':>9}{'Δmem':>9}")
+    for name, (ops, relative, peak) in run_suite(cases, reference, args).items():
+        base = baselines.get(name)
+        d_ops = d_mem = ''
+        flag = ''
+        if base and base.get('ops_relative'):
+            ops_pct = (relative / base['ops_relative'] - 1) * 100
+            mem_pct = (peak / base['peak_kib'] - 1) * 100 if base['peak_kib'] else 0.0
+            d_ops, d_mem = f'{ops_pct:+.0f}%', f'{mem_pct:+.0f}%'
+            if ops_pct < -max(args.tolerancia, base.get('tolerancia', 0)) or mem_pct > args.tolerancia:
+                flag = '  REGRESIÓN'
+                regressions += 1
+        print(f'{name:<92}{ops:>11.1f}{peak:>10.1f}{d_ops:>9}{d_mem:>9}{flag}')
+
+    if regressions:
+        print(f'\n{regressions} regresiones respecto de {os.path.relpath(BASELINES_FILE, ROOT)}')
+        if args.estricto:
+            return 1
+    else:
+        print(f'\nSin regresiones respecto de {os.path.relpath(BASELINES_FILE, ROOT)}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Benchmark de clasificación (infer_logo / infer_pais / infer_deporte /
+infer_liga_from_equipos) sobre partidos.json.
+Compara el autómata Aho-Corasick actual contra el escaneo lineal anterior y
+verifica que ambos den exactamente el mismo resultado.
+
+Uso: python benchmarks/bench_infer.py [ruta/partidos.json] [repeticiones]
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import scraper_partidos as sp  # noqa: E402
+
+
+# --- Implementaciones anteriores (escaneo lineal de cada tabla) ---
+
+def legacy_infer_deporte(liga: str, equipos: str) -> str:
+    liga_lower = sp.normalize_text(liga)
+    if liga_lower.startswith("basketball") or liga_lower in ["nba"] or "euroliga" in liga_lower or "euroleague" in liga_lower:
+        return "Basketball"
+    if "olympic" in liga_lower or "olympics" in liga_lower or "juegos olimpicos" in liga_lower:
+        return "Juegos Olímpicos"
+    if liga_lower.startswith("hockey") or "ice hockey" in liga_lower:
+        return "Hockey"
+    if "formula 1" in liga_lower or "formula1" in liga_lower or liga_lower == "f1":
+        return "Fórmula 1"
+    if liga_lower.startswith("rugby"):
+        return "Rugby"
+    if liga_lower.startswith("tennis") or liga_lower.startswith("tenis"):
+        return "Tenis"
+    for deporte in sp.DEPORTE_PRIORIDAD:
+        for keyword in sp.DEPORTE_KEYWORDS.get(deporte, []):
+            if keyword.lower() in liga_lower:
+                return sp.DEPORTE_NOMBRES.get(deporte, deporte.capitalize())
+    text_equipos = sp.normalize_text(equipos)
+    for deporte in sp.DEPORTES_SEGUROS_EQUIPOS:
+        for keyword in sp.DEPORTE_KEYWORDS.get(deporte, []):
+            if keyword.lower() in text_equipos:
+                return sp.DEPORTE_NOMBRES.get(deporte, deporte.capitalize())
+    return "Deportes"
+
+
+def legacy_infer_pais(liga: str) -> str:
+    text = sp.normalize_text(liga)
+    for liga_key, pais in sp.PAIS_POR_LIGA.items():
+        if liga_key in text:
+            return pais
+    return ""
+
+
+def legacy_infer_logo(liga: str, equipos: str) -> str:
+    text = sp.normalize_text(liga)
+    best_match = ""
+    best_key_len = 0
+    for liga_key, logo_url in sp.LIGA_LOGOS.items():
+        if liga_key in text and len(liga_key) > best_key_len:
+            best_match = logo_url
+            best_key_len = len(liga_key)
+    if best_match:
+        return best_match
+    text_equipos = sp.normalize_text(equipos)
+    for liga_key, logo_url in sp.LIGA_LOGOS.items():
+        if liga_key in text_equipos:
+            return logo_url
+    if legacy_infer_deporte(liga, equipos) == "Basketball":
+        return "https://png.pngtree.com/png-vector/20250708/ourmid/pngtree-orange-basketball-png-image_16721120.webp"
+    pais = legacy_infer_pais(liga)
+    if pais and pais.lower() in sp.BANDERAS_PAIS:
+        return sp.BANDERAS_PAIS[pais.lower()]
+    return ""
+
+
+def legacy_infer_liga_from_equipos(equipos: str) -> str:
+    if not equipos:
+        return ""
+    text = sp.normalize_text(equipos)
+    for equipo, liga in sp.EQUIPOS_LIGA.items():
+        if equipo in text:
+            return liga
+    for word in text.split():
+        if len(word) >= 4:
+            for equipo, liga in sp.EQUIPOS_LIGA.items():
+                if word == equipo or equipo in word:
+                    return liga
+    return ""
+
+
+def classify(events, infer_logo, infer_pais, infer_deporte, infer_liga_from_equipos):
+    out = []
+    for ev in events:
+        liga, equipos = ev.get("liga", ""), ev.get("equipos", "")
+        out.append((infer_logo(liga, equipos), infer_pais(liga), infer_deporte(liga, equipos),
+                    infer_liga_from_equipos(equipos)))
+    return out
+
+
+def bench(label, fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<10} {elapsed / repeat * 1000:8.2f} ms/agenda")
+    return result, elapsed
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else str(sp.OUTPUT_JSON)
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with open(path, "r", encoding="utf-8") as f:
+        events = json.load(f)
+
+    # Liga y equipos cruzados también (casos de build_event/choose_liga)
+    samples = events + [{"liga": ev.get("equipos", ""), "equipos": ev.get("liga", "")} for ev in events]
+    print(f"Clasificando {len(samples)} entradas x {repeat} repeticiones")
+
+    legacy, t_legacy = bench("lineal", lambda: classify(samples, legacy_infer_logo, legacy_infer_pais, legacy_infer_deporte,
+                                                      legacy_infer_liga_from_equipos), repeat)
+    current, t_current = bench("automata", lambda: classify(samples, sp.infer_logo, sp.infer_pais, sp.infer_deporte,
+                                                          sp.infer_liga_from_equipos), repeat)
+
+    mismatches = [(s, a, b) for s, a, b in zip(samples, legacy, current) if a != b]
+    for sample, a, b in mismatches[:10]:
+        print("  DIFERENCIA:", sample.get("liga"), "|", sample.get("equipos"), "->", a, "!=", b)
+    print(f"  Paridad: {len(samples) - len(mismatches)}/{len(samples)}  Speedup: {t_legacy / t_current:.1f}x")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Micro-benchmark y test de paridad de nextjs_data.extract_next_data contra el
+_get_next_data anterior de los scrapers Poseidon (BeautifulSoup completo + find
+del <script id="__NEXT_DATA__">).
+
+Páginas:
+  - las capturas del repo (debug_*.html, debug/series24_page.html): sin __NEXT_DATA__
+  - la página Next.js sintética de bench_fixtures (HTML real + __NEXT_DATA__ de
+    peliculas.json), con 30 y 200 películas
+  - variantes de tag (comillas simples, atributos antes del id, id mencionado en
+    otro script antes del tag real, JSON inválido)
+  - si hay grabaciones de http_replay (--archive, default http_archive/), todas
+    las respuestas de poseidonhd2.co capturadas: SCRAPER_HTTP_MODE=record
+    python PELICULAS-SERIES-ANIME/peliculas/scraper_poseidon_movies.py --max-movies 20 --no-m3u8
+
+Uso: python benchmarks/bench_next_data.py [--archive DIR] [--iteraciones N]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import nextjs_data  # noqa: E402
+from bench_fixtures import _read, synthetic_next_page  # noqa: E402
+
+FIXTURES = ['debug_streamwish.html', 'debug_waaw_embed.html', 'debug_voe_sx.html', 'debug_animeonline.html',
+            'debug/series24_page.html']
+
+
+def legacy_get_next_data(html_text: str):
+    """_get_next_data anterior (idéntico en movies, series y recent_episodes)."""
+    try:
+        soup = BeautifulSoup(html_text, "html.parser")
+        script = soup.find("script", id="__NEXT_DATA__")
+        if script:
+            content = script.string if script.string else script.get_text(strip=False)
+            if content:
+                return json.loads(content)
+    except Exception:
+        pass
+    return None
+
+
+def edge_pages(base: str) -> dict:
+    payload = json.dumps({'props': {'pageProps': {'x': '</b> <script>'.replace('<', '\\u003c')}}, 'buildId': 'b'})
+    body = '<html><body><p>hola</p>{}</body></html>'
+    return {
+        'tag con comillas simples': body.format(f"<script id='__NEXT_DATA__' type='application/json'>{payload}</script>"),
+        'atributos antes del id': body.format(f'<script type="application/json" id="__NEXT_DATA__" crossorigin>{payload}</script>'),
+        'id citado en otro script': body.format(
+            '<script>window.x = document.getElementById("__NEXT_DATA__")</script>'
+            f'<script id="__NEXT_DATA__" type="application/json">{payload}</script>'),
+        'JSON inválido': body.format('<script id="__NEXT_DATA__" type="application/json">{"a": </script>'),
+        'script vacío': body.format('<script id="__NEXT_DATA__" type="application/json"></script>'),
+        'sintética grande (200)': base,
+    }
+
+
+def archive_pages(directory: str) -> dict:
+    """Cuerpos HTML de poseidonhd2.co grabados por http_replay."""
+    try:
+        import http_replay
+    except ImportError:
+        return {}
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.json.gz'))):
+        archive = http_replay.HttpArchive.load(path)
+        for key, entries in archive.entries.items():
+            if 'poseidonhd2.co' not in key or '/_next/' in key:
+                continue
+            for entry in entries:
+                body = archive.bodies.get(entry.get('body'))
+                if body and b'<html' in body[:2048].lower():
+                    pages[f"{os.path.basename(path)} {key.split(' ', 1)[1]}"] = body.decode('utf-8', 'replace')
+                    break
+    return pages
+
+
+def _bench(fn, arg, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='extract_next_data vs BeautifulSoup')
+    parser.add_argument('--archive', default=os.path.join(ROOT, 'http_archive'), help='directorio de http_replay')
+    parser.add_argument('--iteraciones', type=int, default=20)
+    args = parser.parse_args()
+
+    pages = {name: _read(name) for name in FIXTURES}
+    pages['sintética (30 películas)'] = synthetic_next_page(30)
+    pages.update(edge_pages(synthetic_next_page(200)))
+    captured = archive_pages(args.archive)
+    pages.update(captured)
+    if not captured:
+        print(f"(sin grabaciones de poseidonhd2.co en {args.archive}; solo capturas del repo y sintéticas)")
+
+    print("== Paridad ==")
+    for name, html in pages.items():
+        legacy = legacy_get_next_data(html)
+        new = nextjs_data.extract_next_data(html)
+        assert new == legacy, f"{name}: extract_next_data difiere"
+        print(f"  {name}: {'__NEXT_DATA__ OK' if new else 'sin datos OK'}")
+
+    print(f"\n== Tiempo por página ({args.iteraciones} iteraciones) ==")
+    print(f"  {'página':<40}{'KiB':>8}{'soup ms':>10}{'nuevo ms':>10}")
+    total_old = total_new = 0.0
+    for name, html in pages.items():
+        t_old = _bench(legacy_get_next_data, html, args.iteraciones)
+        t_new = _bench(nextjs_data.extract_next_data, html, args.iteraciones)
+        total_old += t_old
+        total_new += t_new
+        print(f"  {name[:40]:<40}{len(html) / 1024:>8.0f}{t_old:>10.3f}{t_new:>10.3f}   x{t_old / max(t_new, 1e-6):.0f}")
+    print(f"  {'total':<40}{'':>8}{total_old:>10.3f}{total_new:>10.3f}   x{total_old / max(total_new, 1e-6):.0f}")
+
+
+if __name__ == '__main__':
+    main()
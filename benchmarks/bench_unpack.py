@@ -0,0 +1,123 @@
+"""
+Micro-benchmark y test de paridad del desempaquetador p,a,c,k,e,d compartido
+(js_unpacker) contra las dos implementaciones anteriores:
+scraper_partidos._unpack_js/_find_and_unpack_evals y scraper_embed_extractor.unpack_js.
+
+Fixtures: debug_streamwish.html, debug_callistanise_com.html (un bloque cada uno),
+debug_waaw_embed.html (página grande sin bloque) y una página sintética con los
+dos players repetidos entre relleno.
+
+Uso: python benchmarks/bench_unpack.py [iteraciones]
+"""
+
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import js_unpacker  # noqa: E402
+
+FIXTURES = ['debug_streamwish.html', 'debug_callistanise_com.html', 'debug_waaw_embed.html']
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def legacy_unpack_js(packed_code: str):
+    """scraper_partidos._unpack_js anterior."""
+    patterns = [
+        r"eval\(function\(p,a,c,k,e,d\)\{.*?\}return p\}\('(.+)',(\d+),(\d+),'([^']+)'\.split\('\|'\)",
+        r"eval\(function\(p,a,c,k,e,d\)\{.*?\}\('(.+)',(\d+),(\d+),'([^']+)'\.split\('\|'\)",
+    ]
+    match = None
+    for pat in patterns:
+        match = re.search(pat, packed_code, re.DOTALL)
+        if match:
+            break
+    if not match:
+        return None
+    p, a, c, k = match.groups()
+    a, c = int(a), int(c)
+    k = k.split('|')
+
+    def _base_encode(num, base):
+        if num == 0:
+            return '0'
+        r = ''
+        while num > 0:
+            r = _DIGITS[num % base] + r
+            num //= base
+        return r or '0'
+
+    d = {}
+    for i in range(c):
+        key = _base_encode(i, a)
+        d[key] = k[i] if i < len(k) and k[i] else key
+    return re.sub(r'\b(\w+)\b', lambda m: d.get(m.group(0), m.group(0)), p)
+
+
+def legacy_find_and_unpack_evals(html: str) -> list:
+    """scraper_partidos._find_and_unpack_evals anterior."""
+    if not html:
+        return []
+    results = []
+    for m in re.finditer(r'eval\(function\(p,a,c,k,e,d\)', html):
+        rest = html[m.start():]
+        end_m = re.search(r"\.split\('\|'\)[^)]*\)\)", rest[:100000])
+        if end_m:
+            unpacked = legacy_unpack_js(rest[:end_m.end()])
+            if unpacked:
+                results.append(unpacked)
+    return results
+
+
+def legacy_embed_unpack(html: str):
+    """Camino anterior de scraper_embed_extractor.extract_from_niramirus."""
+    packed_match = re.search(r"(eval\(function\(p,a,c,k,e,d\)\{.*?\.split\('\|'\)\)\))", html, re.DOTALL)
+    if not packed_match:
+        return None
+    return legacy_unpack_js(packed_match.group(1))
+
+
+def _bench(fn, arg, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    pages = {}
+    for name in FIXTURES:
+        with open(os.path.join(ROOT, name), encoding='utf-8', errors='replace') as f:
+            pages[name] = f.read()
+    filler = pages['debug_waaw_embed.html'][:50000]
+    pages['sintetica (4 bloques)'] = filler.join(
+        [pages['debug_streamwish.html'], pages['debug_callistanise_com.html']] * 2)
+
+    print("== Paridad ==")
+    for name, html in pages.items():
+        legacy = legacy_find_and_unpack_evals(html)
+        new = js_unpacker.unpack_all(html)
+        assert new == legacy, f"{name}: unpack_all difiere"
+        assert js_unpacker.unpack(html) == legacy_embed_unpack(html), f"{name}: unpack difiere"
+        print(f"  {name}: {len(new)} bloques OK")
+
+    print(f"\n== Tiempo por página ({iterations} iteraciones) ==")
+    print(f"  {'fixture':<32}{'anterior ms':>12}{'nuevo ms':>10}{'memo ms':>10}")
+    for name, html in pages.items():
+        t_old = _bench(legacy_find_and_unpack_evals, html, iterations)
+        js_unpacker.unpack_payload.cache_clear()
+
+        def _cold(h):
+            js_unpacker.unpack_payload.cache_clear()
+            return js_unpacker.unpack_all(h)
+        t_new = _bench(_cold, html, iterations)
+        t_memo = _bench(js_unpacker.unpack_all, html, iterations)
+        print(f"  {name:<32}{t_old:>12.3f}{t_new:>10.3f}{t_memo:>10.3f}   x{t_old / t_new:.1f} / x{t_old / t_memo:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Registro de extractores de video por dominio, compartido por scraper_partidos
+(m3u8 de canales en vivo) y scraper_embed_extractor (embeds de películas/series).
+
+Cada extractor registra los sufijos de host que atiende y su despacho es una
+única búsqueda en un trie de sufijos de hostname (por etiquetas, de derecha a
+izquierda: gana el sufijo más largo). Las familias de mirrors rotativos
+(streamtp10.com, streamtpcloud.com...) se registran además por palabra clave,
+que solo se consulta si el trie no encuentra nada.
+
+`requires_js` marca los hosts que arman la URL del video en JavaScript: con
+`func` el extractor es un intento estático best-effort; sin `func` el host no
+es extraíble sin un runtime JS y chain() lo omite (igual que a un host sin
+extractor implementado, pero con otro motivo en el log).
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExtractorSpec:
+    """Metadatos de un extractor registrado."""
+    name: str
+    func: Optional[Callable[..., Any]]   # None: sin extractor (ver requires_js)
+    suffixes: Tuple[str, ...] = ()
+    keywords: Tuple[str, ...] = ()
+    requires_js: bool = False            # La página arma la URL en JS
+    needs_referer: bool = False          # func(url, referer) en vez de func(url)
+    fallback: Tuple[str, ...] = ()       # Extractores a probar, en orden, si este falla
+
+    @property
+    def unavailable(self) -> Optional[str]:
+        """Motivo por el que el extractor no se puede ejecutar (None si se puede)."""
+        if self.func is not None:
+            return None
+        return "requiere JS runtime" if self.requires_js else "sin extractor implementado"
+
+
+class HostSuffixTrie:
+    """Trie de etiquetas de hostname invertidas: 'a.b.com' -> com -> b -> a."""
+
+    _END = object()
+
+    def __init__(self):
+        self._root: Dict[Any, Any] = {}
+
+    def add(self, suffix: str, value: Any) -> None:
+        node = self._root
+        for label in reversed(suffix.lower().strip(".").split(".")):
+            node = node.setdefault(label, {})
+        node[self._END] = value
+
+    def lookup(self, host: str) -> Optional[Any]:
+        """Valor del sufijo registrado más largo que cubre `host` (None si ninguno)."""
+        node = self._root
+        found = None
+        for label in reversed(host.lower().rstrip(".").split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get(self._END, found)
+        return found
+
+
+class ExtractorRegistry:
+    """
+    Tabla nombre -> ExtractorSpec con despacho por hostname.
+    `default` es el nombre devuelto cuando ningún extractor cubre el host.
+    """
+
+    def __init__(self, default: str):
+        self.default = default
+        self._specs: Dict[str, ExtractorSpec] = {}
+        self._trie = HostSuffixTrie()
+        self._keywords: List[Tuple[str, str]] = []
+
+    def register(self, name: str, func: Optional[Callable[..., Any]] = None, *,
+                 suffixes: Tuple[str, ...] = (), keywords: Tuple[str, ...] = (),
+                 requires_js: bool = False, needs_referer: bool = False,
+                 fallback: Tuple[str, ...] = ()) -> ExtractorSpec:
+        if name in self._specs:
+            raise ValueError(f"Extractor ya registrado: {name}")
+        spec = ExtractorSpec(name, func, tuple(suffixes), tuple(keywords),
+                             requires_js, needs_referer, tuple(fallback))
+        self._specs[name] = spec
+        for suffix in spec.suffixes:
+            self._trie.add(suffix, name)
+        for kw in spec.keywords:
+            self._keywords.append((kw.lower(), name))
+        return spec
+
+    def detect(self, url: str) -> str:
+        """Nombre del extractor para `url` (o `default`)."""
+        host = (urlparse(url).hostname or "").lower()
+        name = self._trie.lookup(host)
+        if name is not None:
+            return name
+        for kw, kw_name in self._keywords:
+            if kw in host:
+                return kw_name
+        return self.default
+
+    def get(self, name: str) -> Optional[ExtractorSpec]:
+        return self._specs.get(name)
+
+    def chain(self, name: str) -> List[ExtractorSpec]:
+        """
+        El extractor `name` seguido de sus fallbacks registrados, sin repetidos.
+        Los que no se pueden ejecutar (requires_js sin func, o sin implementar) se omiten.
+        """
+        result: List[ExtractorSpec] = []
+        seen = set()
+        for n in (name,) + (self._specs[name].fallback if name in self._specs else ()):
+            spec = self._specs.get(n)
+            if spec is None or n in seen:
+                continue
+            seen.add(n)
+            if spec.unavailable:
+                logger.debug("Extractor %s omitido: %s", n, spec.unavailable)
+                continue
+            result.append(spec)
+        return result
+
+    def call(self, spec: ExtractorSpec, url: str, referer: Optional[str] = None) -> Any:
+        if spec.needs_referer:
+            return spec.func(url, referer)
+        return spec.func(url)
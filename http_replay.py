@@ -0,0 +1,221 @@
+"""
+Capa de grabación/reproducción HTTP para correr los scrapers sin red.
+
+Se engancha en requests.adapters.HTTPAdapter.send, así que cubre todas las
+requests.Session (incluidas las de los clientes con pool propio) y los
+requests.get/post sueltos, que internamente usan una sesión descartable.
+
+Se activa por variables de entorno (run_all_scrapers.py las pasa a cada
+subproceso tal cual):
+
+  SCRAPER_HTTP_MODE     off (default) | record | replay
+  SCRAPER_HTTP_ARCHIVE  directorio de archivos (default: ./http_archive);
+                        un <script>.json.gz por proceso
+  SCRAPER_HTTP_LATENCY  en replay: milisegundos fijos por request (default 0)
+                        o "recorded" para reproducir la latencia grabada
+
+En record se hacen las requests reales y se guardan los pares request/response
+al salir. En replay no sale nada a la red: cada request se responde desde el
+archivo (en el orden grabado si la misma request se repitió) y una request que
+no está grabada falla con ConnectionError, igual que un sitio caído.
+
+Formato: JSON gzip con las respuestas por clave "MÉTODO URL [sha1 del body]"
+y los cuerpos deduplicados por sha1 (las páginas repetidas se guardan una vez).
+"""
+
+import atexit
+import base64
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+MODE_ENV = "SCRAPER_HTTP_MODE"
+ARCHIVE_ENV = "SCRAPER_HTTP_ARCHIVE"
+LATENCY_ENV = "SCRAPER_HTTP_LATENCY"
+DEFAULT_ARCHIVE_DIR = "http_archive"
+ARCHIVE_VERSION = 1
+
+# Cabeceras que no se guardan: el cuerpo ya está decodificado y las cookies son de sesión
+_DROP_HEADERS = {"set-cookie", "content-encoding", "content-length", "transfer-encoding"}
+_ERRORS = {
+    "ConnectTimeout": requests.ConnectTimeout,
+    "ReadTimeout": requests.ReadTimeout,
+    "Timeout": requests.Timeout,
+    "SSLError": requests.exceptions.SSLError,
+    "TooManyRedirects": requests.TooManyRedirects,
+}
+
+
+def request_key(request: requests.PreparedRequest) -> str:
+    key = f"{request.method} {request.url}"
+    body = request.body
+    if body:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if isinstance(body, bytes):
+            key += " " + hashlib.sha1(body).hexdigest()[:16]
+    return key
+
+
+class HttpArchive:
+    """Pares request/response de un proceso, con cuerpos deduplicados por hash."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self.bodies: Dict[str, bytes] = {}
+        self._cursor: Dict[str, int] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "HttpArchive":
+        archive = cls()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        archive.entries = data.get("entries", {})
+        archive.bodies = {h: base64.b64decode(b) for h, b in data.get("bodies", {}).items()}
+        return archive
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            data = {
+                "version": ARCHIVE_VERSION,
+                "entries": self.entries,
+                "bodies": {h: base64.b64encode(b).decode("ascii") for h, b in self.bodies.items()},
+            }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def record(self, key: str, entry: Dict[str, Any], body: Optional[bytes] = None) -> None:
+        with self._lock:
+            if body is not None:
+                digest = hashlib.sha1(body).hexdigest()
+                self.bodies.setdefault(digest, body)
+                entry["body"] = digest
+            self.entries.setdefault(key, []).append(entry)
+
+    def next(self, key: str) -> Optional[Dict[str, Any]]:
+        """Siguiente respuesta grabada para `key` (la última se repite)."""
+        with self._lock:
+            recorded = self.entries.get(key)
+            if not recorded:
+                return None
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = i + 1
+            return recorded[min(i, len(recorded) - 1)]
+
+
+class _Transport:
+    def __init__(self, mode: str, archive: HttpArchive, path: str, latency: str):
+        self.mode = mode
+        self.archive = archive
+        self.path = path
+        self.latency = latency
+        self.original_send = HTTPAdapter.send
+
+    def send(self, adapter: HTTPAdapter, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.mode == "record":
+            return self._record(adapter, request, **kwargs)
+        return self._replay(adapter, request, kwargs.get("timeout"))
+
+    def _record(self, adapter, request, **kwargs):
+        start = time.time()
+        try:
+            response = self.original_send(adapter, request, **kwargs)
+            body = response.content
+        except requests.RequestException as e:
+            self.archive.record(request_key(request), {
+                "error": type(e).__name__, "message": str(e), "elapsed": round(time.time() - start, 3)})
+            raise
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS}
+        self.archive.record(request_key(request), {
+            "status": response.status_code, "reason": response.reason, "url": response.url,
+            "headers": headers, "elapsed": round(time.time() - start, 3)}, body)
+        return response
+
+    def _replay(self, adapter, request, timeout):
+        entry = self.archive.next(request_key(request))
+        if entry is None:
+            raise requests.ConnectionError(f"http_replay: sin grabación para {request.method} {request.url}",
+                                           request=request)
+        delay = entry.get("elapsed", 0.0) if self.latency == "recorded" else float(self.latency or 0) / 1000
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            raise requests.ReadTimeout(f"http_replay: latencia simulada {delay:.1f}s > timeout", request=request)
+        if delay > 0:
+            time.sleep(delay)
+        if "error" in entry:
+            raise _ERRORS.get(entry["error"], requests.ConnectionError)(entry.get("message", ""), request=request)
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry.get("reason", "")
+        response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = entry.get("url") or request.url
+        content = self.archive.bodies.get(entry.get("body"), b"")
+        response._content = content
+        response._content_consumed = True
+        # raw en memoria (sin headers: el cuerpo grabado ya está decodificado) para
+        # que iter_content/iter_lines, stream=True y close() se comporten como en vivo
+        response.raw = urllib3.HTTPResponse(body=io.BytesIO(content), status=entry["status"],
+                                            reason=response.reason, preload_content=False)
+        response.request = request
+        response.connection = adapter
+        return response
+
+    def save(self) -> None:
+        self.archive.save(self.path)
+        logger.info("http_replay: %d requests grabadas en %s",
+                    sum(len(v) for v in self.archive.entries.values()), self.path)
+
+
+_transport: Optional[_Transport] = None
+
+
+def install(mode: str, path: str, latency: str = "0") -> None:
+    """Activa record/replay para todo el proceso (idempotente)."""
+    global _transport
+    if _transport is not None or mode not in ("record", "replay"):
+        return
+    if mode == "replay":
+        archive = HttpArchive.load(path)
+    else:
+        archive = HttpArchive()
+    _transport = _Transport(mode, archive, path, latency)
+
+    def _send(adapter, request, **kwargs):
+        return _transport.send(adapter, request, **kwargs)
+
+    HTTPAdapter.send = _send
+    if mode == "record":
+        atexit.register(_transport.save)
+    logger.info("http_replay: modo %s (%s)", mode, path)
+
+
+def install_from_env(name: Optional[str] = None) -> None:
+    """install() según SCRAPER_HTTP_*; `name` (default: script en ejecución) nombra el archivo."""
+    mode = os.environ.get(MODE_ENV, "off").strip().lower()
+    if mode not in ("record", "replay"):
+        return
+    name = name or os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0]
+    directory = os.environ.get(ARCHIVE_ENV) or DEFAULT_ARCHIVE_DIR
+    install(mode, os.path.join(directory, f"{name}.json.gz"), os.environ.get(LATENCY_ENV, "0"))
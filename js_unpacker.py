@@ -0,0 +1,106 @@
+"""
+Desempaquetador compartido del packer de Dean Edwards (eval(function(p,a,c,k,e,d){...})),
+usado por scraper_partidos (players de canales) y scraper_embed_extractor (embeds).
+
+Recorre la página con offsets (sin copiar el resto del HTML por cada bloque),
+decodifica las claves base-N solo para las palabras que aparecen en el payload
+y memoiza el resultado por payload: los mismos players se repiten entre canales.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+PACKER_MARKER = "eval(function(p,a,c,k,e,d)"
+_HEADER = PACKER_MARKER + "{"
+_SPLIT = ".split('|')"
+_MAX_BLOCK = 100000  # Un bloque empaquetado no se busca más allá de esto desde su eval
+
+_BLOCK_END_RE = re.compile(r"\.split\('\|'\)[^)]*\)\)")
+_TAIL_RE = re.compile(r"',(\d+),(\d+),'([^']+)'\.split\('\|'\)")
+_WORD_SPLIT_RE = re.compile(r"(\w+)")
+_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_DIGIT_VALUE = {ch: i for i, ch in enumerate(_DIGITS)}
+
+
+def _locate(html: str, start: int, end: int) -> Optional[Tuple[int, int, str, str, str]]:
+    """(inicio_p, fin_p, a, c, k) del bloque que empieza en `start` y termina antes de `end`."""
+    if not html.startswith(_HEADER, start):
+        return None
+    split_pos = html.rfind(_SPLIT, start, end)
+    if split_pos < 0:
+        return None
+    quote = html.rfind("'", start, split_pos - 1)
+    if quote < 0:
+        return None
+    tail = _TAIL_RE.search(html, max(start, quote - 64), split_pos + len(_SPLIT))
+    if not tail or tail.end() != split_pos + len(_SPLIT):
+        return None
+    body = start + len(_HEADER)
+    p_start = html.find("}return p}('", body, tail.start())
+    if p_start >= 0:
+        p_start += len("}return p}('")
+    else:
+        p_start = html.find("}('", body, tail.start())
+        if p_start < 0:
+            return None
+        p_start += len("}('")
+    if p_start >= tail.start():
+        return None
+    a, c, k = tail.groups()
+    return p_start, tail.start(), a, c, k
+
+
+def iter_packed(html: str) -> Iterator[Tuple[str, int, int, str]]:
+    """Genera (p, a, c, k) de cada bloque empaquetado de `html`, en orden."""
+    if not html:
+        return
+    pos = html.find(PACKER_MARKER)
+    while pos >= 0:
+        end_m = _BLOCK_END_RE.search(html, pos, min(len(html), pos + _MAX_BLOCK))
+        if end_m:
+            found = _locate(html, pos, end_m.end())
+            if found:
+                p_start, p_end, a, c, k = found
+                yield html[p_start:p_end], int(a), int(c), k
+        pos = html.find(PACKER_MARKER, pos + 1)
+
+
+def _decode_key(word: str, a: int) -> int:
+    """Valor de `word` como clave base-`a` canónica (-1 si no lo es)."""
+    if word[0] == "0" and word != "0":
+        return -1
+    n = 0
+    for ch in word:
+        d = _DIGIT_VALUE.get(ch)
+        if d is None or d >= a:
+            return -1
+        n = n * a + d
+    return n
+
+
+@lru_cache(maxsize=256)
+def unpack_payload(p: str, a: int, c: int, k: str) -> str:
+    """Sustituye cada palabra base-`a` menor que `c` por su entrada en `k`."""
+    words = k.split("|")
+    # split con grupo alterna [no-palabra, palabra, no-palabra, ...]; solo se
+    # decodifican las palabras distintas y el reemplazo queda en C (map + join)
+    parts = _WORD_SPLIT_RE.split(p)
+    mapping = {}
+    for word in set(parts[1::2]):
+        n = _decode_key(word, a)
+        mapping[word] = words[n] if 0 <= n < c and n < len(words) and words[n] else word
+    parts[1::2] = map(mapping.__getitem__, parts[1::2])
+    return "".join(parts)
+
+
+def unpack(packed_code: str) -> Optional[str]:
+    """Desempaqueta el primer bloque p,a,c,k,e,d de `packed_code` (None si no hay)."""
+    for p, a, c, k in iter_packed(packed_code):
+        return unpack_payload(p, a, c, k)
+    return None
+
+
+def unpack_all(html: str) -> List[str]:
+    """Desempaqueta todos los bloques p,a,c,k,e,d de `html`."""
+    return [unpack_payload(p, a, c, k) for p, a, c, k in iter_packed(html)]
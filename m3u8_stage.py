@@ -0,0 +1,126 @@
+"""
+Etapa de resolución de m3u8 en segundo plano para los crawlers de películas/series.
+
+El crawler encola los dicts de servidor que ya forman parte del registro junto con
+su URL de embed y sigue con la página siguiente; un pool de threads propio resuelve
+cada embed (scraper_embed_extractor.extract_from_embed por defecto) y escribe
+`m3u8_url` en el mismo dict. Así el crawl de páginas no espera a los hosts de
+embeds lentos (timeouts de 30 s) y cada etapa avanza a su ritmo.
+
+Un mismo embed encolado varias veces se resuelve una sola vez y el resultado se
+escribe en todos los servidores que lo pidieron. close() espera lo encolado antes
+de guardar el JSON.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+M3U8_FIELD = "m3u8_url"
+
+try:
+    from scraper_embed_extractor import extract_from_embed
+    EMBED_EXTRACTOR_AVAILABLE = True
+except ImportError:
+    EMBED_EXTRACTOR_AVAILABLE = False
+
+
+def resolve_embed_m3u8(embed_url: str) -> Optional[str]:
+    """best_url de extract_from_embed (None si no hay extractor o no se pudo resolver)."""
+    if not EMBED_EXTRACTOR_AVAILABLE or not embed_url:
+        return None
+    try:
+        result = extract_from_embed(embed_url)
+    except Exception as exc:
+        logger.debug(f"Error extrayendo m3u8 de {embed_url}: {exc}")
+        return None
+    if result and result.get("best_url"):
+        return result["best_url"]
+    logger.debug(f"No se pudo extraer m3u8 de {embed_url}: {(result or {}).get('error', 'Sin resultado')}")
+    return None
+
+
+class M3u8Stage:
+    """Cola + pool de threads que completa `m3u8_url` en los dicts de servidor encolados."""
+
+    def __init__(self, resolve: Callable[[str], Optional[str]] = resolve_embed_m3u8, workers: int = 4,
+                 field: str = M3U8_FIELD):
+        self.resolve = resolve
+        self.field = field
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._waiting: Dict[str, List[Dict]] = {}
+        self._results: Dict[str, Optional[str]] = {}
+        self._closed = False
+        self.stats = {"queued": 0, "resolved": 0, "failed": 0, "reused": 0}
+        self._started = time.time()
+        self._threads = [threading.Thread(target=self._worker, name=f"m3u8-{i}", daemon=True)
+                         for i in range(max(1, workers))]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, server: Dict, embed_url: str) -> None:
+        """Encola `server` para que reciba el m3u8 de `embed_url` cuando esté resuelto."""
+        if not embed_url or server.get(self.field):
+            return
+        with self._lock:
+            if embed_url in self._results:
+                self.stats["reused"] += 1
+                if self._results[embed_url]:
+                    server[self.field] = self._results[embed_url]
+                return
+            waiting = self._waiting.get(embed_url)
+            if waiting is not None:
+                self.stats["reused"] += 1
+                waiting.append(server)
+                return
+            self._waiting[embed_url] = [server]
+            self.stats["queued"] += 1
+        self._queue.put(embed_url)
+
+    def _worker(self) -> None:
+        while True:
+            embed_url = self._queue.get()
+            if embed_url is None:
+                return
+            try:
+                m3u8_url = self.resolve(embed_url)
+            except Exception as exc:
+                logger.debug(f"Error extrayendo m3u8 de {embed_url}: {exc}")
+                m3u8_url = None
+            with self._lock:
+                if self._closed:
+                    # close() ya volvió por timeout: el registro se está guardando, no tocarlo
+                    return
+                self._results[embed_url] = m3u8_url
+                self.stats["resolved" if m3u8_url else "failed"] += 1
+                for server in self._waiting.pop(embed_url, []):
+                    if m3u8_url and not server.get(self.field):
+                        server[self.field] = m3u8_url
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._waiting)
+
+    def close(self, timeout: Optional[float] = None) -> Dict[str, int]:
+        """Espera a que se resuelva lo encolado (hasta `timeout` segundos) y detiene el pool."""
+        if self.pending():
+            logger.info(f"Esperando resolución de {self.pending()} embeds m3u8 en cola...")
+        for _ in self._threads:
+            self._queue.put(None)
+        deadline = time.time() + timeout if timeout is not None else None
+        for t in self._threads:
+            t.join(None if deadline is None else max(0.0, deadline - time.time()))
+        with self._lock:
+            self._closed = True
+            stats = dict(self.stats, pending=len(self._waiting))
+        logger.info(
+            f"m3u8: {stats['resolved']} resueltos, {stats['failed']} sin URL, {stats['reused']} reutilizados"
+            + (f", {stats['pending']} sin terminar" if stats["pending"] else "")
+            + f" ({time.time() - self._started:.0f}s)"
+        )
+        return stats
@@ -0,0 +1,180 @@
+"""
+Utilidades para páginas Next.js (poseidonhd2.co), compartidas por los scrapers
+de películas, series y episodios recientes.
+
+extract_next_data() ubica <script id="__NEXT_DATA__"> escaneando el texto crudo
+y pasa solo ese tramo al decodificador JSON, sin construir el árbol DOM: el
+BeautifulSoup completo queda para las páginas que de verdad se recorren.
+
+NextDataClient pide las props de cada página directamente al endpoint
+/_next/data/{buildId}{path}.json (solo JSON, sin el HTML alrededor). El buildId
+se descubre una vez por corrida desde el primer HTML; cuando un deploy lo rota
+el endpoint responde 404 y el cliente vuelve solo al HTML, que trae el nuevo.
+"""
+
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+NEXT_DATA_ID = "__NEXT_DATA__"
+
+# Atributo id con cualquier comillado; el resto de los atributos del tag se ignora
+_ID_ATTR_RE = re.compile(r"""\bid\s*=\s*(?:"__NEXT_DATA__"|'__NEXT_DATA__'|__NEXT_DATA__(?=[\s>/]))""", re.I)
+_SCRIPT_END_RE = re.compile(r"</script\s*>", re.I)
+
+
+def find_next_data_span(html_text: str) -> Optional[Tuple[int, int]]:
+    """(inicio, fin) del contenido del primer <script id="__NEXT_DATA__"> (None si no está)."""
+    if not html_text:
+        return None
+    pos = html_text.find(NEXT_DATA_ID)
+    while pos >= 0:
+        tag_start = html_text.rfind("<", 0, pos)
+        tag_end = html_text.find(">", pos)
+        if tag_start >= 0 and tag_end >= 0:
+            tag = html_text[tag_start:tag_end + 1]
+            # El id tiene que ser un atributo de un <script>, no texto dentro de otro script
+            if tag[1:7].lower() == "script" and ">" not in tag[:-1] and _ID_ATTR_RE.search(tag):
+                end = _SCRIPT_END_RE.search(html_text, tag_end + 1)
+                if end:
+                    return tag_end + 1, end.start()
+                return None
+        pos = html_text.find(NEXT_DATA_ID, pos + len(NEXT_DATA_ID))
+    return None
+
+
+def extract_next_data(html_text: str) -> Optional[Dict[str, Any]]:
+    """JSON de __NEXT_DATA__ de `html_text` (None si no está o no es JSON válido)."""
+    span = find_next_data_span(html_text)
+    if not span:
+        return None
+    content = html_text[span[0]:span[1]]
+    if not content.strip():
+        return None
+    try:
+        return json.loads(content)
+    except ValueError as exc:
+        logger.debug(f"Error parseando __NEXT_DATA__: {exc}")
+        return None
+
+
+class NextPage(NamedTuple):
+    """Resultado de NextDataClient.load: `data` con la forma de __NEXT_DATA__ y `html` si vino del HTML."""
+    data: Optional[Dict[str, Any]]
+    html: Optional[str]
+    size: int
+    source: str  # "json" | "html" | "memo" | "error"
+
+
+class NextDataClient:
+    """
+    Props de páginas Next.js vía /_next/data con fallback a HTML.
+
+    `get(url)` es la función de descarga del scraper (sesión, límites por host,
+    headers); `memo_size` páginas recientes se reutilizan sin volver a pedirlas
+    (la misma serie por cada temporada, el mismo episodio para info y servidores).
+    """
+
+    def __init__(self, get: Callable[[str], requests.Response], memo_size: int = 32):
+        self._get = get
+        self.build_id: Optional[str] = None
+        self._memo: "OrderedDict[str, NextPage]" = OrderedDict()
+        self._memo_size = memo_size
+        self._lock = threading.Lock()
+        self.stats = {"json": 0, "json_bytes": 0, "html": 0, "html_bytes": 0, "memo": 0, "rotations": 0}
+
+    def data_url(self, url: str, build_id: str) -> str:
+        parsed = urlparse(url)
+        path = parsed.path.rstrip("/") or "/index"
+        query = f"?{parsed.query}" if parsed.query else ""
+        return f"{parsed.scheme}://{parsed.netloc}/_next/data/{build_id}{path}.json{query}"
+
+    def remember_build_id(self, data: Optional[Dict[str, Any]]) -> None:
+        build_id = data.get("buildId") if isinstance(data, dict) else None
+        if build_id:
+            with self._lock:
+                self.build_id = build_id
+
+    def _count(self, source: str, size: int) -> None:
+        with self._lock:
+            self.stats[source] += 1
+            self.stats[f"{source}_bytes"] += size
+
+    def fetch_json(self, url: str) -> Optional[NextPage]:
+        """Props desde /_next/data (None si no hay buildId o el endpoint no sirve)."""
+        build_id = self.build_id
+        if not build_id:
+            return None
+        try:
+            response = self._get(self.data_url(url, build_id))
+        except requests.RequestException as exc:
+            logger.debug(f"Error pidiendo _next/data para {url}: {exc}")
+            return None
+        if response.status_code == 404:
+            # Deploy nuevo: el buildId cacheado ya no existe; el próximo HTML trae el actual
+            with self._lock:
+                if self.build_id == build_id:
+                    self.build_id = None
+                    self.stats["rotations"] += 1
+            logger.info(f"buildId {build_id} rotado, volviendo a HTML")
+            return None
+        if response.status_code != 200:
+            return None
+        try:
+            payload = response.json()
+        except ValueError:
+            return None
+        props = payload.get("pageProps") if isinstance(payload, dict) else None
+        if not isinstance(props, dict) or "__N_REDIRECT" in props:
+            return None
+        size = len(response.content or b"")
+        self._count("json", size)
+        return NextPage({"props": {"pageProps": props}, "buildId": build_id}, None, size, "json")
+
+    def fetch_html(self, url: str) -> NextPage:
+        """Página HTML completa y su __NEXT_DATA__ (registra el buildId)."""
+        try:
+            response = self._get(url)
+            response.encoding = "utf-8"
+            html_text = response.text
+        except requests.RequestException as exc:
+            logger.error(f"Error descargando {url}: {exc}")
+            return NextPage(None, None, 0, "error")
+        size = len(response.content or b"")
+        self._count("html", size)
+        data = extract_next_data(html_text)
+        self.remember_build_id(data)
+        return NextPage(data, html_text, size, "html")
+
+    def load(self, url: str) -> NextPage:
+        """Props de `url`: memo, /_next/data si hay buildId, o HTML."""
+        with self._lock:
+            page = self._memo.get(url)
+            if page is not None:
+                self._memo.move_to_end(url)
+                self.stats["memo"] += 1
+                return page._replace(source="memo")
+        page = self.fetch_json(url) or self.fetch_html(url)
+        if page.data is not None:
+            with self._lock:
+                self._memo[url] = page
+                while len(self._memo) > self._memo_size:
+                    self._memo.popitem(last=False)
+        return page
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.load(url).data
+
+    def summary(self) -> str:
+        st = self.stats
+        return (f"Next.js: {st['json']} JSON ({st['json_bytes'] / 1048576:.1f} MiB), "
+                f"{st['html']} HTML ({st['html_bytes'] / 1048576:.1f} MiB), "
+                f"{st['memo']} reutilizadas, {st['rotations']} rotaciones de buildId")
@@ -0,0 +1,111 @@
+"""
+Límite de requests por host (token bucket) para los crawlers con pool de workers.
+
+Cada host tiene su propio bucket: `rate` requests por segundo sostenidas y
+ráfagas de hasta `burst`. Los hosts configurados se resuelven por sufijo
+(poseidonhd2.co cubre www.poseidonhd2.co) con el mismo trie que el registro de
+extractores; el resto usa los valores por defecto, con un bucket por hostname.
+
+Especificación en texto (CLI / variables de entorno): "host=rate[:burst]",
+separadas por coma, p.ej. "poseidonhd2.co=2:4,default=1:3".
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+from extractor_registry import HostSuffixTrie
+
+DEFAULT_KEY = "default"
+
+
+class TokenBucket:
+    """Bucket thread-safe; quien no encuentra token reserva el siguiente y duerme fuera del lock."""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Consume un token (esperando si hace falta) y devuelve los segundos esperados."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+def parse_rate_spec(spec: str) -> Dict[str, Tuple[float, float]]:
+    """"host=rate[:burst],..." -> {host: (rate, burst)}; burst por defecto = max(1, rate)."""
+    result: Dict[str, Tuple[float, float]] = {}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        host, sep, value = part.partition("=")
+        if not sep:
+            raise ValueError(f"Límite inválido (se espera host=rate[:burst]): {part}")
+        rate_s, _, burst_s = value.partition(":")
+        rate = float(rate_s)
+        result[host.strip().lower()] = (rate, float(burst_s) if burst_s else max(1.0, rate))
+    return result
+
+
+class HostRateLimiter:
+    """Un TokenBucket por host, con límites por sufijo y un default para el resto."""
+
+    def __init__(self, default: Tuple[float, float] = (1.0, 1.0),
+                 per_host: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.default = default
+        self._limits: Dict[str, Tuple[float, float]] = {}
+        self._trie = HostSuffixTrie()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._waited: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        for host, limit in (per_host or {}).items():
+            self.configure(host, *limit)
+
+    def configure(self, host: str, rate: float, burst: Optional[float] = None) -> None:
+        limit = (rate, burst if burst is not None else max(1.0, rate))
+        if host == DEFAULT_KEY:
+            self.default = limit
+            return
+        self._limits[host] = limit
+        self._trie.add(host, host)
+
+    def configure_many(self, limits: Iterable[Tuple[str, Tuple[float, float]]]) -> None:
+        for host, (rate, burst) in limits:
+            self.configure(host, rate, burst)
+
+    def _bucket(self, host: str) -> Tuple[str, TokenBucket]:
+        key = self._trie.lookup(host) or host
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(*self._limits.get(key, self.default))
+            return key, bucket
+
+    def acquire(self, url: str) -> float:
+        """Espera turno para pedir `url`; devuelve los segundos esperados."""
+        host = (urlparse(url).hostname or "").lower()
+        key, bucket = self._bucket(host)
+        waited = bucket.acquire()
+        if waited:
+            with self._lock:
+                self._waited[key] = self._waited.get(key, 0.0) + waited
+        return waited
+
+    def waited(self) -> Dict[str, float]:
+        """Segundos esperados por host (solo los que esperaron)."""
+        with self._lock:
+            return dict(self._waited)
@@ -5,11 +5,18 @@ Scraper para extraer URLs de video (m3u8, mp4, hls) de embeds como niramirus.com
 import re
 import requests
 import json
+import threading
 import urllib3
+from typing import Callable, Optional
 from urllib.parse import urljoin, urlparse
 
+import http_replay
+import js_unpacker
+from extractor_registry import ExtractorRegistry
+
 # Desactivar warnings de SSL
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+http_replay.install_from_env()
 
 # Headers para simular un navegador
 HEADERS = {
@@ -18,6 +25,16 @@ HEADERS = {
     'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
 }
 
+# GET usado por los extractores; extract_from_embed(http_get=...) lo reemplaza
+# durante esa llamada en el thread que la hace (límites por host, sesión del crawler)
+_http = threading.local()
+
+
+def _get(url: str, **kwargs) -> requests.Response:
+    http_get = getattr(_http, 'get', None) or requests.get
+    return http_get(url, **kwargs)
+
+
 # Dominios alternativos que redirigen al contenido real
 STREAMWISH_DOMAINS = [
     'streamwish.to', 'streamwish.com', 'awish.pro', 'dwish.pro',
@@ -49,54 +66,7 @@ def unpack_js(packed_code: str) -> str:
     """
     Desempaqueta código JavaScript ofuscado con el típico packer p,a,c,k,e,d
     """
-    # Extraer los parámetros del packer
-    patterns = [
-        r"eval\(function\(p,a,c,k,e,d\)\{.*?\}return p\}\('(.+)',(\d+),(\d+),'([^']+)'\.split\('\|'\)\)\)",
-        r"eval\(function\(p,a,c,k,e,d\)\{.*?\('(.+)',(\d+),(\d+),'([^']+)'\.split\('\|'\)\)\)",
-    ]
-    
-    match = None
-    for pattern in patterns:
-        match = re.search(pattern, packed_code, re.DOTALL)
-        if match:
-            break
-    
-    if not match:
-        return None
-    
-    p, a, c, k = match.groups()
-    a = int(a)
-    c = int(c)
-    k = k.split('|')
-    
-    # Función para convertir número a base (estilo JavaScript)
-    def base_encode(num, base):
-        """Convierte un número a la representación en una base dada (como JavaScript toString(base))"""
-        if num == 0:
-            return '0'
-        
-        digits = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
-        result = ''
-        
-        while num > 0:
-            result = digits[num % base] + result
-            num //= base
-        
-        return result if result else '0'
-    
-    # Crear el diccionario de reemplazo
-    d = {}
-    for i in range(c):
-        key = base_encode(i, a)
-        d[key] = k[i] if k[i] else key
-    
-    # Reemplazar en el código (usando word boundaries)
-    def replacer(match):
-        word = match.group(0)
-        return d.get(word, word)
-    
-    unpacked = re.sub(r'\b(\w+)\b', replacer, p)
-    return unpacked
+    return js_unpacker.unpack(packed_code)
 
 
 def extract_video_urls(unpacked_js: str) -> dict:
@@ -146,7 +116,7 @@ def extract_from_niramirus(embed_url: str, original_url: str = None) -> dict:
     }
     
     try:
-        response = requests.get(embed_url, headers=HEADERS, timeout=30, verify=False)
+        response = _get(embed_url, headers=HEADERS, timeout=30, verify=False)
         response.raise_for_status()
         html = response.text
         
@@ -161,16 +131,12 @@ def extract_from_niramirus(embed_url: str, original_url: str = None) -> dict:
             result['thumbnail'] = thumb_match.group(1)
         
         # Buscar el código JavaScript ofuscado
-        packed_match = re.search(r"(eval\(function\(p,a,c,k,e,d\)\{.*?\.split\('\|'\)\)\))", html, re.DOTALL)
-        
-        if not packed_match:
+        if js_unpacker.PACKER_MARKER not in html:
             result['error'] = 'No se encontró código JavaScript ofuscado'
             return result
         
-        packed_code = packed_match.group(1)
-        
         # Desempaquetar
-        unpacked = unpack_js(packed_code)
+        unpacked = unpack_js(html)
         
         if not unpacked:
             result['error'] = 'No se pudo desempaquetar el código JavaScript'
@@ -226,40 +192,7 @@ def detect_host(embed_url: str) -> str:
     """
     Detecta el tipo de host del embed
     """
-    url_lower = embed_url.lower()
-    
-    # Detectar niramirus
-    if 'niramirus.com' in url_lower:
-        return 'niramirus'
-    
-    # Detectar cualquier variante de streamwish
-    for domain in STREAMWISH_DOMAINS:
-        if domain in url_lower:
-            return 'streamwish'
-    if 'sfastwish.com' in url_lower or 'flaswish.com' in url_lower:
-        return 'streamwish'
-    
-    # Detectar vidhide
-    for domain in VIDHIDE_DOMAINS:
-        if domain in url_lower:
-            return 'vidhide'
-    
-    # Detectar VOE
-    for domain in VOE_DOMAINS:
-        if domain in url_lower:
-            return 'voe'
-    
-    # Detectar waaw.to
-    for domain in WAAW_DOMAINS:
-        if domain in url_lower:
-            return 'waaw'
-    
-    if 'filemoon' in url_lower:
-        return 'filemoon'
-    if 'doodstream' in url_lower:
-        return 'doodstream'
-    
-    return 'unknown'
+    return EMBED_REGISTRY.detect(embed_url)
 
 
 def normalize_streamwish_url(embed_url: str) -> str:
@@ -297,7 +230,7 @@ def extract_from_waaw(embed_url: str) -> dict:
             video_code = path.split('/f/')[-1].strip('/')
             embed_url = f'https://waaw.to/e/{video_code}'
         
-        response = requests.get(embed_url, headers=HEADERS, timeout=30, verify=False)
+        response = _get(embed_url, headers=HEADERS, timeout=30, verify=False)
         response.raise_for_status()
         html = response.text
         
@@ -349,7 +282,7 @@ def extract_from_voe(embed_url: str) -> dict:
     
     try:
         # VOE puede redirigir a otro dominio
-        response = requests.get(embed_url, headers=HEADERS, timeout=30, allow_redirects=True, verify=False)
+        response = _get(embed_url, headers=HEADERS, timeout=30, allow_redirects=True, verify=False)
         response.raise_for_status()
         html = response.text
         
@@ -357,7 +290,7 @@ def extract_from_voe(embed_url: str) -> dict:
         redirect_match = re.search(r"window\.location\.href\s*=\s*['\"]([^'\"]+)['\"]", html)
         if redirect_match and 'voe' not in redirect_match.group(1):
             redirect_url = redirect_match.group(1)
-            response = requests.get(redirect_url, headers=HEADERS, timeout=30, verify=False)
+            response = _get(redirect_url, headers=HEADERS, timeout=30, verify=False)
             html = response.text
         
         # Extraer título
@@ -416,26 +349,45 @@ def extract_from_voe(embed_url: str) -> dict:
     return result
 
 
-def extract_from_embed(embed_url: str) -> dict:
+def extract_from_streamwish(embed_url: str) -> dict:
     """
-    Función principal que detecta el host y extrae la URL apropiadamente
+    Streamwish y sus alias: se convierte a sfastwish.com para obtener el HTML real
     """
-    host = detect_host(embed_url)
-    
-    if host == 'streamwish':
-        # Convertir a sfastwish.com para obtener el HTML real
-        real_url = normalize_streamwish_url(embed_url)
-        return extract_from_niramirus(real_url, original_url=embed_url)
-    elif host == 'waaw':
-        return extract_from_waaw(embed_url)
-    elif host == 'voe':
-        return extract_from_voe(embed_url)
-    elif host in ('niramirus', 'vidhide', 'filemoon', 'unknown'):
-        # Estos hosts usan el mismo método de packer
-        return extract_from_niramirus(embed_url)
-    else:
-        # Intentar con el método genérico
-        return extract_from_niramirus(embed_url)
+    real_url = normalize_streamwish_url(embed_url)
+    return extract_from_niramirus(real_url, original_url=embed_url)
+
+
+# Registro de hosts de embed (ver extractor_registry). Los que no coinciden
+# con ningún host usan el método de packer de niramirus.
+EMBED_REGISTRY = ExtractorRegistry(default='unknown')
+EMBED_REGISTRY.register('niramirus', extract_from_niramirus, suffixes=('niramirus.com',))
+EMBED_REGISTRY.register('streamwish', extract_from_streamwish,
+                        suffixes=tuple(STREAMWISH_DOMAINS) + (STREAMWISH_REAL_DOMAIN, 'flaswish.com'))
+EMBED_REGISTRY.register('vidhide', extract_from_niramirus, suffixes=tuple(VIDHIDE_DOMAINS))
+EMBED_REGISTRY.register('voe', extract_from_voe, suffixes=tuple(VOE_DOMAINS), requires_js=True)
+EMBED_REGISTRY.register('waaw', extract_from_waaw, suffixes=tuple(WAAW_DOMAINS))
+EMBED_REGISTRY.register('filemoon', extract_from_niramirus, keywords=('filemoon',))
+EMBED_REGISTRY.register('doodstream', extract_from_niramirus, keywords=('doodstream',))
+EMBED_REGISTRY.register('unknown', extract_from_niramirus)
+
+
+def extract_from_embed(embed_url: str, http_get: Optional[Callable[..., requests.Response]] = None) -> dict:
+    """
+    Función principal que detecta el host y extrae la URL apropiadamente.
+    `http_get` (misma firma que requests.get) hace todos los requests de esta
+    extracción, incluidas las redirecciones a otros hosts.
+    """
+    previous = getattr(_http, 'get', None)
+    _http.get = http_get or previous
+    try:
+        result = None
+        for spec in EMBED_REGISTRY.chain(detect_host(embed_url)):
+            result = EMBED_REGISTRY.call(spec, embed_url)
+            if result.get('best_url'):
+                break
+        return result
+    finally:
+        _http.get = previous
 
 
 # ============== MAIN ==============
@@ -1,33 +1,56 @@
 import base64
+import codecs
+import copy
+import hashlib
 import json
 import logging
 import os
 import re
 import shutil
 import subprocess
+import sys
+import threading
 import time
+from contextlib import contextmanager
+from http.cookiejar import DefaultCookiePolicy
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 from urllib.parse import parse_qs, urljoin, urlparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 
 import requests
 import urllib3
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+import http_replay
+import js_unpacker
+from extractor_registry import ExtractorRegistry
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+http_replay.install_from_env()
 
 BASE_DIR = Path(__file__).resolve().parent
 OUTPUT_JSON = BASE_DIR / "partidos.json"
 CHATGPT_CACHE_FILE = BASE_DIR / "chatgpt_cache.json"
+M3U8_CACHE_FILE = BASE_DIR / "m3u8_cache.json"
+AGENDA_CACHE_FILE = BASE_DIR / "agenda_cache.json"
+STATS_JSON = BASE_DIR / "partidos_stats.json"
 ENV_FILE = BASE_DIR / ".env"
 
 # Configuración de OpenAI
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "").strip()
 OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini").strip()  # Modelo económico
 USE_CHATGPT = os.environ.get("USE_CHATGPT", "false").lower() == "true"
+# Modo incremental: parte del partidos.json anterior y solo resuelve lo nuevo/cambiado
+INCREMENTAL = os.environ.get("PARTIDOS_INCREMENTAL", "false").lower() == "true"
+OPENAI_API_URL = os.environ.get("OPENAI_API_URL", "https://api.openai.com/v1/chat/completions").strip()
+CHATGPT_BATCH_SIZE = 10   # Partidos por prompt
+CHATGPT_MAX_WORKERS = 4   # Requests simultáneos a la API
 
 # Configuración de GitHub
 REPO_PATH = BASE_DIR / "PELICULAS-SERIES-ANIME" / "peliculas" / "scrappersdata"
@@ -44,6 +67,29 @@ TVTVHD_JSON_URL = "https://pltvhd.com/diaries.json"
 
 TIMEOUT_SEC = 20
 
+# Documento principal de cada fuente de agenda (para GET condicional / hash de contenido)
+AGENDA_SOURCE_URLS: Dict[str, str] = {
+    "elcanaldeportivo": ELCANALDEPORTIVO_URL,
+    "streamx10": STREAMX10_URL,
+    "bolaloca": BOLALOCA_URL,
+    "antenasport": ANTENASPORT_URL,
+    "pirlotvoficial": PIRLOTV_URL,
+    "tvlibree": TVLIBREE_URL,
+    "tvtvhd": TVTVHD_JSON_URL,
+}
+# Edad máxima de los eventos reutilizados: pasado esto se re-parsea aunque la fuente no cambie
+# (refresca iframes de sub-páginas que no cubre el ETag del documento principal)
+AGENDA_CACHE_MAX_AGE = 3600
+
+# Plazo máximo (segundos) de cada fuente de agenda dentro de build_all_events.
+# Las fuentes que descargan páginas de canal por evento necesitan más margen.
+SOURCE_DEADLINE_SEC = 60
+SOURCE_DEADLINES: Dict[str, float] = {
+    "elcanaldeportivo": 120,
+    "pirlotvoficial": 120,
+    "tvlibree": 120,
+}
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
@@ -1489,105 +1535,156 @@ def load_chatgpt_cache() -> Dict[str, Dict[str, str]]:
 
 
 def save_chatgpt_cache() -> None:
-    """Guarda el caché de ChatGPT a archivo."""
+    """Guarda el caché de ChatGPT a archivo (escritura atómica)."""
+    tmp_path = CHATGPT_CACHE_FILE.with_suffix(".json.tmp")
     try:
-        with CHATGPT_CACHE_FILE.open("w", encoding="utf-8") as f:
+        with tmp_path.open("w", encoding="utf-8") as f:
             json.dump(_chatgpt_cache, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, CHATGPT_CACHE_FILE)
         logger.info("Caché de ChatGPT guardado: %d entradas", len(_chatgpt_cache))
     except Exception as e:
         logger.warning("Error guardando caché de ChatGPT: %s", e)
 
 
-def query_chatgpt_for_match_info(equipos: str) -> Dict[str, str]:
-    """
-    Consulta a ChatGPT para obtener información sobre un partido.
-    Retorna dict con: liga, deporte, pais
-    """
-    global _chatgpt_cache
-    
-def query_chatgpt_for_match_info(equipos: str, liga_hint: str = "") -> Dict[str, str]:
-    """
-    Consulta a ChatGPT para inferir liga, deporte y país.
-    Se usa solo cuando la inferencia local no alcanza (liga vacía o sin país conocido).
-    """
-    global _chatgpt_cache
-
-    equipos = equipos or ""
-    liga_hint = liga_hint or ""
-    if not equipos and not liga_hint:
-        return {}
-
-    cache_key = normalize_text(f"{liga_hint}|{equipos}")
+def chatgpt_cache_key(equipos: str, liga_hint: str = "") -> str:
+    return normalize_text(f"{liga_hint or ''}|{equipos or ''}")
 
-    if cache_key in _chatgpt_cache:
-        logger.debug("ChatGPT caché hit: %s", equipos)
-        return _chatgpt_cache[cache_key]
 
-    if not OPENAI_API_KEY or not USE_CHATGPT:
-        return {}
-
-    try:
-        headers = {
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
-            "Content-Type": "application/json",
-        }
-
-        prompt_lines = [
-            "Responde SOLO con un JSON válido (sin texto extra) con las claves: liga, deporte, pais.",
-            "Si no conoces un dato usa \"\".",
-            f"Partido: \"{equipos}\"",
-        ]
+def query_chatgpt_batch(matches: List[Tuple[str, str]]) -> List[Dict[str, str]]:
+    """
+    Consulta a ChatGPT liga, deporte y país de varios partidos (equipos, liga_hint) en un solo prompt.
+    Devuelve una lista alineada con `matches` ({} para los que no se pudieron resolver).
+    """
+    results: List[Dict[str, str]] = [{} for _ in matches]
+    if not matches:
+        return results
+
+    prompt_lines = [
+        "Responde SOLO con un JSON válido (sin texto extra): una lista con un objeto por partido, "
+        "en el mismo orden, con las claves: id, liga, deporte, pais.",
+        "Si no conoces un dato usa \"\".",
+    ]
+    for idx, (equipos, liga_hint) in enumerate(matches, 1):
+        line = f"{idx}. Partido: \"{equipos}\""
         if liga_hint:
-            prompt_lines.append(f"Liga sugerida: \"{liga_hint}\"")
-
-        payload = {
-            "model": OPENAI_MODEL,
-            "messages": [
-                {"role": "system", "content": "Eres un experto en deportes. Responde solo con JSON."},
-                {"role": "user", "content": "\n".join(prompt_lines)},
-            ],
-            "temperature": 0.1,
-            "max_tokens": 120,
-        }
-
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=15,
-        )
+            line += f" | Liga sugerida: \"{liga_hint}\""
+        prompt_lines.append(line)
+
+    payload = {
+        "model": OPENAI_MODEL,
+        "messages": [
+            {"role": "system", "content": "Eres un experto en deportes. Responde solo con JSON."},
+            {"role": "user", "content": "\n".join(prompt_lines)},
+        ],
+        "temperature": 0.1,
+        "max_tokens": 60 * len(matches) + 40,
+    }
+    headers = {
+        "Authorization": f"Bearer {OPENAI_API_KEY}",
+        "Content-Type": "application/json",
+    }
 
+    try:
+        response = requests.post(OPENAI_API_URL, headers=headers, json=payload, timeout=30)
         if response.status_code != 200:
             logger.warning("ChatGPT API error %d: %s", response.status_code, response.text[:200])
-            return {}
+            return results
 
         data = response.json()
         content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-
         content = content.strip()
         if content.startswith("```"):
             content = re.sub(r"^```json?\n?", "", content)
             content = re.sub(r"\n?```$", "", content)
 
-        result = json.loads(content)
-        result = {
-            "liga": result.get("liga", "") or "",
-            "deporte": result.get("deporte", "") or "",
-            "pais": result.get("pais", "") or "",
-        }
+        parsed = json.loads(content)
+        if isinstance(parsed, dict):
+            # Algunos modelos envuelven la lista: {"partidos": [...]}
+            parsed = next((v for v in parsed.values() if isinstance(v, list)), [parsed])
+    except json.JSONDecodeError as e:
+        logger.warning("ChatGPT JSON error (lote de %d): %s", len(matches), e)
+        return results
+    except Exception as e:
+        logger.warning("ChatGPT error (lote de %d): %s", len(matches), e)
+        return results
 
-        _chatgpt_cache[cache_key] = result
-        logger.info("ChatGPT: %s -> %s / %s", equipos, result.get("liga", ""), result.get("pais", ""))
+    for pos, item in enumerate(parsed if isinstance(parsed, list) else []):
+        if not isinstance(item, dict):
+            continue
+        try:
+            idx = int(item.get("id", pos + 1)) - 1
+        except (TypeError, ValueError):
+            idx = pos
+        if 0 <= idx < len(matches):
+            results[idx] = {
+                "liga": item.get("liga", "") or "",
+                "deporte": item.get("deporte", "") or "",
+                "pais": item.get("pais", "") or "",
+            }
+    return results
 
-        return result
 
-    except json.JSONDecodeError as e:
-        logger.warning("ChatGPT JSON error para '%s': %s", equipos, e)
-        return {}
-    except Exception as e:
-        logger.warning("ChatGPT error para '%s': %s", equipos, e)
-    date_value: datetime
-    date_offset: int
+def enrich_events_with_chatgpt(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Etapa post-merge: completa liga/deporte/país con ChatGPT para los eventos donde
+    la inferencia local no alcanzó (sin liga o sin país conocido).
+    Solo consulta claves (liga, equipos) únicas que no estén en caché, en lotes de
+    CHATGPT_BATCH_SIZE partidos con CHATGPT_MAX_WORKERS requests en paralelo.
+    """
+    if not USE_CHATGPT:
+        return events
+
+    targets: List[Tuple[Dict[str, Any], str, bool]] = []
+    pending: Dict[str, Tuple[str, str]] = {}
+    for ev in events:
+        equipos = ev.get("equipos", "")
+        if not equipos:
+            continue
+        liga = ev.get("liga", "")
+        sin_liga = not liga or normalize_text(liga) == normalize_text(equipos)
+        if not sin_liga and ev.get("pais"):
+            continue
+        liga_hint = "" if sin_liga else liga
+        key = chatgpt_cache_key(equipos, liga_hint)
+        targets.append((ev, key, sin_liga))
+        if key not in _chatgpt_cache:
+            pending[key] = (equipos, liga_hint)
+
+    logger.info("ChatGPT: %d eventos sin resolver, %d claves únicas fuera de caché", len(targets), len(pending))
+    _run_stats.hit("chatgpt", len({key for _, key, _ in targets}) - len(pending))
+
+    if pending and OPENAI_API_KEY:
+        items = list(pending.items())
+        batches = [items[i:i + CHATGPT_BATCH_SIZE] for i in range(0, len(items), CHATGPT_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=CHATGPT_MAX_WORKERS) as executor:
+            future_to_batch = {
+                executor.submit(query_chatgpt_batch, [match for _, match in batch]): batch
+                for batch in batches
+            }
+            for future in as_completed(future_to_batch):
+                batch = future_to_batch[future]
+                for (key, (equipos, _)), result in zip(batch, future.result()):
+                    if result:
+                        _chatgpt_cache[key] = result
+                        logger.info("ChatGPT: %s -> %s / %s", equipos, result.get("liga", ""), result.get("pais", ""))
+        save_chatgpt_cache()
+
+    for ev, key, sin_liga in targets:
+        info = _chatgpt_cache.get(key)
+        if not info:
+            continue
+        equipos = ev.get("equipos", "")
+        if sin_liga and info.get("liga"):
+            # Recalcular el logo solo si era el inferido (no el de la fuente)
+            logo = ev.get("logo", "")
+            if not logo or logo == infer_logo("", equipos):
+                ev["logo"] = infer_logo(info["liga"], equipos)
+            ev["liga"] = info["liga"]
+        if info.get("deporte"):
+            ev["deporte"] = info["deporte"]
+        if info.get("pais"):
+            ev["pais"] = info["pais"]
+    return events
 
 
 def today_arg_date() -> datetime:
@@ -1606,32 +1703,133 @@ def format_utc(dt_utc: datetime) -> str:
     return dt_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
+MARGEN_EVENTOS_PASADOS = timedelta(hours=4)  # Mantener partidos que empezaron hace menos de 4h
+
+
+def evento_vigente(dt_utc: datetime, ahora: Optional[datetime] = None) -> bool:
+    """True si un evento con esa hora UTC sobrevive a filtrar_eventos_pasados."""
+    if dt_utc.tzinfo is None:
+        dt_utc = dt_utc.replace(tzinfo=timezone.utc)
+    ahora = ahora or datetime.now(timezone.utc)
+    return dt_utc + MARGEN_EVENTOS_PASADOS >= ahora
+
+
+class KeywordMatcher:
+    """
+    Autómata Aho-Corasick sobre una lista de palabras clave (en orden de prioridad).
+    find(text) devuelve los índices de todas las claves que aparecen como
+    substring de text en una sola pasada: equivale a `[i for i, k in enumerate(keys) if k in text]`.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[List[int]] = [[]]
+        for idx, keyword in enumerate(self.keywords):
+            if not keyword:
+                self._out[0].append(idx)
+                continue
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(idx)
+
+        # Enlaces de fallo (BFS) y salidas heredadas del sufijo más largo
+        self._fail: List[int] = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> set:
+        found = set(self._out[0])
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+    def first(self, text: str) -> Optional[int]:
+        """Índice de la primera clave (en orden de la lista) presente en text."""
+        found = self.find(text)
+        return min(found) if found else None
+
+
+DEPORTE_NOMBRES: Dict[str, str] = {
+    "futbol": "Fútbol",
+    "baloncesto": "Basketball",
+    "tenis": "Tenis",
+    "formula1": "Fórmula 1",
+    "futbol_americano": "Fútbol Americano",
+    "beisbol": "Béisbol",
+    "hockey": "Hockey",
+    "ufc_mma": "MMA",
+    "boxeo": "Boxeo",
+    "golf": "Golf",
+    "rugby": "Rugby",
+    "ciclismo": "Ciclismo",
+    "natacion": "Natación",
+    "atletismo": "Atletismo",
+    "automovilismo": "Automovilismo",
+    "voley": "Voley",
+    "cricket": "Cricket",
+    "esports": "Esports",
+    "juegos_olimpicos": "Juegos Olímpicos",
+}
+
+# Orden de prioridad al buscar keywords en la liga
+DEPORTE_PRIORIDAD: List[str] = [
+    "baloncesto", "hockey", "formula1", "automovilismo", "tenis",
+    "futbol_americano", "beisbol", "ufc_mma", "boxeo", "golf",
+    "rugby", "voley", "cricket", "ciclismo", "natacion", "atletismo",
+    "esports", "juegos_olimpicos",
+    "futbol",
+]
+# Deportes muy específicos que se pueden buscar en equipos sin confundir con fútbol
+DEPORTES_SEGUROS_EQUIPOS: List[str] = ["baloncesto", "futbol_americano", "ufc_mma", "boxeo"]
+
+
+def _deporte_matcher(deportes: List[str]) -> Tuple[KeywordMatcher, List[str]]:
+    keywords: List[str] = []
+    owners: List[str] = []
+    for deporte in deportes:
+        for keyword in DEPORTE_KEYWORDS.get(deporte, []):
+            keywords.append(keyword.lower())
+            owners.append(deporte)
+    return KeywordMatcher(keywords), owners
+
+
+# Tablas compiladas una sola vez al importar
+_LIGA_LOGO_KEYS: List[str] = list(LIGA_LOGOS)
+_LIGA_LOGO_MATCHER = KeywordMatcher(_LIGA_LOGO_KEYS)
+_PAIS_LIGA_KEYS: List[str] = list(PAIS_POR_LIGA)
+_PAIS_LIGA_MATCHER = KeywordMatcher(_PAIS_LIGA_KEYS)
+_EQUIPOS_LIGA_KEYS: List[str] = list(EQUIPOS_LIGA)
+_EQUIPOS_LIGA_MATCHER = KeywordMatcher(_EQUIPOS_LIGA_KEYS)
+_DEPORTE_LIGA_MATCHER, _DEPORTE_LIGA_OWNERS = _deporte_matcher(DEPORTE_PRIORIDAD)
+_DEPORTE_EQUIPOS_MATCHER, _DEPORTE_EQUIPOS_OWNERS = _deporte_matcher(DEPORTES_SEGUROS_EQUIPOS)
+
+
 def infer_deporte(liga: str, equipos: str) -> str:
     """Infiere el deporte basado en liga y equipos."""
     liga_lower = normalize_text(liga)
     
-    deporte_map = {
-        "futbol": "Fútbol",
-        "baloncesto": "Basketball",
-        "tenis": "Tenis",
-        "formula1": "Fórmula 1",
-        "futbol_americano": "Fútbol Americano",
-        "beisbol": "Béisbol",
-        "hockey": "Hockey",
-        "ufc_mma": "MMA",
-        "boxeo": "Boxeo",
-        "golf": "Golf",
-        "rugby": "Rugby",
-        "ciclismo": "Ciclismo",
-        "natacion": "Natación",
-        "atletismo": "Atletismo",
-        "automovilismo": "Automovilismo",
-        "voley": "Voley",
-        "cricket": "Cricket",
-        "esports": "Esports",
-        "juegos_olimpicos": "Juegos Olímpicos",
-    }
-    
     # PASO 1: Detección directa por prefijo/nombre de la liga (máxima prioridad)
     if liga_lower.startswith("basketball") or liga_lower in ["nba"] or "euroliga" in liga_lower or "euroleague" in liga_lower:
         return "Basketball"
@@ -1648,29 +1846,17 @@ def infer_deporte(liga: str, equipos: str) -> str:
     
     # PASO 2: Buscar keywords SOLO en la liga (no en equipos) para evitar falsos positivos
     # (ej: "Girona" no debe matchear "giro" de ciclismo, "Celtic" no debe matchear basket)
-    orden_prioridad = [
-        "baloncesto", "hockey", "formula1", "automovilismo", "tenis",
-        "futbol_americano", "beisbol", "ufc_mma", "boxeo", "golf",
-        "rugby", "voley", "cricket", "ciclismo", "natacion", "atletismo",
-        "esports", "juegos_olimpicos",
-        "futbol",
-    ]
-    
-    for deporte in orden_prioridad:
-        keywords = DEPORTE_KEYWORDS.get(deporte, [])
-        for keyword in keywords:
-            if keyword.lower() in liga_lower:
-                return deporte_map.get(deporte, deporte.capitalize())
+    idx = _DEPORTE_LIGA_MATCHER.first(liga_lower)
+    if idx is not None:
+        deporte = _DEPORTE_LIGA_OWNERS[idx]
+        return DEPORTE_NOMBRES.get(deporte, deporte.capitalize())
     
     # PASO 3: Solo si la liga no dio resultado, buscar en equipos (con cuidado)
     # Solo para deportes muy específicos que no se confundan con fútbol
-    text_equipos = normalize_text(equipos)
-    deportes_seguros_equipos = ["baloncesto", "futbol_americano", "ufc_mma", "boxeo"]
-    for deporte in deportes_seguros_equipos:
-        keywords = DEPORTE_KEYWORDS.get(deporte, [])
-        for keyword in keywords:
-            if keyword.lower() in text_equipos:
-                return deporte_map.get(deporte, deporte.capitalize())
+    idx = _DEPORTE_EQUIPOS_MATCHER.first(normalize_text(equipos))
+    if idx is not None:
+        deporte = _DEPORTE_EQUIPOS_OWNERS[idx]
+        return DEPORTE_NOMBRES.get(deporte, deporte.capitalize())
     
     return "Deportes"
 
@@ -1679,21 +1865,17 @@ def infer_logo(liga: str, equipos: str) -> str:
     """Infiere el logo basado en la liga o equipos. Si no hay logo, usa bandera del país."""
     text = normalize_text(liga)
     
-    # Buscar coincidencia en liga (más largo primero para matchear "afc champions league two" antes que "afc champions")
-    best_match = ""
-    best_key_len = 0
-    for liga_key, logo_url in LIGA_LOGOS.items():
-        if liga_key in text and len(liga_key) > best_key_len:
-            best_match = logo_url
-            best_key_len = len(liga_key)
-    if best_match:
-        return best_match
+    # Buscar coincidencia en liga (más largo primero para matchear "afc champions league two" antes que "afc champions");
+    # a igual longitud gana la primera clave de LIGA_LOGOS
+    found = _LIGA_LOGO_MATCHER.find(text)
+    if found:
+        best = max(found, key=lambda i: (len(_LIGA_LOGO_KEYS[i]), -i))
+        return LIGA_LOGOS[_LIGA_LOGO_KEYS[best]]
     
     # Buscar en equipos también
-    text_equipos = normalize_text(equipos)
-    for liga_key, logo_url in LIGA_LOGOS.items():
-        if liga_key in text_equipos:
-            return logo_url
+    idx = _LIGA_LOGO_MATCHER.first(normalize_text(equipos))
+    if idx is not None:
+        return LIGA_LOGOS[_LIGA_LOGO_KEYS[idx]]
     
     # Fallback por deporte: si es baloncesto, usar logo genérico de basket
     deporte = infer_deporte(liga, equipos)
@@ -1715,31 +1897,20 @@ def infer_liga_from_equipos(equipos: str) -> str:
     if not equipos:
         return ""
     
-    text = normalize_text(equipos)
-    
-    # Buscar cada equipo en el mapa
-    for equipo, liga in EQUIPOS_LIGA.items():
-        if equipo in text:
-            return liga
-    
-    # Buscar palabras individuales también
-    words = text.split()
-    for word in words:
-        if len(word) >= 4:  # Evitar matches muy cortos
-            for equipo, liga in EQUIPOS_LIGA.items():
-                if word == equipo or equipo in word:
-                    return liga
+    # Primer equipo del mapa (en orden) contenido en el texto. Cubre también la
+    # búsqueda por palabra individual: un equipo dentro de una palabra está en el texto.
+    idx = _EQUIPOS_LIGA_MATCHER.first(normalize_text(equipos))
+    if idx is not None:
+        return EQUIPOS_LIGA[_EQUIPOS_LIGA_KEYS[idx]]
     
     return ""
 
 
 def infer_pais(liga: str) -> str:
     """Infiere el país basado en la liga."""
-    text = normalize_text(liga)
-    
-    for liga_key, pais in PAIS_POR_LIGA.items():
-        if liga_key in text:
-            return pais
+    idx = _PAIS_LIGA_MATCHER.first(normalize_text(liga))
+    if idx is not None:
+        return PAIS_POR_LIGA[_PAIS_LIGA_KEYS[idx]]
     
     return ""
 
@@ -1800,7 +1971,6 @@ def build_event(
     equipos: str,
     canales: List[Dict[str, Any]],
     date_offset: int,
-    use_chatgpt: bool = USE_CHATGPT,
 ) -> Dict[str, Any]:
     dt_utc = dt_arg + timedelta(hours=3)
     
@@ -1834,40 +2004,20 @@ def build_event(
         if liga_inferida:
             liga_normalizada = liga_inferida
     
-    # Variables para inferencia
-    deporte = ""
-    pais = ""
-    chatgpt_info: Dict[str, str] = {}
-    
-    # PASO 1: Si no hay liga, intentar inferir del mapa de equipos (sin costo)
+    # PASO 1: Si no hay liga, intentar inferir del mapa de equipos (sin costo).
+    # La consulta a ChatGPT para lo que quede sin resolver se hace después del merge
+    # (ver enrich_events_with_chatgpt), una sola vez por partido único.
     if not liga_normalizada and equipos:
         liga_inferida = infer_liga_from_equipos(equipos)
         if liga_inferida:
             liga_normalizada = liga_inferida
             logger.debug("Liga inferida de equipos: %s -> %s", equipos, liga_normalizada)
     
-    # PASO 2: Si no hay liga o no podemos inferir país, consultar ChatGPT (controlado por USE_CHATGPT)
-    needs_pais = not infer_pais(liga_normalizada) if liga_normalizada else True
-    if use_chatgpt and equipos and (not liga_normalizada or needs_pais):
-        chatgpt_info = query_chatgpt_for_match_info(equipos, liga_normalizada or liga)
-        if chatgpt_info:
-            if not liga_normalizada and chatgpt_info.get("liga"):
-                liga_normalizada = chatgpt_info.get("liga", "")
-            if not deporte and chatgpt_info.get("deporte"):
-                deporte = chatgpt_info.get("deporte", "")
-            if not pais and chatgpt_info.get("pais"):
-                pais = chatgpt_info.get("pais", "")
-    
     # Inferir logo si no hay uno proporcionado
     logo_final = logo or infer_logo(liga_normalizada, equipos)
     
-    # Inferir deporte si no lo tenemos de ChatGPT
-    if not deporte:
-        deporte = infer_deporte(liga_normalizada, equipos)
-    
-    # Inferir país si no lo tenemos de ChatGPT
-    if not pais:
-        pais = infer_pais(liga_normalizada)
+    deporte = infer_deporte(liga_normalizada, equipos)
+    pais = infer_pais(liga_normalizada)
 
     # Si la liga es exactamente el texto de equipos, descartarla y volver a inferir
     if normalize_text(liga_normalizada) == normalize_text(equipos):
@@ -2028,10 +2178,105 @@ def extract_onclick_urls(html_text: str) -> List[str]:
     return [u.strip() for u in urls if u.strip()]
 
 
+class ReplacementTable:
+    """
+    Tabla de reemplazos str.replace aplicada en orden, con la misma semántica que
+    `for bad, good in table.items(): if bad in text: text = text.replace(bad, good)`,
+    pero detectando las claves presentes con un solo recorrido (KeywordMatcher).
+    Solo se vuelve a escanear cuando efectivamente hubo un reemplazo.
+    """
+
+    def __init__(self, table: Dict[str, str]):
+        self.keys: List[str] = list(table)
+        self.values: List[str] = [table[k] for k in self.keys]
+        self._matcher = KeywordMatcher(self.keys)
+
+    def apply(self, text: str) -> str:
+        last = -1
+        while True:
+            pending = [i for i in self._matcher.find(text) if i > last]
+            if not pending:
+                return text
+            last = min(pending)
+            text = text.replace(self.keys[last], self.values[last])
+
+
+# Correcciones para textos con U+FFFD (replacement character)
+_FFFD_CORRECCIONES: Dict[str, str] = {
+    # Equipos / ciudades con acentos comunes
+    "K\ufffdbenhavn": "København",
+    "Nordsj\ufffdlland": "Nordsjælland",
+    "Vara\ufffddin": "Varaždin",
+    "Alav\ufffds": "Alavés",
+    "Vit\ufffdria Guimar\ufffdes": "Vitória Guimarães",
+    "\ufffdeleznicar": "Železnicar",
+    "M\ufffdnchen": "München",
+    "Atl\ufffdtico": "Atlético",
+    "Ath Bilba\ufffd": "Ath Bilbaó",
+    "C\ufffdceres": "Cáceres",
+    "G\ufffdteborg": "Göteborg",
+    "Malm\ufffd": "Malmö",
+    "Boras\ufffd": "Borås",
+    "S\ufffdnderjyskE": "SønderjyskE",
+    "Br\ufffdndby": "Brøndby",
+    "\ufffdrebro": "Örebro",
+    "Laktasi": "Laktaši",
+    "Famos-SA\ufffdK": "Famos-SAIK",
+    "Posusje": "Posušje",
+    "Siroki": "Široki",
+    "Velez": "Velež",
+    "Zeljeznicar": "Željezničar",
+    # CONCACAF / Centroamérica
+    "Cartagin\ufffds": "Cartaginés",
+    # Acentos comunes en español / portugués / francés
+    "Bol\ufffdvar": "Bolívar",
+    "D\ufffdnamo": "Dínamo",
+    "G\ufffdrnik": "Górnik",
+    "L\ufffddz": "Łódź",
+    "Krak\ufffdw": "Kraków",
+    "Ey\ufffdpspor": "Eyüpspor",
+    "Gen\ufffdlerbirli\ufffdi": "Gençlerbirliği",
+    "Nig\ufffde": "Niğde",
+    "Kayserisp\ufffd": "Kayserispor",
+    "Fener\ufffd": "Fenerbahçe",
+    "Be\ufffdikta\ufffd": "Beşiktaş",
+    "Trabz\ufffdnspor": "Trabzonspor",
+    "K\ufffdln": "Köln",
+    "N\ufffdrnberg": "Nürnberg",
+    "D\ufffdsseldorf": "Düsseldorf",
+    "Z\ufffdrich": "Zürich",
+    "Betis Sevill\ufffd": "Betis Sevilla",
+}
+
+# Correcciones conocidas sin U+FFFD (ej: latin1/utf-8 cruzados - mojibake)
+_MOJIBAKE_EXTRAS: Dict[str, str] = {
+    "LanÃºs": "Lanús",
+    "LanĂºs": "Lanús",
+    "LanĂşs": "Lanús",
+    "Ã©": "é",
+    "Ã¡": "á",
+    "Ã­": "í",
+    "Ã³": "ó",
+    "Ãº": "ú",
+    "Ã±": "ñ",
+    "Ã¼": "ü",
+    "Ã§": "ç",
+    "Ã": "Á",  # Ã seguido de espacio suele ser Á mal codificado
+}
+
+_FFFD_TABLE = ReplacementTable(_FFFD_CORRECCIONES)
+_MOJIBAKE_TABLE = ReplacementTable(_MOJIBAKE_EXTRAS)
+_MOJIBAKE_KEYS_NON_ASCII = not any(k.isascii() for k in _MOJIBAKE_EXTRAS)
+
+
+@lru_cache(maxsize=8192)
 def fix_encoding(text: str) -> str:
     """Intenta reparar texto con encoding roto (mojibake / replacement chars)."""
     if not text:
         return text
+    # ASCII puro: ningún paso puede cambiarlo (las claves de _MOJIBAKE_EXTRAS no son ASCII)
+    if text.isascii() and _MOJIBAKE_KEYS_NON_ASCII:
+        return text
 
     # Paso 1: Intentar arreglar mojibake típico latin1→utf8
     # (ej: "ï¿½" son los bytes EF BF BD de U+FFFD leídos como latin-1)
@@ -2052,54 +2297,7 @@ def fix_encoding(text: str) -> str:
 
     # Paso 2: Si tiene U+FFFD (replacement character), aplicar correcciones conocidas
     if '\ufffd' in text:
-        correcciones = {
-            # Equipos / ciudades con acentos comunes
-            "K\ufffdbenhavn": "København",
-            "Nordsj\ufffdlland": "Nordsjælland",
-            "Vara\ufffddin": "Varaždin",
-            "Alav\ufffds": "Alavés",
-            "Vit\ufffdria Guimar\ufffdes": "Vitória Guimarães",
-            "\ufffdeleznicar": "Železnicar",
-            "M\ufffdnchen": "München",
-            "Atl\ufffdtico": "Atlético",
-            "Ath Bilba\ufffd": "Ath Bilbaó",
-            "C\ufffdceres": "Cáceres",
-            "G\ufffdteborg": "Göteborg",
-            "Malm\ufffd": "Malmö",
-            "Boras\ufffd": "Borås",
-            "S\ufffdnderjyskE": "SønderjyskE",
-            "Br\ufffdndby": "Brøndby",
-            "\ufffdrebro": "Örebro",
-            "Laktasi": "Laktaši",
-            "Famos-SA\ufffdK": "Famos-SAIK",
-            "Posusje": "Posušje",
-            "Siroki": "Široki",
-            "Velez": "Velež",
-            "Zeljeznicar": "Željezničar",
-            # CONCACAF / Centroamérica
-            "Cartagin\ufffds": "Cartaginés",
-            # Acentos comunes en español / portugués / francés
-            "Bol\ufffdvar": "Bolívar",
-            "D\ufffdnamo": "Dínamo",
-            "G\ufffdrnik": "Górnik",
-            "L\ufffddz": "Łódź",
-            "Krak\ufffdw": "Kraków",
-            "Ey\ufffdpspor": "Eyüpspor",
-            "Gen\ufffdlerbirli\ufffdi": "Gençlerbirliği",
-            "Nig\ufffde": "Niğde",
-            "Kayserisp\ufffd": "Kayserispor",
-            "Fener\ufffd": "Fenerbahçe",
-            "Be\ufffdikta\ufffd": "Beşiktaş",
-            "Trabz\ufffdnspor": "Trabzonspor",
-            "K\ufffdln": "Köln",
-            "N\ufffdrnberg": "Nürnberg",
-            "D\ufffdsseldorf": "Düsseldorf",
-            "Z\ufffdrich": "Zürich",
-            "Betis Sevill\ufffd": "Betis Sevilla",
-        }
-        for bad, good in correcciones.items():
-            if bad in text:
-                text = text.replace(bad, good)
+        text = _FFFD_TABLE.apply(text)
 
     # Paso 3: Si aún tiene U+FFFD, intentar recovery genérico
     # Para cada U+FFFD, probar las vocales acentuadas más comunes en español/portugués
@@ -2129,24 +2327,15 @@ def fix_encoding(text: str) -> str:
             text = result
 
     # Correcciones conocidas sin U+FFFD (ej: latin1/utf-8 cruzados - mojibake)
-    extras = {
-        "LanÃºs": "Lanús",
-        "LanĂºs": "Lanús",
-        "LanĂşs": "Lanús",
-        "Ã©": "é",
-        "Ã¡": "á",
-        "Ã­": "í",
-        "Ã³": "ó",
-        "Ãº": "ú",
-        "Ã±": "ñ",
-        "Ã¼": "ü",
-        "Ã§": "ç",
-        "Ã": "Á",  # Ã seguido de espacio suele ser Á mal codificado
-    }
-    for bad, good in extras.items():
-        if bad in text:
-            text = text.replace(bad, good)
-    return text
+    return _MOJIBAKE_TABLE.apply(text)
+
+
+def _latin1_fallback(exc: UnicodeDecodeError) -> Tuple[str, int]:
+    """Error handler: el byte inválido se interpreta como latin-1 y se sigue desde el próximo byte."""
+    return chr(exc.object[exc.start]), exc.start + 1
+
+
+codecs.register_error("latin1_fallback", _latin1_fallback)
 
 
 def decode_mixed_encoding(raw: bytes) -> str:
@@ -2154,42 +2343,25 @@ def decode_mixed_encoding(raw: bytes) -> str:
     Decodifica bytes que pueden tener encoding mixto (UTF-8 y latin-1/ISO-8859-1).
     Algunas fuentes (como antenasport) mezclan caracteres UTF-8 multi-byte
     (ej: Ł = C5 81) con caracteres latin-1 de un solo byte (ej: ç = E7).
-    Esta función intenta decodificar cada secuencia como UTF-8 y si falla,
-    la interpreta como latin-1.
+    Los tramos UTF-8 válidos se decodifican en bloque (en C); solo los bytes
+    inválidos pasan por el handler, que los interpreta como latin-1.
     """
-    result = []
-    i = 0
-    n = len(raw)
-    while i < n:
-        b = raw[i]
-        # ASCII: un solo byte
-        if b <= 0x7F:
-            result.append(chr(b))
-            i += 1
-        # UTF-8 secuencia de 2 bytes: 110xxxxx 10xxxxxx
-        elif 0xC2 <= b <= 0xDF and i + 1 < n and 0x80 <= raw[i + 1] <= 0xBF:
-            result.append(raw[i:i + 2].decode('utf-8'))
-            i += 2
-        # UTF-8 secuencia de 3 bytes: 1110xxxx 10xxxxxx 10xxxxxx
-        elif (0xE0 <= b <= 0xEF and i + 2 < n
-              and 0x80 <= raw[i + 1] <= 0xBF
-              and 0x80 <= raw[i + 2] <= 0xBF):
-            result.append(raw[i:i + 3].decode('utf-8'))
-            i += 3
-        # UTF-8 secuencia de 4 bytes: 11110xxx 10xxxxxx 10xxxxxx 10xxxxxx
-        elif (0xF0 <= b <= 0xF7 and i + 3 < n
-              and all(0x80 <= raw[i + j] <= 0xBF for j in range(1, 4))):
-            result.append(raw[i:i + 4].decode('utf-8'))
-            i += 4
-        else:
-            # No es UTF-8 válido: interpretar como latin-1 (ISO-8859-1)
-            result.append(chr(b))
-            i += 1
-    return ''.join(result)
+    return bytes(raw).decode("utf-8", errors="latin1_fallback")
+
+
+_agenda_prefetch = threading.local()
+
+
+def http_get(session: requests.Session, url: str) -> requests.Response:
+    """GET con TIMEOUT_SEC; usa la respuesta ya descargada por el GET condicional de _run_source si la hay."""
+    prefetched = getattr(_agenda_prefetch, "responses", {}).pop(url, None)
+    if prefetched is not None:
+        return prefetched
+    return session.get(url, timeout=TIMEOUT_SEC)
 
 
 def fetch_html(session: requests.Session, url: str) -> str:
-    response = session.get(url, timeout=TIMEOUT_SEC)
+    response = http_get(session, url)
     raw = response.content
 
     # Paso 1: Intentar UTF-8 puro (es el encoding más común en web moderna)
@@ -2218,10 +2390,67 @@ def fetch_html(session: requests.Session, url: str) -> str:
     return raw.decode('latin-1')
 
 
+class PageCache:
+    """
+    Memo de páginas (por URL absoluta) compartido por todos los parsers de una
+    corrida de build_all_events. Thread-safe: si dos parsers piden la misma URL a
+    la vez, solo uno la descarga. Lleva hits/misses por fuente.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pages: Dict[str, Tuple[Optional[str], Optional[Exception]]] = {}
+        self._inflight: Dict[str, threading.Event] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def fetch(self, session: requests.Session, url: str, source: str) -> str:
+        with self._lock:
+            counters = self.stats.setdefault(source, {"hits": 0, "misses": 0})
+            event = self._inflight.get(url)
+            leader = url not in self._pages and event is None
+            if leader:
+                event = self._inflight[url] = threading.Event()
+                counters["misses"] += 1
+            else:
+                counters["hits"] += 1
+        if not leader:
+            _run_stats.hit("paginas")
+        if leader:
+            try:
+                result = (fetch_html(session, url), None)
+            except Exception as exc:
+                result = (None, exc)
+            with self._lock:
+                self._pages[url] = result
+                del self._inflight[url]
+            event.set()
+        elif event is not None:
+            event.wait()
+        text, error = self._pages[url]
+        if error is not None:
+            raise error
+        return text
+
+    def log_stats(self) -> None:
+        for source, st in sorted(self.stats.items()):
+            logger.info("  Caché de páginas [%s]: %d hits, %d misses", source, st["hits"], st["misses"])
+
+
+_page_cache: Optional[PageCache] = None
+
+
+def fetch_page(session: requests.Session, url: str, source: str) -> str:
+    """fetch_html para sub-páginas (canales, detalles), memoizado dentro de build_all_events."""
+    cache = _page_cache
+    if cache is None:
+        return fetch_html(session, url)
+    return cache.fetch(session, url, source)
+
+
 def parse_elcanaldeportivo(session: requests.Session) -> List[Dict[str, Any]]:
     events: List[Dict[str, Any]] = []
     try:
-        response = session.get(ELCANALDEPORTIVO_URL, timeout=TIMEOUT_SEC)
+        response = http_get(session, ELCANALDEPORTIVO_URL)
         raw = response.content
         data = None
         # Intentar múltiples encodings y elegir el que no tenga caracteres rotos
@@ -2244,11 +2473,17 @@ def parse_elcanaldeportivo(session: requests.Session) -> List[Dict[str, Any]]:
         logger.error("elcanaldeportivo error: %s", exc)
         return events
 
+    ahora = datetime.now(timezone.utc)
+    evitados = 0
     for item in data if isinstance(data, list) else []:
         try:
             dt_utc = datetime.strptime(item.get("hora_utc", ""), "%Y-%m-%dT%H:%M:%SZ")
         except Exception:
             continue
+        # Evento que filtrar_eventos_pasados va a descartar: no bajar sus páginas de canal
+        if not evento_vigente(dt_utc, ahora):
+            evitados += sum(1 for ch in item.get("canales") or [] if ch.get("url"))
+            continue
         dt_arg = dt_utc - timedelta(hours=3)
         date_offset = (dt_arg.date() - dt_utc.date()).days
         logo = item.get("logo") or ""
@@ -2263,7 +2498,7 @@ def parse_elcanaldeportivo(session: requests.Session) -> List[Dict[str, Any]]:
             iframe_url = ""
             if ch_url:
                 try:
-                    html_text = fetch_html(session, ch_url)
+                    html_text = fetch_page(session, ch_url, "elcanaldeportivo")
                     iframe_url = extract_iframe_src(html_text)
                     iframe_url = make_abs_url(ch_url, iframe_url)
                 except Exception:
@@ -2274,13 +2509,15 @@ def parse_elcanaldeportivo(session: requests.Session) -> List[Dict[str, Any]]:
                 "calidad": ch.get("calidad") or "",
             })
         events.append(build_event(dt_arg, logo, liga, equipos, canales, date_offset))
+    if evitados:
+        logger.info("elcanaldeportivo: %d sub-requests evitados (eventos pasados)", evitados)
     return events
 
 
 def parse_streamx10(session: requests.Session) -> List[Dict[str, Any]]:
     events: List[Dict[str, Any]] = []
     try:
-        response = session.get(STREAMX10_URL, timeout=TIMEOUT_SEC)
+        response = http_get(session, STREAMX10_URL)
         response.encoding = "utf-8"
         data = response.json()
     except Exception as exc:
@@ -2434,6 +2671,8 @@ def parse_pirlotvoficial(session: requests.Session) -> List[Dict[str, Any]]:
         return events
 
     base_date = today_arg_date().date()
+    ahora = datetime.now(timezone.utc)
+    evitados = 0
 
     for row in tbody.find_all("tr"):
         cols = row.find_all("td")
@@ -2467,15 +2706,21 @@ def parse_pirlotvoficial(session: requests.Session) -> List[Dict[str, Any]]:
         dt_arg = dt_source + timedelta(hours=2)
         date_offset = (dt_arg.date() - dt_source.date()).days
 
+        links = cols[2].find_all("a", href=True)
+        # Evento que filtrar_eventos_pasados va a descartar: no bajar sus páginas de canal
+        if not evento_vigente(dt_arg + timedelta(hours=3), ahora):
+            evitados += sum(1 for link in links if link.get("href"))
+            continue
+
         canales: List[Dict[str, Any]] = []
-        for link in cols[2].find_all("a", href=True):
+        for link in links:
             href = link.get("href") or ""
             if not href:
                 continue
             full_url = make_abs_url(PIRLOTV_URL, href)
             iframe_url = ""
             try:
-                channel_html = fetch_html(session, full_url)
+                channel_html = fetch_page(session, full_url, "pirlotvoficial")
                 iframe_url = extract_iframe_src(channel_html)
                 iframe_url = make_abs_url(full_url, iframe_url)
             except Exception:
@@ -2488,6 +2733,8 @@ def parse_pirlotvoficial(session: requests.Session) -> List[Dict[str, Any]]:
 
         events.append(build_event(dt_arg, icon_url, liga, equipos, canales, date_offset))
 
+    if evitados:
+        logger.info("pirlotvoficial: %d sub-requests evitados (eventos pasados)", evitados)
     return events
 
 
@@ -2513,6 +2760,8 @@ def parse_tvlibree(session: requests.Session) -> List[Dict[str, Any]]:
         "MEX": {"pais": "México", "logo": BANDERAS_PAIS.get("méxico", "")},
         "PE": {"pais": "Perú", "logo": BANDERAS_PAIS.get("perú", "")},
     }
+    ahora = datetime.now(timezone.utc)
+    evitados = 0
     for item in soup.find_all("li"):
         time_span = item.find("span", class_="t")
         if not time_span:
@@ -2561,8 +2810,17 @@ def parse_tvlibree(session: requests.Session) -> List[Dict[str, Any]]:
         dt_arg = dt_source - timedelta(hours=4)
         date_offset = (dt_arg.date() - dt_source.date()).days
 
+        subitems = item.find_all("li", class_="subitem1")
+        # Evento que filtrar_eventos_pasados va a descartar: no bajar sus páginas /en-vivo/
+        if not evento_vigente(dt_arg + timedelta(hours=3), ahora):
+            for subitem in subitems:
+                link = subitem.find("a", href=True)
+                if link and (link.get("href") or "").startswith("/en-vivo/"):
+                    evitados += 1
+            continue
+
         canales: List[Dict[str, Any]] = []
-        for subitem in item.find_all("li", class_="subitem1"):
+        for subitem in subitems:
             link = subitem.find("a", href=True)
             if not link:
                 continue
@@ -2578,7 +2836,7 @@ def parse_tvlibree(session: requests.Session) -> List[Dict[str, Any]]:
             if href.startswith("/en-vivo/"):
                 full_url = make_abs_url("https://tvlibree.com/", href)
                 try:
-                    detail_html = fetch_html(session, full_url)
+                    detail_html = fetch_page(session, full_url, "tvlibree")
                     option_urls = extract_onclick_urls(detail_html)
                 except Exception:
                     option_urls = []
@@ -2595,6 +2853,8 @@ def parse_tvlibree(session: requests.Session) -> List[Dict[str, Any]]:
 
         events.append(build_event(dt_arg, logo, liga, equipos, canales, date_offset))
 
+    if evitados:
+        logger.info("tvlibree: %d sub-requests evitados (eventos pasados)", evitados)
     return events
 
 
@@ -2602,7 +2862,7 @@ def parse_tvtvhd(session: requests.Session) -> List[Dict[str, Any]]:
     events: List[Dict[str, Any]] = []
     # Intentar primero la nueva agenda JSON (fuente oficial del sitio)
     try:
-        resp = session.get(TVTVHD_JSON_URL, timeout=TIMEOUT_SEC)
+        resp = http_get(session, TVTVHD_JSON_URL)
         data = resp.json()
     except Exception as exc:
         logger.error("tvtvhd json error: %s", exc)
@@ -2883,13 +3143,289 @@ def merge_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return list(merged.values())
 
 
-def build_all_events() -> List[Dict[str, Any]]:
+# ==================== METRICAS DE LA CORRIDA ====================
+
+def _reset_peak_rss() -> None:
+    """Reinicia el pico de RSS del proceso (VmHWM, solo Linux)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Pico de RSS desde el último _reset_peak_rss (o desde el arranque), en MiB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        return None
+
+
+class RunStats:
+    """
+    Tiempos y contadores por etapa de una corrida de main(): wall time, requests
+    HTTP, bytes descargados, hits de cada caché y pico de RSS. Las requests se
+    cuentan enganchando HTTPAdapter.send y se atribuyen a la etapa del hilo
+    (los parsers de agenda corren en paralelo, cada uno con su etapa) o, si el
+    hilo no tiene, a la etapa secuencial en curso (p.ej. workers de m3u8).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._current: Optional[str] = None
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.started = time.time()
+
+    def install(self) -> None:
+        original = HTTPAdapter.send
+
+        def _send(adapter, request, **kwargs):
+            stage = self._stage_name()
+            self._add(stage, http_requests=1)
+            response = original(adapter, request, **kwargs)
+            self._count_body(response, stage)
+            return response
+
+        HTTPAdapter.send = _send
+
+    def _count_body(self, response: requests.Response, stage: Optional[str]) -> None:
+        """
+        Cuenta los bytes del cuerpo a medida que el llamador los lee (envolviendo
+        raw.read), sin leerlo acá: stream=True sigue funcionando igual.
+        """
+        if response._content_consumed and isinstance(response._content, bytes):
+            # Cuerpo ya en memoria (http_replay)
+            self._add(stage, bytes=len(response._content))
+            return
+        raw = response.raw
+        if raw is None or not hasattr(raw, "read"):
+            return
+        read = raw.read
+
+        def _read(*args, **kwargs):
+            data = read(*args, **kwargs)
+            if data:
+                self._add(stage, bytes=len(data))
+            return data
+
+        raw.read = _read
+
+    @contextmanager
+    def stage(self, name: str, parallel: bool = False):
+        with self._lock:
+            self.stages.setdefault(name, {"wall_sec": 0.0, "http_requests": 0, "bytes": 0,
+                                          "cache_hits": {}, "peak_rss_mb": None, "parallel": parallel})
+        prev_local = getattr(self._local, "stage", None)
+        self._local.stage = name
+        prev_current = self._current
+        if not parallel:
+            self._current = name
+            _reset_peak_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                st = self.stages[name]
+                st["wall_sec"] = round(st["wall_sec"] + elapsed, 3)
+                if not parallel:
+                    st["peak_rss_mb"] = _peak_rss_mb()
+            self._local.stage = prev_local
+            if not parallel:
+                self._current = prev_current
+
+    def hit(self, cache: str, n: int = 1) -> None:
+        """Suma `n` hits de la caché `cache` a la etapa actual."""
+        name = self._stage_name()
+        if name is None or n <= 0:
+            return
+        with self._lock:
+            hits = self.stages[name]["cache_hits"]
+            hits[cache] = hits.get(cache, 0) + n
+
+    def _stage_name(self) -> Optional[str]:
+        return getattr(self._local, "stage", None) or self._current
+
+    def _add(self, name: Optional[str], **counters: int) -> None:
+        if name is None:
+            return
+        with self._lock:
+            st = self.stages[name]
+            for key, value in counters.items():
+                st[key] += value
+
+    def write(self, path: Path = STATS_JSON, **extra: Any) -> None:
+        """Loguea el resumen por etapa y lo guarda como JSON (atómico)."""
+        stages = [{"stage": name, **st} for name, st in self.stages.items()]
+        for st in stages:
+            logger.info("Etapa %s: %.1fs, %d requests, %.0f KiB, hits %s", st["stage"], st["wall_sec"],
+                        st["http_requests"], st["bytes"] / 1024, st["cache_hits"] or "-")
+        report = {
+            "started_at": datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+            "total_sec": round(time.time() - self.started, 3),
+            "http_requests": sum(st["http_requests"] for st in stages),
+            "bytes": sum(st["bytes"] for st in stages),
+            **extra,
+            "stages": stages,
+        }
+        tmp_path = path.with_suffix(".json.tmp")
+        try:
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning("Error guardando %s: %s", path.name, e)
+
+
+_run_stats = RunStats()
+
+
+def new_session() -> requests.Session:
     session = requests.Session()
     session.headers.update({
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
         "Accept-Language": "es-ES,es;q=0.9,en;q=0.8",
     })
+    return session
+
+
+# Estado por fuente: validadores HTTP, hash del contenido y eventos ya parseados
+_agenda_cache: Dict[str, Dict[str, Any]] = {}
+_agenda_cache_lock = threading.Lock()
 
+
+def load_agenda_cache() -> Dict[str, Dict[str, Any]]:
+    """Carga el estado de las fuentes de agenda (ETag/Last-Modified/hash/eventos)."""
+    global _agenda_cache
+    if AGENDA_CACHE_FILE.exists():
+        try:
+            with AGENDA_CACHE_FILE.open("r", encoding="utf-8") as f:
+                _agenda_cache = json.load(f)
+        except Exception as e:
+            logger.warning("Error cargando caché de agenda: %s", e)
+            _agenda_cache = {}
+    return _agenda_cache
+
+
+def save_agenda_cache() -> None:
+    """Guarda el estado de las fuentes de agenda (escritura atómica)."""
+    tmp_path = AGENDA_CACHE_FILE.with_suffix(".json.tmp")
+    try:
+        with _agenda_cache_lock:
+            data = json.dumps(_agenda_cache, ensure_ascii=False)
+        tmp_path.write_text(data, encoding="utf-8")
+        os.replace(tmp_path, AGENDA_CACHE_FILE)
+    except Exception as e:
+        logger.warning("Error guardando caché de agenda: %s", e)
+
+
+def _agenda_state_valid(state: Optional[Dict[str, Any]]) -> bool:
+    """El estado guardado sirve si es del mismo día (fecha base de pirlotv/tvlibree) y no está viejo."""
+    if not state:
+        return False
+    if state.get("day") != today_arg_date().date().isoformat():
+        return False
+    return time.time() - state.get("parsed_at", 0) < AGENDA_CACHE_MAX_AGE
+
+
+def _check_agenda_source(session: requests.Session, name: str, url: str):
+    """
+    GET condicional del documento principal de una fuente.
+    Devuelve (eventos_previos, None) si no cambió (304 o mismo hash),
+    o (None, estado_nuevo) con la respuesta dejada para que el parser no la vuelva a bajar.
+    Los errores de red se propagan: la fuente está caída y el parser no reintenta.
+    """
+    with _agenda_cache_lock:
+        state = _agenda_cache.get(name)
+    valid = _agenda_state_valid(state)
+    headers = {}
+    if valid and state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if valid and state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    response = session.get(url, headers=headers, timeout=TIMEOUT_SEC)
+    if response.status_code == 304 and valid:
+        logger.info("%s: sin cambios (304), %d eventos reutilizados", name, len(state["events"]))
+        return copy.deepcopy(state["events"]), None
+    if response.status_code != 200:
+        # El parser recibe esta misma respuesta (403, 500...) en vez de pedirla de nuevo
+        _prefetch_agenda_response(url, response)
+        return None, None
+
+    digest = hashlib.sha256(response.content).hexdigest()
+    new_state = {
+        "url": url,
+        "etag": response.headers.get("ETag", ""),
+        "last_modified": response.headers.get("Last-Modified", ""),
+        "hash": digest,
+        "day": today_arg_date().date().isoformat(),
+    }
+    if valid and digest == state.get("hash"):
+        with _agenda_cache_lock:
+            state.update({k: v for k, v in new_state.items() if k != "day"})
+        logger.info("%s: contenido sin cambios (hash), %d eventos reutilizados", name, len(state["events"]))
+        return copy.deepcopy(state["events"]), None
+
+    _prefetch_agenda_response(url, response)
+    return None, new_state
+
+
+def _prefetch_agenda_response(url: str, response: requests.Response) -> None:
+    """Deja `response` para que el próximo http_get(url) de este hilo la use sin volver a pedirla."""
+    if not hasattr(_agenda_prefetch, "responses"):
+        _agenda_prefetch.responses = {}
+    _agenda_prefetch.responses[url] = response
+
+
+def _run_source(name: str, parser_fn) -> List[Dict[str, Any]]:
+    """Ejecuta un parser con su propia sesión (requests.Session no es thread-safe)."""
+    with _run_stats.stage(f"agenda:{name}", parallel=True):
+        return _run_source_session(name, parser_fn)
+
+
+def _run_source_session(name: str, parser_fn) -> List[Dict[str, Any]]:
+    session = new_session()
+    new_state = None
+    try:
+        url = AGENDA_SOURCE_URLS.get(name)
+        if url:
+            previous, new_state = _check_agenda_source(session, name, url)
+            if previous is not None:
+                _run_stats.hit("agenda")
+                return previous
+        parsed = parser_fn(session)
+        if new_state and parsed:
+            new_state["parsed_at"] = time.time()
+            new_state["events"] = copy.deepcopy(parsed)
+            with _agenda_cache_lock:
+                _agenda_cache[name] = new_state
+        return parsed
+    except requests.RequestException as exc:
+        # Sin volver a pedir la agenda desde el parser: una fuente caída cuesta un solo timeout
+        logger.warning("%s: agenda sin respuesta (%s), 0 eventos", name, exc)
+        return []
+    except Exception as exc:
+        logger.error("%s parser error: %s", name, exc)
+        return []
+    finally:
+        getattr(_agenda_prefetch, "responses", {}).clear()
+        session.close()
+
+
+def build_all_events() -> List[Dict[str, Any]]:
+    global _page_cache
     all_events: List[Dict[str, Any]] = []
     sources = [
         ("elcanaldeportivo", parse_elcanaldeportivo),
@@ -2901,24 +3437,61 @@ def build_all_events() -> List[Dict[str, Any]]:
         ("tvtvhd", parse_tvtvhd),
     ]
 
-    for name, parser_fn in sources:
+    # Cada fuente corre en su propio worker con su propio plazo; los resultados se
+    # guardan por fuente y se unen en el orden de `sources`, así el merge no depende
+    # de cuál respondió primero. Una fuente que no termina a tiempo aporta 0 eventos
+    # y no bloquea el merge (el hilo queda huérfano hasta su timeout HTTP).
+    with _run_stats.stage("agendas"):
+        _page_cache = PageCache()
+        load_agenda_cache()
+        executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="agenda")
+        start = time.monotonic()
+        deadlines: Dict[Any, float] = {}
+        names: Dict[Any, str] = {}
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        for name, parser_fn in sources:
+            future = executor.submit(_run_source, name, parser_fn)
+            names[future] = name
+            deadlines[future] = start + SOURCE_DEADLINES.get(name, SOURCE_DEADLINE_SEC)
+
+        pending = set(names)
         try:
-            parsed = parser_fn(session)
-        except Exception as exc:
-            logger.error("%s parser error: %s", name, exc)
-            parsed = []
-        logger.info("%s: %d eventos", name, len(parsed))
-        all_events.extend(parsed)
+            while pending:
+                next_deadline = min(deadlines[f] for f in pending)
+                done, pending = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()),
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    parsed = future.result()
+                    logger.info("%s: %d eventos (%.1fs)", names[future], len(parsed), time.monotonic() - start)
+                    results[names[future]] = parsed
+                now = time.monotonic()
+                for future in [f for f in pending if deadlines[f] <= now]:
+                    pending.discard(future)
+                    future.cancel()
+                    logger.warning("%s: sin respuesta tras %.0fs, se descarta (0 eventos)",
+                                   names[future], deadlines[future] - start)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        for name, _ in sources:
+            all_events.extend(results.get(name, []))
+        _page_cache.log_stats()
+        save_agenda_cache()
 
     # Deduplicar y fusionar canales de eventos iguales
     logger.info("Eventos antes de deduplicar: %d", len(all_events))
-    all_events = merge_events(all_events)
+    with _run_stats.stage("merge_events"):
+        all_events = merge_events(all_events)
     logger.info("Eventos después de deduplicar: %d", len(all_events))
 
+    # Completar con ChatGPT lo que la inferencia local no resolvió (controlado por USE_CHATGPT)
+    with _run_stats.stage("enrich_events_with_chatgpt"):
+        all_events = enrich_events_with_chatgpt(all_events)
+
     all_events.sort(key=lambda x: x.get("hora_utc", ""))
 
     # Normalizar logos: misma liga = mismo logo (usa LIGA_LOGOS como fuente de verdad)
-    all_events = normalize_logos_by_liga(all_events)
+    with _run_stats.stage("normalize_logos_by_liga"):
+        all_events = normalize_logos_by_liga(all_events)
 
     return all_events
 
@@ -3019,7 +3592,6 @@ def sync_to_github(json_path: Path) -> None:
 def filtrar_eventos_pasados(events: list) -> list:
     """Elimina eventos cuya hora UTC ya pasó (más de 4 horas de margen)."""
     ahora = datetime.now(timezone.utc)
-    margen = timedelta(hours=4)  # Mantener partidos que empezaron hace menos de 4h
     filtrados = []
     for ev in events:
         hora_str = ev.get("hora_utc", "")
@@ -3028,7 +3600,7 @@ def filtrar_eventos_pasados(events: list) -> list:
             continue
         try:
             hora_ev = datetime.fromisoformat(hora_str.replace("Z", "+00:00"))
-            if hora_ev + margen >= ahora:
+            if evento_vigente(hora_ev, ahora):
                 filtrados.append(ev)
         except Exception:
             filtrados.append(ev)  # Si no se puede parsear, mantener
@@ -3043,18 +3615,370 @@ _M3U8_HEADERS = {
     'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
 }
 _M3U8_TIMEOUT = 15
+_M3U8_TIMEOUT_MIN = 4               # Piso del timeout adaptativo por dominio
+_M3U8_LATENCY_MIN_SAMPLES = 5       # Muestras antes de adaptar el timeout al p95
+_M3U8_BREAKER_THRESHOLD = 5         # Fallos consecutivos para abrir el circuito de un dominio
+_M3U8_BREAKER_COOLDOWN = 90         # Segundos abierto antes de dejar pasar una prueba
 _M3U8_MAX_WORKERS = 8
+_M3U8_MAX_PER_HOST = 4  # Conexiones simultáneas máximas contra un mismo host
+_M3U8_TIME_BUDGET = int(os.environ.get("M3U8_TIME_BUDGET", "300"))  # Presupuesto global de extracción (s)
+
+# Caché persistente de resoluciones m3u8 por URL de canal
+_M3U8_CACHE_DEFAULT_TTL = 2 * 3600     # URLs sin expiración explícita
+_M3U8_CACHE_REFRESH_MARGIN = 30 * 60   # Re-resolver si expira en menos de esto
+_M3U8_CACHE_NO_STORE = ("fubohd.com",)  # Subdominios DNS efímeros: no sirve guardarlos
+_M3U8_EXPIRY_PARAMS = ("e", "expires", "exp", "expire", "expiry")
+
+_m3u8_cache: Dict[str, Dict[str, Any]] = {}
+
+
+def load_m3u8_cache() -> Dict[str, Dict[str, Any]]:
+    """Carga el caché de resoluciones m3u8 desde archivo."""
+    global _m3u8_cache
+    if M3U8_CACHE_FILE.exists():
+        try:
+            with M3U8_CACHE_FILE.open("r", encoding="utf-8") as f:
+                _m3u8_cache = json.load(f)
+                logger.info("Caché m3u8 cargado: %d entradas", len(_m3u8_cache))
+        except Exception as e:
+            logger.warning("Error cargando caché m3u8: %s", e)
+            _m3u8_cache = {}
+    return _m3u8_cache
+
+
+def save_m3u8_cache() -> None:
+    """Guarda el caché m3u8 (descarta entradas vencidas) de forma atómica."""
+    global _m3u8_cache
+    now = time.time()
+    _m3u8_cache = {u: e for u, e in _m3u8_cache.items() if e.get("expires", 0) > now}
+    tmp_path = M3U8_CACHE_FILE.with_suffix(".json.tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(_m3u8_cache, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, M3U8_CACHE_FILE)
+        logger.info("Caché m3u8 guardado: %d entradas", len(_m3u8_cache))
+    except Exception as e:
+        logger.warning("Error guardando caché m3u8: %s", e)
+
+
+def _m3u8_expiry(m3u8_url: str, now: float) -> float:
+    """
+    Obtiene la expiración (epoch) de una URL m3u8.
+    Reconoce ?e=/?expires= y tokens HASH-XX-TIMESTAMP; si no hay, usa TTL por defecto.
+    """
+    expiry = _m3u8_explicit_expiry(m3u8_url, now)
+    return expiry if expiry is not None else now + _M3U8_CACHE_DEFAULT_TTL
+
+
+def _m3u8_explicit_expiry(m3u8_url: str, now: float) -> Optional[float]:
+    """Expiración que trae la propia URL m3u8 (None si no tiene)."""
+    qs = parse_qs(urlparse(m3u8_url).query)
+    for key in _M3U8_EXPIRY_PARAMS:
+        value = (qs.get(key) or [""])[0]
+        if value.isdigit():
+            ts = int(value)
+            return ts / 1000 if ts > 10**12 else float(ts)
+    token = (qs.get("token") or [""])[0]
+    stamps = [int(t) for t in re.findall(r"(?<![0-9a-f])(\d{10})(?!\d)", token)]
+    future = [t for t in stamps if t > now]
+    if future:
+        return float(max(future))
+    return None
+
+
+def _carried_m3u8_fresh(channel_url: str, m3u8: str, now: float) -> bool:
+    """
+    El m3u8 de la corrida anterior sigue vigente: según el `expires` de su entrada
+    en el caché (calculado desde resolved_at) o un vencimiento explícito en la URL.
+    Sin ninguno de los dos no hay forma de saberlo y se vuelve a resolver.
+    """
+    entry = _m3u8_cache.get(channel_url)
+    if entry and entry.get("m3u8") == m3u8:
+        expires = entry.get("expires", 0)
+    else:
+        expires = _m3u8_explicit_expiry(m3u8, now)
+        if expires is None:
+            return False
+    return expires - now > _M3U8_CACHE_REFRESH_MARGIN
+
+
+def _m3u8_cache_store(url: str, m3u8: str, extractor: str, now: float) -> None:
+    host = (urlparse(m3u8).hostname or "").lower()
+    if any(host.endswith(h) for h in _M3U8_CACHE_NO_STORE):
+        _m3u8_cache.pop(url, None)
+        return
+    _m3u8_cache[url] = {
+        "m3u8": m3u8,
+        "extractor": extractor,
+        "expires": _m3u8_expiry(m3u8, now),
+        "resolved_at": now,
+    }
+
+
+class M3U8HttpClient:
+    """
+    Cliente HTTP compartido por los workers de extracción m3u8.
+    Reutiliza conexiones (keep-alive) vía un pool por host y limita la
+    concurrencia por host para no saturar bolaloca/asfdasfas/obstream.
+    requests.Session no es thread-safe: cada worker usa la suya, todas
+    montadas sobre el mismo adapter (y su pool de conexiones).
+    """
+
+    def __init__(self, max_per_host: int = _M3U8_MAX_PER_HOST, pool_size: int = _M3U8_MAX_WORKERS):
+        self.max_per_host = max_per_host
+        self._adapter = HTTPAdapter(pool_connections=128, pool_maxsize=max(pool_size, max_per_host), max_retries=0)
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _session(self) -> requests.Session:
+        """Sesión del thread actual (creada la primera vez)."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.verify = False
+            # Sin cookies entre requests (igual que requests.get suelto)
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    @contextmanager
+    def _host_slot(self, host: str):
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = self._slots[host] = threading.BoundedSemaphore(self.max_per_host)
+        with slot:
+            yield
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        host = (urlparse(url).hostname or "").lower()
+        with self._host_slot(host):
+            return self._session().get(url, **kwargs)
+
+    def connection_stats(self) -> Dict[str, Dict[str, int]]:
+        """Por host: conexiones abiertas vs. requests que reutilizaron una conexión."""
+        stats: Dict[str, Dict[str, int]] = {}
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = stats.setdefault(pool.host, {"opened": 0, "reused": 0})
+            host["opened"] += pool.num_connections
+            host["reused"] += max(0, pool.num_requests - pool.num_connections)
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._adapter.close()
+
+
+_m3u8_http: Optional[M3U8HttpClient] = None
+_m3u8_http_lock = threading.Lock()
+
+
+def _get_m3u8_http() -> M3U8HttpClient:
+    global _m3u8_http
+    with _m3u8_http_lock:
+        if _m3u8_http is None:
+            _m3u8_http = M3U8HttpClient()
+        return _m3u8_http
+
+
+def _close_m3u8_http() -> None:
+    """Loguea reutilización de conexiones por host y cierra el cliente compartido."""
+    global _m3u8_http
+    with _m3u8_http_lock:
+        client, _m3u8_http = _m3u8_http, None
+    if client is None:
+        return
+    stats = client.connection_stats()
+    for host, st in sorted(stats.items(), key=lambda x: -(x[1]["opened"] + x[1]["reused"])):
+        logger.info("  HTTP [%s]: %d conexiones abiertas, %d reutilizadas", host, st["opened"], st["reused"])
+    client.close()
+
+
+class SingleFlight:
+    """
+    Memo de una corrida: llamadas concurrentes con la misma clave comparten un
+    único fetch en vuelo y su resultado. Cuenta los fetches ahorrados por dominio
+    (el tipo de dominio del canal que originó la llamada, ver _m3u8_ctx).
+    Solo se memoizan los resultados que `cacheable` acepta (ni excepciones ni
+    errores transitorios): esos se comparten con las llamadas en vuelo y la
+    siguiente vuelve a intentar.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: Dict[Any, Any] = {}
+        self._inflight: Dict[Any, list] = {}
+        self.saved: Dict[str, int] = {}
+
+    def peek(self, key: Any) -> Tuple[bool, Any]:
+        """(True, resultado) si `key` ya está memoizada (cuenta como fetch ahorrado)."""
+        with self._lock:
+            if key in self._results:
+                self._count_saved()
+                return True, self._results[key]
+        return False, None
+
+    def do(self, key: Any, fn, cacheable=None):
+        with self._lock:
+            if key in self._results:
+                self._count_saved()
+                return self._results[key]
+            entry = self._inflight.get(key)
+            leader = entry is None
+            if leader:
+                entry = self._inflight[key] = [threading.Event(), None]
+        if not leader:
+            entry[0].wait()
+            with self._lock:
+                self._count_saved()
+            return entry[1]
+        keep = True
+        try:
+            result = fn()
+            keep = cacheable is None or cacheable(result)
+        except Exception as e:
+            result = (None, str(e))
+            keep = False
+        with self._lock:
+            entry[1] = result
+            if keep:
+                self._results[key] = result
+            del self._inflight[key]
+        entry[0].set()
+        return result
 
+    def _count_saved(self) -> None:
+        dtype = getattr(_m3u8_ctx, "dtype", "generic")
+        self.saved[dtype] = self.saved.get(dtype, 0) + 1
 
-def _m3u8_fetch(url: str, referer: str = None, timeout: int = _M3U8_TIMEOUT):
-    """Fetch URL con headers para extracción m3u8."""
+
+class DomainBreaker:
+    """
+    Salud por tipo de dominio (ver _detect_m3u8_domain) durante una corrida.
+    Registra latencia y fallos de cada fetch; tras _M3U8_BREAKER_THRESHOLD fallos
+    consecutivos el circuito se abre y las URLs del dominio se descartan sin red.
+    Pasado el cooldown deja pasar una prueba (semiabierto). El timeout se adapta
+    al p95 de las latencias exitosas observadas.
+    """
+
+    def __init__(self, threshold: int = _M3U8_BREAKER_THRESHOLD, cooldown: float = _M3U8_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def _get(self, dtype: str) -> Dict[str, Any]:
+        st = self._stats.get(dtype)
+        if st is None:
+            st = self._stats[dtype] = {"latencies": [], "ok": 0, "fail": 0, "consecutive": 0,
+                                       "opened_at": None, "probing": False, "skipped": 0}
+        return st
+
+    def allow(self, dtype: str) -> bool:
+        with self._lock:
+            st = self._get(dtype)
+            if st["opened_at"] is None:
+                return True
+            if not st["probing"] and time.time() - st["opened_at"] >= self.cooldown:
+                st["probing"] = True
+                return True
+            st["skipped"] += 1
+            return False
+
+    def record(self, dtype: str, ok: bool, elapsed: float) -> None:
+        with self._lock:
+            st = self._get(dtype)
+            if ok:
+                st["ok"] += 1
+                st["consecutive"] = 0
+                st["latencies"].append(elapsed)
+                if st["opened_at"] is not None:
+                    logger.info("M3U8 [%s]: circuito cerrado de nuevo", dtype)
+                st["opened_at"] = None
+            else:
+                st["fail"] += 1
+                st["consecutive"] += 1
+                if st["probing"] or (st["opened_at"] is None and st["consecutive"] >= self.threshold):
+                    if st["opened_at"] is None:
+                        logger.warning("M3U8 [%s]: %d fallos consecutivos, circuito abierto",
+                                       dtype, st["consecutive"])
+                    st["opened_at"] = time.time()
+            st["probing"] = False
+
+    def timeout(self, dtype: str) -> float:
+        with self._lock:
+            lat = sorted(self._get(dtype)["latencies"])
+        if len(lat) < _M3U8_LATENCY_MIN_SAMPLES:
+            return _M3U8_TIMEOUT
+        p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+        return max(_M3U8_TIMEOUT_MIN, min(_M3U8_TIMEOUT, p95 * 2))
+
+    def state(self, dtype: str) -> str:
+        with self._lock:
+            st = self._get(dtype)
+            if st["opened_at"] is None:
+                return "cerrado"
+            return f"abierto, {st['skipped']} descartadas"
+
+
+_m3u8_ctx = threading.local()
+_m3u8_flight = SingleFlight()
+_m3u8_breaker = DomainBreaker()
+
+
+class _TransientFetch(tuple):
+    """(None, error) de un fetch que puede salir distinto al reintentar (timeout, conexión, 5xx)."""
+
+
+def _m3u8_fetch(url: str, referer: str = None, timeout: float = None):
+    """Fetch URL con headers para extracción m3u8 (deduplicado por URL + origen del referer)."""
+    ref_origin = ""
+    if referer:
+        parsed = urlparse(referer)
+        ref_origin = f"{parsed.scheme}://{parsed.netloc}"
+    key = ("fetch", url, ref_origin)
+    found, result = _m3u8_flight.peek(key)
+    if found:
+        return result
+    # El circuito se consulta fuera del single-flight: su corte no es un resultado
+    # del hop y no debe quedar memoizado para otros tipos ni tras cerrarse
+    dtype = getattr(_m3u8_ctx, "dtype", "generic")
+    if not _m3u8_breaker.allow(dtype):
+        return None, f"circuito abierto para {dtype}"
+    return _m3u8_flight.do(key, lambda: _m3u8_fetch_uncached(url, referer, timeout, dtype),
+                           cacheable=lambda r: not isinstance(r, _TransientFetch))
+
+
+def _m3u8_fetch_uncached(url: str, referer: str = None, timeout: float = None, dtype: str = "generic"):
+    start = time.time()
+    try:
+        r = _get_m3u8_http().get(url, headers={**_M3U8_HEADERS, 'Referer': referer or url},
+                                 timeout=timeout or _m3u8_breaker.timeout(dtype), allow_redirects=True)
+    except Exception as e:
+        _m3u8_breaker.record(dtype, False, time.time() - start)
+        return _TransientFetch((None, str(e)))
+    # Un 4xx es una respuesta del servidor: cuenta como dominio vivo
+    _m3u8_breaker.record(dtype, r.status_code < 500, time.time() - start)
     try:
-        r = requests.get(url, headers={**_M3U8_HEADERS, 'Referer': referer or url},
-                         timeout=timeout, verify=False, allow_redirects=True)
         r.raise_for_status()
-        return r.text, r.url
     except Exception as e:
+        if r.status_code >= 500:
+            return _TransientFetch((None, str(e)))
         return None, str(e)
+    return r.text, r.url
 
 
 def _find_m3u8_in_html(html: str, base_url: str = "") -> list:
@@ -3103,53 +4027,9 @@ def _find_iframes(html: str, base_url: str = "") -> list:
     return result
 
 
-def _unpack_js(packed_code: str):
-    """Desempaqueta código JavaScript ofuscado (p,a,c,k,e,d)."""
-    patterns = [
-        r"eval\(function\(p,a,c,k,e,d\)\{.*?\}return p\}\('(.+)',(\d+),(\d+),'([^']+)'\.split\('\|'\)",
-        r"eval\(function\(p,a,c,k,e,d\)\{.*?\}\('(.+)',(\d+),(\d+),'([^']+)'\.split\('\|'\)",
-    ]
-    match = None
-    for pat in patterns:
-        match = re.search(pat, packed_code, re.DOTALL)
-        if match:
-            break
-    if not match:
-        return None
-    p, a, c, k = match.groups()
-    a, c = int(a), int(c)
-    k = k.split('|')
-    digits = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
-
-    def _base_encode(num, base):
-        if num == 0:
-            return '0'
-        r = ''
-        while num > 0:
-            r = digits[num % base] + r
-            num //= base
-        return r or '0'
-
-    d = {}
-    for i in range(c):
-        key = _base_encode(i, a)
-        d[key] = k[i] if i < len(k) and k[i] else key
-    return re.sub(r'\b(\w+)\b', lambda m: d.get(m.group(0), m.group(0)), p)
-
-
 def _find_and_unpack_evals(html: str) -> list:
     """Encuentra y desempaqueta todos los bloques eval en HTML."""
-    if not html:
-        return []
-    results = []
-    for m in re.finditer(r'eval\(function\(p,a,c,k,e,d\)', html):
-        rest = html[m.start():]
-        end_m = re.search(r"\.split\('\|'\)[^)]*\)\)", rest[:100000])
-        if end_m:
-            unpacked = _unpack_js(rest[:end_m.end()])
-            if unpacked:
-                results.append(unpacked)
-    return results
+    return js_unpacker.unpack_all(html)
 
 
 # --- Extractores por dominio ---
@@ -3177,10 +4057,16 @@ def _extract_from_asfdasfas(url: str):
             return None, "No channel key found"
     else:
         channel_key = channel_match.group(1)
+    return _m3u8_flight.do(("server_lookup", channel_key),
+                           lambda: _asfdasfas_server_lookup(channel_key, url),
+                           cacheable=lambda r: r[0] is not None)
+
+
+def _asfdasfas_server_lookup(channel_key: str, url: str):
     try:
         lookup_url = f"https://chevy.sdfgsdfg.sbs/server_lookup?channel_id={channel_key}"
-        resp = requests.get(lookup_url, headers={**_M3U8_HEADERS, 'Referer': url},
-                            timeout=10, verify=False)
+        resp = _get_m3u8_http().get(lookup_url, headers={**_M3U8_HEADERS, 'Referer': url},
+                                    timeout=10)
         if resp.status_code != 200:
             return None, f"server_lookup returned {resp.status_code}"
         sk = resp.json().get('server_key', '')
@@ -3377,64 +4263,48 @@ def _extract_from_rereyano(url: str):
     return None, "No m3u8 found in rereyano chain"
 
 
+# Registro de extractores: despacho por sufijo de host (ver extractor_registry)
+_M3U8_REGISTRY = ExtractorRegistry(default='generic')
+_M3U8_REGISTRY.register('antenasport', _extract_from_antenasport, suffixes=('antenasport.top',))
+_M3U8_REGISTRY.register('bolaloca', _extract_from_bolaloca, suffixes=('bolaloca.my',))
+_M3U8_REGISTRY.register('direct', _extract_direct_m3u8, suffixes=('tvtvhd.com',),
+                        keywords=('streamtp', 'streamx'), fallback=('player_embed',))
+_M3U8_REGISTRY.register('elcanaldeportivo', None, suffixes=('elcanaldeportivo.com',), requires_js=True)
+_M3U8_REGISTRY.register('miatvhd', _extract_from_miatvhd, suffixes=('miatvhd.xyz',))
+_M3U8_REGISTRY.register('tvlibree', None, suffixes=('tvlibree.com',), requires_js=True)
+_M3U8_REGISTRY.register('welivesports', _extract_from_welivesports, suffixes=('welivesports.shop',))
+_M3U8_REGISTRY.register('rereyano', _extract_from_rereyano, suffixes=('rereyano.ru',))
+_M3U8_REGISTRY.register('nebunexa', None, suffixes=('nebunexa.life',), requires_js=True)
+_M3U8_REGISTRY.register('asfdasfas', _extract_from_asfdasfas, keywords=('asfdasfas',))
+_M3U8_REGISTRY.register('player_embed', _extract_from_player_embed, keywords=('doubttooth',),
+                        needs_referer=True)
+_M3U8_REGISTRY.register('obstream', _extract_from_obstream, keywords=('obstream',), needs_referer=True)
+_M3U8_REGISTRY.register('generic', _extract_from_player_embed, needs_referer=True)
+
+
 def _detect_m3u8_domain(url: str) -> str:
-    domain = urlparse(url).netloc.lower()
-    if 'antenasport.top' in domain:
-        return 'antenasport'
-    elif 'bolaloca.my' in domain:
-        return 'bolaloca'
-    elif any(d in domain for d in ['tvtvhd.com', 'streamtp', 'streamx']):
-        return 'direct'
-    elif 'elcanaldeportivo.com' in domain:
-        return 'elcanaldeportivo'
-    elif 'miatvhd.xyz' in domain:
-        return 'miatvhd'
-    elif 'tvlibree.com' in domain:
-        return 'tvlibree'
-    elif 'welivesports.shop' in domain:
-        return 'welivesports'
-    elif 'rereyano.ru' in domain:
-        return 'rereyano'
-    elif 'nebunexa.life' in domain:
-        return 'nebunexa'
-    elif 'asfdasfas' in domain:
-        return 'asfdasfas'
-    elif 'doubttooth' in domain:
-        return 'player_embed'
-    elif 'obstream' in domain:
-        return 'obstream'
-    return 'generic'
-
-
-_M3U8_EXTRACTORS = {
-    'antenasport': _extract_from_antenasport,
-    'bolaloca': _extract_from_bolaloca,
-    'direct': _extract_direct_m3u8,
-    'miatvhd': _extract_from_miatvhd,
-    'welivesports': _extract_from_welivesports,
-    'rereyano': _extract_from_rereyano,
-    'asfdasfas': _extract_from_asfdasfas,
-    'player_embed': lambda url: _extract_from_player_embed(url),
-    'obstream': lambda url: _extract_from_obstream(url),
-}
+    return _M3U8_REGISTRY.detect(url)
 
 
 def _extract_m3u8(url: str):
-    """Extrae m3u8 de cualquier URL de partidos."""
+    """
+    Extrae m3u8 de cualquier URL de partidos (extractor del dominio y sus fallbacks).
+    Devuelve (m3u8, error, extractor): `extractor` es el spec que lo resolvió
+    (p.ej. 'player_embed' para una URL 'direct' resuelta por el fallback), o None.
+    """
     dtype = _detect_m3u8_domain(url)
-    # Dominios que requieren JS runtime — no se pueden extraer
-    if dtype in ('elcanaldeportivo', 'tvlibree', 'nebunexa'):
-        return None, f"{dtype} requiere JS runtime"
-    extractor = _M3U8_EXTRACTORS.get(dtype)
-    if extractor:
+    _m3u8_ctx.dtype = dtype
+    spec = _M3U8_REGISTRY.get(dtype)
+    # chain() omite los que no se pueden ejecutar (p.ej. dominios que requieren JS runtime)
+    error = f"{dtype} {spec.unavailable}" if spec and spec.unavailable else f"Sin extractor para {dtype}"
+    for spec in _M3U8_REGISTRY.chain(dtype):
         try:
-            return extractor(url)
+            m3u8, error = _M3U8_REGISTRY.call(spec, url)
         except Exception as e:
-            return None, f"Error in {dtype}: {e}"
-    try:
-        return _extract_from_player_embed(url)
-    except Exception as e:
-        return None, f"Generic extraction failed: {e}"
+            m3u8, error = None, f"Error in {spec.name}: {e}"
+        if m3u8:
+            return m3u8, error, spec.name
+    return None, error, None
 
 
 def extraer_m3u8_de_eventos(events: list) -> list:
@@ -3442,6 +4312,7 @@ def extraer_m3u8_de_eventos(events: list) -> list:
     Toma la lista de eventos/partidos, extrae m3u8 de cada canal en paralelo,
     elimina canales sin m3u8 y partidos sin canales. Retorna lista limpia.
     """
+    global _m3u8_flight, _m3u8_breaker
     total_canales = sum(len(p.get('canales', [])) for p in events)
     if total_canales == 0:
         logger.info("M3U8: No hay canales para procesar")
@@ -3467,22 +4338,79 @@ def extraer_m3u8_de_eventos(events: list) -> list:
     for dt, cnt in sorted(domain_counts.items(), key=lambda x: -x[1]):
         logger.info("  M3U8 [%s]: %d URLs", dt, cnt)
 
-    # Extraer en paralelo
+    # Caché: las entradas frescas no se extraen
     url_results: Dict[str, tuple] = {}
     start_time = time.time()
-    ok_count = 0
+    now = start_time
+    to_resolve: List[str] = []
+    for u in unique_urls:
+        entry = _m3u8_cache.get(u)
+        if entry and entry.get("expires", 0) - now > _M3U8_CACHE_REFRESH_MARGIN:
+            url_results[u] = (entry["m3u8"], None)
+        else:
+            to_resolve.append(u)
+    cache_hits = len(unique_urls) - len(to_resolve)
+    _run_stats.hit("m3u8", cache_hits)
+    logger.info("M3U8: caché %d frescas, %d a resolver", cache_hits, len(to_resolve))
 
-    with ThreadPoolExecutor(max_workers=_M3U8_MAX_WORKERS) as executor:
-        future_to_url = {executor.submit(_extract_m3u8, u): u for u in unique_urls}
-        for future in as_completed(future_to_url):
-            url = future_to_url[future]
-            try:
-                m3u8, error = future.result(timeout=60)
-                url_results[url] = (m3u8, error)
-            except Exception as e:
-                url_results[url] = (None, str(e))
-            if url_results[url][0]:
-                ok_count += 1
+    # Prioridad: el partido más próximo primero; a igual hora, la entrada más próxima a vencer
+    earliest: Dict[str, str] = {}
+    for p in events:
+        hora = p.get('hora_utc') or "9999"
+        for c in p.get('canales', []):
+            url = c.get('url', '')
+            if url and (url not in earliest or hora < earliest[url]):
+                earliest[url] = hora
+    to_resolve.sort(key=lambda u: (earliest.get(u, "9999"),
+                                   _m3u8_cache.get(u, {}).get("expires", float("inf"))))
+
+    def _record(url: str, future) -> None:
+        try:
+            m3u8, error, extractor = future.result()
+        except Exception as e:
+            m3u8, error, extractor = None, str(e), None
+        url_results[url] = (m3u8, error)
+        if m3u8:
+            _m3u8_cache_store(url, m3u8, extractor, time.time())
+
+    # Extraer en paralelo (single-flight con alcance de esta corrida). El pool atiende
+    # en orden de envío, así que la prioridad se respeta; al agotarse el presupuesto
+    # se publica lo resuelto y no se espera a los dominios lentos.
+    _m3u8_flight = SingleFlight()
+    _m3u8_breaker = DomainBreaker()
+    pendientes: set = set()
+    executor = ThreadPoolExecutor(max_workers=_M3U8_MAX_WORKERS)
+    try:
+        future_to_url = {executor.submit(_extract_m3u8, u): u for u in to_resolve}
+        try:
+            for future in as_completed(future_to_url, timeout=_M3U8_TIME_BUDGET):
+                _record(future_to_url[future], future)
+        except FuturesTimeoutError:
+            for future, url in future_to_url.items():
+                if url in url_results:
+                    continue
+                if future.done() and not future.cancelled():
+                    _record(url, future)
+                else:
+                    pendientes.add(url)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # Si falla o no llega la re-resolución, conservar la entrada anterior mientras no venza
+    ok_count = cache_hits
+    for url in to_resolve:
+        if not url_results.get(url, (None,))[0]:
+            entry = _m3u8_cache.get(url)
+            if entry and entry.get("expires", 0) > time.time():
+                url_results[url] = (entry["m3u8"], None)
+                pendientes.discard(url)
+            elif url in pendientes:
+                url_results[url] = (None, "pendiente")
+        if url_results[url][0]:
+            ok_count += 1
+    if pendientes:
+        logger.warning("M3U8: presupuesto de %ds agotado, %d URLs quedan pendientes (se publican las resueltas)",
+                       _M3U8_TIME_BUDGET, len(pendientes))
 
     elapsed = time.time() - start_time
     logger.info("M3U8: %d/%d URLs exitosas en %.1fs", ok_count, len(unique_urls), elapsed)
@@ -3501,7 +4429,19 @@ def extraer_m3u8_de_eventos(events: list) -> list:
         r = domain_results[dt]
         total = r['ok'] + r['fail']
         pct = r['ok'] / total * 100 if total > 0 else 0
-        logger.info("  M3U8 [%s]: %d/%d (%.0f%%)", dt, r['ok'], total, pct)
+        logger.info("  M3U8 [%s]: %d/%d (%.0f%%), %d fetches ahorrados, circuito %s, timeout %.1fs",
+                    dt, r['ok'], total, pct, _m3u8_flight.saved.get(dt, 0),
+                    _m3u8_breaker.state(dt), _m3u8_breaker.timeout(dt))
+    _run_stats.hit("single_flight", sum(_m3u8_flight.saved.values()))
+    if pendientes:
+        # Los workers abandonados por presupuesto siguen usando el cliente compartido:
+        # cerrarlo ahora haría que lo recreen. Se cierra cuando terminan, sin bloquear.
+        def _close_after_workers() -> None:
+            executor.shutdown(wait=True)
+            _close_m3u8_http()
+        threading.Thread(target=_close_after_workers, name="m3u8-close", daemon=True).start()
+    else:
+        _close_m3u8_http()
 
     # Aplicar resultados: asignar m3u8_url a cada canal
     for partido in events:
@@ -3511,10 +4451,13 @@ def extraer_m3u8_de_eventos(events: list) -> list:
                 m3u8, _ = url_results[url]
                 if m3u8:
                     canal['m3u8_url'] = m3u8
+                elif url in pendientes:
+                    canal['m3u8_pendiente'] = True
 
-    # Limpiar: solo mantener canales con m3u8_url exitoso
+    # Limpiar: mantener canales con m3u8_url exitoso (o pendientes por presupuesto)
     for partido in events:
-        partido['canales'] = [c for c in partido.get('canales', []) if c.get('m3u8_url')]
+        partido['canales'] = [c for c in partido.get('canales', [])
+                              if c.get('m3u8_url') or c.get('m3u8_pendiente')]
 
     # Eliminar partidos sin canales
     antes = len(events)
@@ -3524,23 +4467,126 @@ def extraer_m3u8_de_eventos(events: list) -> list:
     return events
 
 
+_EVENT_FIELDS = ("hora_utc", "hora_argentina", "liga", "equipos", "logo", "deporte", "pais")
+
+
+def load_previous_events(path: Path = OUTPUT_JSON) -> List[Dict[str, Any]]:
+    """Carga el partidos.json de la corrida anterior (lista vacía si no existe o está roto)."""
+    if not path.exists():
+        return []
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else []
+    except Exception as e:
+        logger.warning("No se pudo leer %s para modo incremental: %s", path.name, e)
+        return []
+
+
+def extraer_m3u8_incremental(events: list, previous: list) -> list:
+    """
+    Variante incremental de extraer_m3u8_de_eventos: compara contra la salida anterior
+    usando event_key. Eventos sin cambios se copian tal cual (con su m3u8 si no está
+    por vencer); solo los canales nuevos, cambiados o por vencer se resuelven.
+    """
+    prev_by_key: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for ev in previous:
+        prev_by_key.setdefault(event_key(ev), ev)
+
+    now = time.time()
+    output: List[Dict[str, Any]] = []
+    pending_events: List[Dict[str, Any]] = []
+    carried_urls: set = set()
+    added = updated = unchanged = 0
+    seen_keys = set()
+
+    for ev in events:
+        key = event_key(ev)
+        seen_keys.add(key)
+        old = prev_by_key.get(key)
+        old_channels: Dict[str, Dict[str, Any]] = {}
+        if old:
+            for ch in old.get("canales", []):
+                m3u8 = ch.get("m3u8_url")
+                if m3u8 and _carried_m3u8_fresh(ch.get("url", ""), m3u8, now):
+                    old_channels[ch.get("url", "")] = ch
+
+        canales: List[Dict[str, Any]] = []
+        pending: List[Dict[str, Any]] = []
+        for ch in ev.get("canales", []):
+            prev_ch = old_channels.get(ch.get("url", ""))
+            if prev_ch:
+                canales.append({**ch, "m3u8_url": prev_ch["m3u8_url"]})
+                carried_urls.add(ch.get("url", ""))
+            else:
+                canales.append(ch)
+                pending.append(ch)
+
+        if old is None:
+            added += 1
+            result = ev
+        elif pending or any(ev.get(f) != old.get(f) for f in _EVENT_FIELDS):
+            updated += 1
+            result = ev
+        else:
+            unchanged += 1
+            result = dict(old)
+        result["canales"] = canales
+        output.append(result)
+        if pending:
+            # Con equipos/hora_utc para que la prioridad por hora y event_key sigan valiendo
+            pending_events.append({"equipos": ev.get("equipos", ""), "hora_utc": ev.get("hora_utc", ""),
+                                   "canales": pending})
+
+    removed = sum(1 for key in prev_by_key if key not in seen_keys)
+    _run_stats.hit("incremental", len(carried_urls))
+
+    # Resolver solo lo pendiente (los dicts de canal son compartidos con `output`)
+    start_time = time.time()
+    if pending_events:
+        extraer_m3u8_de_eventos(pending_events)
+    elapsed = time.time() - start_time
+    resolved_urls = {ch.get("url") for pe in pending_events for ch in pe["canales"] if ch.get("url")}
+    saved = elapsed / len(resolved_urls) * len(carried_urls - resolved_urls) if resolved_urls else 0.0
+
+    for ev in output:
+        ev["canales"] = [c for c in ev.get("canales", []) if c.get("m3u8_url") or c.get("m3u8_pendiente")]
+    antes = len(output)
+    output = [ev for ev in output if ev["canales"]]
+
+    logger.info("Incremental: %d nuevos, %d actualizados, %d sin cambios, %d eliminados", added, updated, unchanged, removed)
+    logger.info("Incremental: %d URLs reutilizadas, %d resueltas en %.1fs (~%.1fs ahorrados vs. reconstrucción completa)",
+                len(carried_urls), len(resolved_urls), elapsed, saved)
+    logger.info("M3U8: Partidos %d -> %d (eliminados %d sin servidores)", antes, len(output), antes - len(output))
+    return output
+
+
 def main() -> None:
     # Cargar variables de entorno desde .env (si existe)
     load_env_file()
+    _run_stats.install()
     
     # Cargar caché de ChatGPT
-    load_chatgpt_cache()
+    with _run_stats.stage("load_chatgpt_cache"):
+        load_chatgpt_cache()
     
     # Obtener todos los eventos
     events = build_all_events()
     # Filtrar eventos pasados
     antes = len(events)
-    events = filtrar_eventos_pasados(events)
+    with _run_stats.stage("filtrar_eventos_pasados"):
+        events = filtrar_eventos_pasados(events)
     logger.info("Eventos filtrados: %d -> %d (eliminados %d pasados)", antes, len(events), antes - len(events))
     
     # Extraer URLs m3u8 de cada canal y limpiar eventos sin servidores
     logger.info("Iniciando extracción de m3u8...")
-    events = extraer_m3u8_de_eventos(events)
+    with _run_stats.stage("extraer_m3u8_de_eventos"):
+        load_m3u8_cache()
+        if INCREMENTAL or "--incremental" in sys.argv:
+            events = extraer_m3u8_incremental(events, load_previous_events())
+        else:
+            events = extraer_m3u8_de_eventos(events)
+        save_m3u8_cache()
     
     # Guardar JSON
     with OUTPUT_JSON.open("w", encoding="utf-8") as f:
@@ -3551,7 +4597,11 @@ def main() -> None:
     save_chatgpt_cache()
     
     # Subir a GitHub
-    sync_to_github(OUTPUT_JSON)
+    with _run_stats.stage("sync_to_github"):
+        sync_to_github(OUTPUT_JSON)
+
+    # Reporte de tiempos y contadores por etapa (junto a partidos.json)
+    _run_stats.write(STATS_JSON, events=len(events))
 
 
 if __name__ == "__main__":